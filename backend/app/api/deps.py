@@ -0,0 +1,54 @@
+"""Shared API dependencies."""
+
+from typing import AsyncGenerator
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.users import current_active_user
+from app.database import pin_to_primary, read_session, user_session
+from app.models.user import User
+from app.services.admission import admit_write
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+async def get_user_session(
+    user: User = Depends(current_active_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Get a database session on the shard holding the current user's rows."""
+    async with user_session(user.id, user.shard) as session:
+        yield session
+
+
+async def get_read_session(
+    user: User = Depends(current_active_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Get a database session routed to a read replica when possible."""
+    async with read_session(user.id, user.shard) as session:
+        yield session
+
+
+async def pin_writes_to_primary(
+    request: Request,
+    user: User = Depends(current_active_user),
+) -> None:
+    """Pin the user to the primary when the request may write."""
+    if request.method not in SAFE_METHODS:
+        await pin_to_primary(user.id)
+
+
+async def admit_writes(
+    request: Request,
+    user: User = Depends(current_active_user),
+) -> None:
+    """Refuse writes from users exceeding their write rate."""
+    if request.method in SAFE_METHODS:
+        return
+    retry_after = await admit_write(user.id)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many write requests",
+            headers={"Retry-After": str(retry_after)}
+        )
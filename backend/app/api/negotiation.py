@@ -0,0 +1,104 @@
+"""MessagePack content negotiation.
+
+Routers built with ``route_class=MsgPackRoute`` accept request bodies sent as
+``Content-Type: application/msgpack`` and answer with MessagePack when the
+client sends ``Accept: application/msgpack``. Bodies are decoded to the same
+Python structures as JSON, so validation still goes through the route's
+SQLModel schemas, and responses are encoded from the same serialized content
+FastAPI would otherwise render as JSON. Error responses stay JSON.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Optional
+
+import msgpack
+from fastapi import HTTPException, Request, Response, status
+from fastapi.datastructures import Default, DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+_wants_msgpack: ContextVar[bool] = ContextVar("wants_msgpack", default=False)
+
+
+def _is_msgpack(media_type: Optional[str]) -> bool:
+    """Check whether a Content-Type header names MessagePack."""
+    if not media_type:
+        return False
+    return media_type.split(";", 1)[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+def _accepts_msgpack(accept: Optional[str]) -> bool:
+    """Check whether an Accept header asks for MessagePack."""
+    if not accept:
+        return False
+    for part in accept.split(","):
+        media_type, *params = (item.strip() for item in part.split(";"))
+        if media_type.lower() in MSGPACK_MEDIA_TYPES:
+            return not any(param.replace(" ", "") in ("q=0", "q=0.0") for param in params)
+    return False
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSON response that renders MessagePack when the client asked for it."""
+
+    def __init__(self, content: Any, *args: Any, **kwargs: Any):
+        if _wants_msgpack.get():
+            self.media_type = MSGPACK_MEDIA_TYPES[0]
+        super().__init__(content, *args, **kwargs)
+        self.headers["vary"] = "Accept"
+
+    def render(self, content: Any) -> bytes:
+        if self.media_type in MSGPACK_MEDIA_TYPES:
+            return msgpack.packb(content, use_bin_type=True)
+        return super().render(content)
+
+
+class MsgPackRoute(APIRoute):
+    """API route with MessagePack request and response support."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        response_class = kwargs.get("response_class")
+        if response_class is None or (
+            isinstance(response_class, DefaultPlaceholder)
+            and response_class.value is JSONResponse
+        ):
+            kwargs["response_class"] = Default(NegotiatedResponse)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            if _is_msgpack(request.headers.get("content-type")):
+                await _decode_msgpack_body(request)
+
+            token = _wants_msgpack.set(_accepts_msgpack(request.headers.get("accept")))
+            try:
+                return await handler(request)
+            finally:
+                _wants_msgpack.reset(token)
+
+        return negotiated_handler
+
+
+async def _decode_msgpack_body(request: Request) -> None:
+    """Decode a MessagePack body so FastAPI treats it like parsed JSON."""
+    body = await request.body()
+    if body:
+        try:
+            request._json = msgpack.unpackb(body, raw=False)
+        except (ValueError, TypeError, msgpack.UnpackException):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid MessagePack body"
+            )
+
+    # FastAPI only parses bodies it believes are JSON; _json is already cached
+    request.scope["headers"] = [
+        (name, b"application/json" if name == b"content-type" else value)
+        for name, value in request.scope["headers"]
+    ]
+    request._headers = Headers(scope=request.scope)
@@ -1,13 +1,26 @@
 """API v1 package."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api.v1.routes import auth, cases, characters, game_state
+from app.api.deps import admit_writes, pin_writes_to_primary
+from app.api.v1.routes import admin, auth, cases, characters, game_state, search
 
 api_router = APIRouter()
 
+# Writes are rate limited per user, then pin the user to the primary so
+# follow-up reads see them
+write_pinning = [Depends(admit_writes), Depends(pin_writes_to_primary)]
+
 # Include all route modules
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(cases.router, prefix="/cases", tags=["cases"])
-api_router.include_router(characters.router, prefix="/characters", tags=["characters"])
-api_router.include_router(game_state.router, prefix="/game-state", tags=["game-state"])
+api_router.include_router(
+    cases.router, prefix="/cases", tags=["cases"], dependencies=write_pinning
+)
+api_router.include_router(
+    characters.router, prefix="/characters", tags=["characters"], dependencies=write_pinning
+)
+api_router.include_router(
+    game_state.router, prefix="/game-state", tags=["game-state"], dependencies=write_pinning
+)
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,60 @@
+"""Admin routes."""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import HTMLResponse
+
+from app.api.negotiation import MsgPackRoute
+from app.auth.users import current_superuser
+from app.models.profile import ProfileReport, ProfileSummary
+from app.models.user import User
+from app.services.profiling import get_profile, get_profile_html, list_profiles
+
+router = APIRouter(route_class=MsgPackRoute)
+
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+async def list_request_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    user: User = Depends(current_superuser),
+):
+    """List stored request profiles, newest first."""
+    return await list_profiles(limit)
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileReport)
+async def get_request_profile(
+    profile_id: str,
+    user: User = Depends(current_superuser),
+):
+    """Get a request profile with its SQL statements and timings."""
+    report = await get_profile(profile_id)
+
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+
+    return report
+
+
+@router.get("/profiles/{profile_id}/html", response_class=HTMLResponse)
+async def download_request_profile(
+    profile_id: str,
+    user: User = Depends(current_superuser),
+):
+    """Download a request profile's call tree as a standalone HTML page."""
+    html = await get_profile_html(profile_id)
+
+    if html is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+
+    return HTMLResponse(
+        html,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.html"'},
+    )
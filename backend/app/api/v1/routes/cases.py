@@ -1,43 +1,84 @@
 """Case management routes."""
 
+from datetime import datetime
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_read_session, get_user_session
+from app.api.negotiation import MsgPackRoute
 from app.auth.users import current_active_user
-from app.database import get_session
+from app.database import shard_for_user
 from app.models.user import User
-from app.models.case import Case, CaseCreate, CaseRead, CaseUpdate
+from app.models.archive import ArchivedCaseRead
+from app.models.case import (
+    Case,
+    CaseCreate,
+    CaseRead,
+    CaseStatus,
+    CaseUpdate,
+    EvidenceConnection,
+)
+from app.models.character import Character, SuspectScore
+from app.models.decision import Decision, DecisionCreate, DecisionRead
+from app.models.game_event import GameEventType
+from app.services.archive import load_archived_case
+from app.services.case_ownership import add_case, remove_case
+from app.services.evidence_graph import evidence_graph_cache, load_evidence_graph
+from app.services.game_events import record_event
+from app.services.quotas import QuotaExceeded, release_case_slot, reserve_case_slot
+from app.services.suspect_ranking import rank_case
+from app.tasks.purge import schedule_case_purge
 
-router = APIRouter()
+router = APIRouter(route_class=MsgPackRoute)
+
+OUTCOME_EVENTS = {
+    CaseStatus.COMPLETED: GameEventType.CASE_COMPLETED,
+    CaseStatus.FAILED: GameEventType.CASE_FAILED,
+}
 
 
 @router.post("/", response_model=CaseRead, status_code=status.HTTP_201_CREATED)
 async def create_case(
     case_data: CaseCreate,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_user_session),
     user: User = Depends(current_active_user),
 ):
     """Create a new case."""
-    case = Case(**case_data.model_dump())
+    try:
+        quota_key = await reserve_case_slot(session, user.id, user.timezone)
+    except QuotaExceeded as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Daily case limit reached",
+            headers={"Retry-After": str(exc.retry_after)}
+        )
+
+    # The case always belongs to the caller, whatever the body says
+    case = Case(**case_data.model_dump(exclude={"user_id"}), user_id=user.id)
     session.add(case)
-    await session.commit()
+    try:
+        await session.commit()
+    except BaseException:
+        await release_case_slot(quota_key)
+        raise
     await session.refresh(case)
+    await add_case(user.id, case.id)
     return case
 
 
 @router.get("/", response_model=List[CaseRead])
 async def list_cases(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     user: User = Depends(current_active_user),
 ):
     """List all cases for the current user."""
     from sqlalchemy import select
     
     result = await session.execute(
-        select(Case).where(Case.user_id == user.id)
+        select(Case).where(Case.user_id == user.id, Case.deleted_at.is_(None))
     )
     cases = result.scalars().all()
     return cases
@@ -46,38 +87,203 @@ async def list_cases(
 @router.get("/{case_id}", response_model=CaseRead)
 async def get_case(
     case_id: UUID,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     user: User = Depends(current_active_user),
 ):
-    """Get a specific case."""
+    """Get a specific case, falling back to the archive."""
     from sqlalchemy import select
     
     result = await session.execute(
-        select(Case).where(Case.id == case_id, Case.user_id == user.id)
+        select(Case).where(
+            Case.id == case_id,
+            Case.user_id == user.id,
+            Case.deleted_at.is_(None),
+        )
     )
     case = result.scalar_one_or_none()
+
+    if case:
+        return case
+
+    # Slow path: finished cases may have been moved to the archive
+    archived = await load_archived_case(session, case_id, user.id)
     
-    if not case:
+    if archived is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Case not found"
         )
     
-    return case
+    return archived.case
+
+
+@router.get("/{case_id}/archive", response_model=ArchivedCaseRead)
+async def get_archived_case(
+    case_id: UUID,
+    session: AsyncSession = Depends(get_read_session),
+    user: User = Depends(current_active_user),
+):
+    """Get an archived case with its characters and decisions."""
+    archived = await load_archived_case(session, case_id, user.id)
+
+    if archived is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archived case not found"
+        )
+
+    return archived
+
+
+@router.get("/{case_id}/suspects", response_model=List[SuspectScore])
+async def rank_case_suspects(
+    case_id: UUID,
+    session: AsyncSession = Depends(get_read_session),
+    user: User = Depends(current_active_user),
+):
+    """Rank the characters of a case by how likely they are to be guilty."""
+    from sqlalchemy import select
+
+    result = await session.execute(
+        select(Case.id).where(
+            Case.id == case_id,
+            Case.user_id == user.id,
+            Case.deleted_at.is_(None),
+        )
+    )
+
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Case not found"
+        )
+
+    return await rank_case(session, case_id)
+
+
+@router.get("/{case_id}/evidence/connection", response_model=EvidenceConnection)
+async def get_evidence_connection(
+    case_id: UUID,
+    source: str = Query(..., description="Node key, e.g. character:<id>"),
+    target: str = Query(..., description="Node key, e.g. location:<id>"),
+    session: AsyncSession = Depends(get_read_session),
+    user: User = Depends(current_active_user),
+):
+    """Check how two evidence nodes of a case are connected."""
+    try:
+        graph = await load_evidence_graph(session, case_id, user.id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc)
+        )
+
+    if graph is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Case not found"
+        )
+
+    if source not in graph or target not in graph:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evidence node not found"
+        )
+
+    if not graph.connected(source, target):
+        return EvidenceConnection(source=source, target=target, connected=False)
+
+    return EvidenceConnection(
+        source=source,
+        target=target,
+        connected=True,
+        path=graph.shortest_path(source, target),
+        linking_clues=graph.linking_clues(source, target),
+    )
+
+
+@router.post(
+    "/{case_id}/decisions", response_model=DecisionRead, status_code=status.HTTP_201_CREATED
+)
+async def create_decision(
+    case_id: UUID,
+    decision_data: DecisionCreate,
+    session: AsyncSession = Depends(get_user_session),
+    user: User = Depends(current_active_user),
+):
+    """Record a decision and apply its impacts to the current user's game state."""
+    from sqlalchemy import select
+
+    if decision_data.case_id != case_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Decision case_id does not match the URL"
+        )
+
+    result = await session.execute(
+        select(Case.id).where(
+            Case.id == case_id,
+            Case.user_id == user.id,
+            Case.deleted_at.is_(None),
+        )
+    )
+
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Case not found"
+        )
+
+    if decision_data.character_id is not None:
+        result = await session.execute(
+            select(Character.id).where(
+                Character.id == decision_data.character_id,
+                Character.case_id == case_id,
+            )
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Character not found"
+            )
+
+    decision = Decision(**decision_data.model_dump())
+    session.add(decision)
+    await record_event(
+        session,
+        user.id,
+        GameEventType.DECISION,
+        {
+            "decision_id": str(decision.id),
+            "decision_type": decision.decision_type.value,
+            "outcome": decision.outcome.value if decision.outcome else None,
+            "stress_impact": decision.stress_impact,
+            "reputation_impact": decision.reputation_impact,
+            "time_taken_minutes": decision.time_taken_minutes,
+        },
+        case_id=case_id,
+    )
+    await session.commit()
+    await session.refresh(decision)
+    return decision
 
 
 @router.patch("/{case_id}", response_model=CaseRead)
 async def update_case(
     case_id: UUID,
     case_update: CaseUpdate,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_user_session),
     user: User = Depends(current_active_user),
 ):
     """Update a case."""
     from sqlalchemy import select
     
     result = await session.execute(
-        select(Case).where(Case.id == case_id, Case.user_id == user.id)
+        select(Case).where(
+            Case.id == case_id,
+            Case.user_id == user.id,
+            Case.deleted_at.is_(None),
+        )
     )
     case = result.scalar_one_or_none()
     
@@ -87,11 +293,27 @@ async def update_case(
             detail="Case not found"
         )
     
+    previous_status = case.status
     update_data = case_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(case, key, value)
+    case.updated_at = datetime.utcnow()
+
+    if case.status != previous_status and case.status in OUTCOME_EVENTS:
+        await record_event(
+            session,
+            user.id,
+            OUTCOME_EVENTS[case.status],
+            {
+                "case_id": str(case.id),
+                "reputation_reward": case.reputation_reward,
+                "stress_impact": case.stress_impact,
+            },
+            case_id=case.id,
+        )
     
     await session.commit()
+    evidence_graph_cache.invalidate(case_id)
     await session.refresh(case)
     return case
 
@@ -99,14 +321,18 @@ async def update_case(
 @router.delete("/{case_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_case(
     case_id: UUID,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_user_session),
     user: User = Depends(current_active_user),
 ):
-    """Delete a case."""
+    """Delete a case and everything that belongs to it."""
     from sqlalchemy import select
     
     result = await session.execute(
-        select(Case).where(Case.id == case_id, Case.user_id == user.id)
+        select(Case).where(
+            Case.id == case_id,
+            Case.user_id == user.id,
+            Case.deleted_at.is_(None),
+        )
     )
     case = result.scalar_one_or_none()
     
@@ -116,5 +342,9 @@ async def delete_case(
             detail="Case not found"
         )
     
-    await session.delete(case)
+    # Hide the case now; its rows are purged in the background
+    case.deleted_at = datetime.utcnow()
     await session.commit()
+    evidence_graph_cache.invalidate(case_id)
+    await remove_case(user.id, case_id)
+    await schedule_case_purge(case_id, case.created_at, shard_for_user(user.id, user.shard))
@@ -6,21 +6,38 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_read_session, get_user_session
+from app.api.negotiation import MsgPackRoute
 from app.auth.users import current_active_user
-from app.database import get_session
 from app.models.user import User
-from app.models.character import Character, CharacterCreate, CharacterRead, CharacterUpdate
+from app.models.character import (
+    Character,
+    CharacterBatchUpdate,
+    CharacterCreate,
+    CharacterRead,
+    CharacterUpdate,
+)
+from app.services.case_ownership import owns_case
+from app.services.characters import bulk_update_characters
 
-router = APIRouter()
+router = APIRouter(route_class=MsgPackRoute)
+
+MAX_BATCH_UPDATE_SIZE = 500
 
 
 @router.post("/", response_model=CharacterRead, status_code=status.HTTP_201_CREATED)
 async def create_character(
     character_data: CharacterCreate,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_user_session),
     user: User = Depends(current_active_user),
 ):
     """Create a new character."""
+    if not await owns_case(session, user.id, character_data.case_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Case not found"
+        )
+
     character = Character(**character_data.model_dump())
     session.add(character)
     await session.commit()
@@ -31,11 +48,17 @@ async def create_character(
 @router.get("/case/{case_id}", response_model=List[CharacterRead])
 async def list_case_characters(
     case_id: UUID,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     user: User = Depends(current_active_user),
 ):
     """List all characters for a specific case."""
     from sqlalchemy import select
+
+    if not await owns_case(session, user.id, case_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Case not found"
+        )
     
     result = await session.execute(
         select(Character).where(Character.case_id == case_id)
@@ -44,10 +67,46 @@ async def list_case_characters(
     return characters
 
 
+@router.patch("/case/{case_id}", response_model=List[CharacterRead])
+async def update_case_characters(
+    case_id: UUID,
+    batch: CharacterBatchUpdate,
+    session: AsyncSession = Depends(get_user_session),
+    user: User = Depends(current_active_user),
+):
+    """Update many characters of a case in one transaction."""
+    if not batch.updates:
+        return []
+
+    if len(batch.updates) > MAX_BATCH_UPDATE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_BATCH_UPDATE_SIZE} characters can be updated at once"
+        )
+
+    if not await owns_case(session, user.id, case_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Case not found"
+        )
+
+    characters, missing = await bulk_update_characters(session, case_id, batch.updates)
+
+    if missing:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Characters not found in case: {', '.join(sorted(map(str, missing)))}"
+        )
+
+    await session.commit()
+    return characters
+
+
 @router.get("/{character_id}", response_model=CharacterRead)
 async def get_character(
     character_id: UUID,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     user: User = Depends(current_active_user),
 ):
     """Get a specific character."""
@@ -58,7 +117,7 @@ async def get_character(
     )
     character = result.scalar_one_or_none()
     
-    if not character:
+    if not character or not await owns_case(session, user.id, character.case_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Character not found"
@@ -71,7 +130,7 @@ async def get_character(
 async def update_character(
     character_id: UUID,
     character_update: CharacterUpdate,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_user_session),
     user: User = Depends(current_active_user),
 ):
     """Update a character."""
@@ -82,7 +141,7 @@ async def update_character(
     )
     character = result.scalar_one_or_none()
     
-    if not character:
+    if not character or not await owns_case(session, user.id, character.case_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Character not found"
@@ -100,7 +159,7 @@ async def update_character(
 @router.delete("/{character_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_character(
     character_id: UUID,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_user_session),
     user: User = Depends(current_active_user),
 ):
     """Delete a character."""
@@ -111,7 +170,7 @@ async def delete_character(
     )
     character = result.scalar_one_or_none()
     
-    if not character:
+    if not character or not await owns_case(session, user.id, character.case_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Character not found"
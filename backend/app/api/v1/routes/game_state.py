@@ -1,27 +1,50 @@
 """Game state management routes."""
 
+from datetime import datetime, timezone
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from loguru import logger
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_read_session, get_user_session
+from app.api.negotiation import MsgPackRoute
 from app.auth.users import current_active_user
-from app.database import get_session
+from app.config import settings
 from app.models.user import User
+from app.models.game_event import GameEvent, GameEventRead, GameEventType, GameStateReplay
 from app.models.game_state import GameState, GameStateCreate, GameStateRead, GameStateUpdate
+from app.services.game_events import append_event, replay, state_payload
+from app.services.game_state_buffer import (
+    apply_pending,
+    buffer_tick,
+    clear_pending,
+    discard_pending,
+    get_pending,
+    is_bufferable,
+)
 
-router = APIRouter()
+router = APIRouter(route_class=MsgPackRoute)
 
 
 @router.post("/", response_model=GameStateRead, status_code=status.HTTP_201_CREATED)
 async def create_game_state(
     game_state_data: GameStateCreate,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_user_session),
     user: User = Depends(current_active_user),
 ):
     """Create a new game state for the current user."""
-    game_state = GameState(**game_state_data.model_dump())
+    # The game state always belongs to the caller, whatever the body says
+    game_state = GameState(**game_state_data.model_dump(exclude={"user_id"}), user_id=user.id)
     session.add(game_state)
+    append_event(
+        session,
+        user.id,
+        GameEventType.STATE_CREATED,
+        state_payload(game_state_data.model_dump()),
+    )
     await session.commit()
     await session.refresh(game_state)
     return game_state
@@ -29,7 +52,7 @@ async def create_game_state(
 
 @router.get("/me", response_model=GameStateRead)
 async def get_my_game_state(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     user: User = Depends(current_active_user),
 ):
     """Get the game state for the current user."""
@@ -45,6 +68,14 @@ async def get_my_game_state(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Game state not found"
         )
+
+    if settings.GAME_STATE_WRITE_BEHIND:
+        try:
+            pending, _ = await get_pending(user.id)
+        except RedisError as exc:
+            logger.warning(f"Game state buffer unavailable, serving stored values: {exc}")
+        else:
+            return apply_pending(GameStateRead.model_validate(game_state), pending)
     
     return game_state
 
@@ -52,7 +83,7 @@ async def get_my_game_state(
 @router.patch("/me", response_model=GameStateRead)
 async def update_my_game_state(
     game_state_update: GameStateUpdate,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_user_session),
     user: User = Depends(current_active_user),
 ):
     """Update the game state for the current user."""
@@ -70,17 +101,44 @@ async def update_my_game_state(
         )
     
     update_data = game_state_update.model_dump(exclude_unset=True)
+    logged_changes = state_payload(update_data)
+    buffer_version = None
+
+    if settings.GAME_STATE_WRITE_BEHIND:
+        try:
+            if is_bufferable(update_data):
+                # High-churn tick: buffer it and let the flush task persist it
+                pending = await buffer_tick(user.id, update_data)
+                return apply_pending(GameStateRead.model_validate(game_state), pending)
+
+            # Fold buffered ticks into this write so a later flush can't undo it
+            pending, buffer_version = await get_pending(user.id)
+            apply_pending(game_state, pending)
+            logged_changes = state_payload({**pending, **update_data})
+        except RedisError as exc:
+            logger.warning(f"Game state buffer unavailable, writing through: {exc}")
+
     for key, value in update_data.items():
         setattr(game_state, key, value)
+
+    if logged_changes:
+        append_event(session, user.id, GameEventType.STATE_UPDATED, logged_changes)
     
     await session.commit()
     await session.refresh(game_state)
+
+    if buffer_version is not None:
+        try:
+            await discard_pending(user.id, buffer_version)
+        except RedisError as exc:
+            logger.warning(f"Failed to discard flushed game state buffer: {exc}")
+
     return game_state
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_my_game_state(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_user_session),
     user: User = Depends(current_active_user),
 ):
     """Delete the game state for the current user."""
@@ -98,4 +156,57 @@ async def delete_my_game_state(
         )
     
     await session.delete(game_state)
+    append_event(session, user.id, GameEventType.STATE_DELETED, {})
     await session.commit()
+
+    if settings.GAME_STATE_WRITE_BEHIND:
+        try:
+            await clear_pending(user.id)
+        except RedisError as exc:
+            logger.warning(f"Failed to clear game state buffer: {exc}")
+
+
+@router.get("/me/events", response_model=List[GameEventRead])
+async def list_my_game_events(
+    before_id: Optional[int] = Query(None, description="Return events older than this id"),
+    limit: int = Query(50, ge=1, le=500),
+    session: AsyncSession = Depends(get_read_session),
+    user: User = Depends(current_active_user),
+):
+    """List the current user's game events, newest first."""
+    from sqlalchemy import select
+
+    query = select(GameEvent).where(GameEvent.user_id == user.id)
+    if before_id is not None:
+        query = query.where(GameEvent.id < before_id)
+    result = await session.execute(query.order_by(GameEvent.id.desc()).limit(limit))
+    return result.scalars().all()
+
+
+@router.get("/me/replay", response_model=GameStateReplay)
+async def replay_my_game_state(
+    at: Optional[datetime] = Query(None, description="Point in time (default: now)"),
+    session: AsyncSession = Depends(get_read_session),
+    user: User = Depends(current_active_user),
+):
+    """Rebuild the current user's game state at a point in time from the event log."""
+    if at is None:
+        at = datetime.utcnow()
+    elif at.tzinfo is not None:
+        # Event timestamps are naive UTC
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    result = await replay(session, user.id, at)
+
+    if result.state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game state not found"
+        )
+
+    return GameStateReplay(
+        **result.state,
+        user_id=user.id,
+        at=at,
+        event_id=result.event_id,
+        events_replayed=result.events_replayed,
+    )
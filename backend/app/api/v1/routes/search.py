@@ -0,0 +1,46 @@
+"""Search routes."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_read_session
+from app.api.negotiation import MsgPackRoute
+from app.auth.users import current_active_user
+from app.models.search import SearchPage
+from app.models.user import User
+from app.services.search import search
+
+router = APIRouter(route_class=MsgPackRoute)
+
+
+@router.get("/", response_model=SearchPage)
+async def search_cases_and_characters(
+    q: str = Query(..., min_length=1, max_length=256),
+    all_users: bool = Query(False, description="Search across all users (superusers only)"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
+    user: User = Depends(current_active_user),
+):
+    """Search case descriptions, testimony, alibis and dialogue."""
+    if all_users and not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only superusers can search across all users"
+        )
+
+    try:
+        return await search(
+            session,
+            q,
+            user_id=None if all_users else user.id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
@@ -1,13 +1,19 @@
 """Authentication backend configuration."""
 
+from typing import Optional
+from uuid import UUID
+
+import jwt
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
     JWTStrategy,
 )
+from fastapi_users.jwt import decode_jwt
 
 from app.config import settings
 
+JWT_AUDIENCE = ["fastapi-users:auth"]
 
 bearer_transport = BearerTransport(tokenUrl="auth/login")
 
@@ -25,3 +31,19 @@ auth_backend = AuthenticationBackend(
     transport=bearer_transport,
     get_strategy=get_jwt_strategy,
 )
+
+
+def bearer_user_id(authorization: str) -> Optional[UUID]:
+    """Get the user id of a valid bearer token from an Authorization header.
+
+    Only checks the token; the user may since have been deactivated.
+    """
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    try:
+        payload = decode_jwt(token, settings.JWT_SECRET_KEY, JWT_AUDIENCE)
+        return UUID(payload["sub"])
+    except (jwt.PyJWTError, KeyError, ValueError):
+        return None
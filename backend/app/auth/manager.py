@@ -1,14 +1,19 @@
 """User manager for authentication."""
 
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, Optional
 from uuid import UUID
 
 from fastapi import Depends, Request
-from fastapi_users import BaseUserManager, UUIDIDMixin
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, UUIDIDMixin, exceptions, schemas
+from loguru import logger
 
 from app.config import settings
 from app.models.user import User
 from app.auth.database import get_user_db
+from app.auth.password import password_helper
+from app.tasks.purge import schedule_user_purge
 
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
@@ -17,23 +22,95 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
     reset_password_token_secret = settings.SECRET_KEY
     verification_token_secret = settings.SECRET_KEY
 
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        """Authenticate a user, verifying the password in the hashing pool."""
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            await password_helper.hash_async(credentials.password)
+            return None
+
+        verified, updated_password_hash = await password_helper.verify_and_update_async(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+
+        return user
+
+    async def create(
+        self,
+        user_create: schemas.UC,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        """Create a user, hashing the password in the hashing pool."""
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await password_helper.hash_async(password)
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        """Hash a password change in the hashing pool before applying the update."""
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {key: value for key, value in update_dict.items() if key != "password"}
+            update_dict["hashed_password"] = await password_helper.hash_async(password)
+        return await super()._update(user, update_dict)
+
     async def on_after_register(self, user: User, request: Optional[Request] = None):
         """Called after user registration."""
-        print(f"User {user.id} has registered.")
+        logger.bind(user_id=str(user.id)).info(f"User {user.id} has registered")
 
     async def on_after_forgot_password(
         self, user: User, token: str, request: Optional[Request] = None
     ):
         """Called after forgot password request."""
-        print(f"User {user.id} has forgot their password. Reset token: {token}")
+        logger.bind(user_id=str(user.id)).info(f"User {user.id} requested a password reset")
+        # Tokens are credentials; only development logs may show them
+        if settings.DEBUG:
+            logger.bind(user_id=str(user.id)).debug(
+                f"Password reset token for user {user.id}: {token}"
+            )
 
     async def on_after_request_verify(
         self, user: User, token: str, request: Optional[Request] = None
     ):
         """Called after verification request."""
-        print(f"Verification requested for user {user.id}. Verification token: {token}")
+        logger.bind(user_id=str(user.id)).info(f"User {user.id} requested verification")
+        if settings.DEBUG:
+            logger.bind(user_id=str(user.id)).debug(
+                f"Verification token for user {user.id}: {token}"
+            )
+
+    async def delete(self, user: User, request: Optional[Request] = None) -> None:
+        """Deactivate a user now and purge their data in the background."""
+        await self.on_before_delete(user, request)
+        # update() commits, so the purge task always sees the soft delete
+        await self.user_db.update(
+            user, {"is_active": False, "deleted_at": datetime.utcnow()}
+        )
+        await schedule_user_purge(user.id)
+        await self.on_after_delete(user, request)
 
 
 async def get_user_manager(user_db=Depends(get_user_db)):
     """Get user manager instance."""
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper)
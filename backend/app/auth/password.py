@@ -0,0 +1,62 @@
+"""Password hashing off the event loop."""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi_users.password import PasswordHelper
+
+from app.config import settings
+
+# Module-level helper so process pool workers can build their own copy
+_helper = PasswordHelper()
+
+
+def _hash(password: str) -> str:
+    return _helper.hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return _helper.verify_and_update(plain_password, hashed_password)
+
+
+class PooledPasswordHelper(PasswordHelper):
+    """Password helper that hashes and verifies in a bounded worker pool.
+
+    The synchronous methods inherited from ``PasswordHelper`` still work for
+    any fastapi-users code path that calls them; ``UserManager`` uses the
+    async variants so login and registration never block the event loop.
+    At most ``max_workers`` hashes run at once; further calls wait.
+    """
+
+    def __init__(self, max_workers: int, use_processes: bool = False):
+        super().__init__()
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=max_workers)
+            if use_processes
+            else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        )
+
+    async def hash_async(self, password: str) -> str:
+        """Hash a password in the pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _hash, password)
+
+    async def verify_and_update_async(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify a password in the pool, returning a new hash if it needs upgrading."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, _verify_and_update, plain_password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_helper = PooledPasswordHelper(
+    max_workers=settings.PASSWORD_HASH_CONCURRENCY,
+    use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+)
@@ -0,0 +1,13 @@
+"""Redis client configuration."""
+
+from redis import asyncio as aioredis
+
+from app.config import settings
+
+# Shared async Redis client (connection pool is created lazily)
+redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def close_redis() -> None:
+    """Close Redis connections."""
+    await redis_client.aclose()
@@ -1,17 +1,36 @@
 """Database configuration and session management."""
 
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional
+from uuid import UUID
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlmodel import SQLModel
 
+from app.cache import redis_client
 from app.config import settings
 
+
+def _async_url(url: str) -> str:
+    """Convert a PostgreSQL URL to its asyncpg form."""
+    return url.replace("postgresql://", "postgresql+asyncpg://")
+
+
 # Create async engine
 engine = create_async_engine(
-    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
-    echo=settings.DEBUG,
+    _async_url(settings.DATABASE_URL),
     future=True,
 )
 
@@ -20,6 +39,143 @@ async_session_maker = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Celery tasks run each job in a fresh event loop, so their connections
+# must not be pooled across jobs
+worker_engine = create_async_engine(
+    _async_url(settings.DATABASE_URL),
+    future=True,
+    poolclass=NullPool,
+)
+worker_session_maker = sessionmaker(
+    worker_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# Read replicas (optional)
+replica_engines = [
+    create_async_engine(
+        _async_url(url),
+        future=True,
+        pool_pre_ping=True,
+    )
+    for url in settings.database_replica_urls_list
+]
+replica_session_makers = [
+    sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+    for replica in replica_engines
+]
+
+# User shards (optional): every table except users lives on the shard picked
+# for its owner; the primary keeps the users table
+shard_engines = [
+    create_async_engine(
+        _async_url(url),
+        future=True,
+        pool_pre_ping=True,
+    )
+    for url in settings.database_shard_urls_list
+]
+shard_session_makers = [
+    sessionmaker(shard, class_=AsyncSession, expire_on_commit=False)
+    for shard in shard_engines
+]
+worker_shard_engines = [
+    create_async_engine(
+        _async_url(url),
+        future=True,
+        poolclass=NullPool,
+    )
+    for url in settings.database_shard_urls_list
+]
+worker_shard_session_makers = [
+    sessionmaker(shard, class_=AsyncSession, expire_on_commit=False)
+    for shard in worker_shard_engines
+]
+
+USERS_TABLE = "users"
+
+_replica_cursor = itertools.count()
+_replica_down_until: Dict[int, float] = {}
+
+
+def _pin_key(user_id: UUID) -> str:
+    return f"primary_pin:{user_id}"
+
+
+async def pin_to_primary(user_id: UUID) -> None:
+    """Route a user's reads to the primary for the read-your-writes window.
+
+    The pin lives in Redis so it holds on every API worker, not just the one
+    that served the write.
+    """
+    try:
+        await redis_client.set(_pin_key(user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+    except RedisError as exc:
+        logger.warning(f"Failed to pin user to the primary: {exc}")
+
+
+async def is_pinned_to_primary(user_id: UUID) -> bool:
+    """Check whether a user wrote recently enough to need the primary.
+
+    Answers yes when Redis is unavailable, since a stale read is worse than
+    a read on the primary.
+    """
+    try:
+        return bool(await redis_client.exists(_pin_key(user_id)))
+    except RedisError as exc:
+        logger.warning(f"Primary pin store unavailable, reading from the primary: {exc}")
+        return True
+
+
+def _replica_order() -> List[int]:
+    """Get healthy replica indexes in round-robin order."""
+    count = len(replica_session_makers)
+    start = next(_replica_cursor) % count
+    now = time.monotonic()
+    return [
+        index
+        for index in ((start + offset) % count for offset in range(count))
+        if _replica_down_until.get(index, 0.0) <= now
+    ]
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash; adding a bucket only moves ``1/buckets`` of the keys."""
+    result, candidate = -1, 0
+    while candidate < buckets:
+        result = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((result + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return result
+
+
+def shard_for_user(user_id: UUID, shard: Optional[int] = None) -> Optional[int]:
+    """Get the index of the shard holding a user's rows, or None when sharding is off.
+
+    ``shard`` is the user's stored placement (``User.shard``), set when the
+    rebalancing tool moves them; otherwise the shard is derived from the id.
+    """
+    count = len(shard_session_makers)
+    if not count:
+        return None
+    if shard is not None and 0 <= shard < count:
+        return shard
+    return jump_hash(user_id.int & 0xFFFFFFFFFFFFFFFF, count)
+
+
+def user_session_maker(
+    user_id: UUID, shard: Optional[int] = None, worker: bool = False
+) -> sessionmaker:
+    """Get the session factory for the database holding a user's rows."""
+    index = shard_for_user(user_id, shard)
+    if index is None:
+        return worker_session_maker if worker else async_session_maker
+    return (worker_shard_session_makers if worker else shard_session_makers)[index]
+
+
+def data_worker_session_makers() -> List[sessionmaker]:
+    """Get worker session factories for every database holding user-owned rows."""
+    return worker_shard_session_makers or [worker_session_maker]
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Get database session."""
@@ -27,12 +183,163 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+@asynccontextmanager
+async def user_session(user_id: UUID, shard: Optional[int] = None) -> AsyncIterator[AsyncSession]:
+    """Open a session on the database holding a user's rows."""
+    async with user_session_maker(user_id, shard)() as session:
+        yield session
+
+
+@asynccontextmanager
+async def read_session(
+    user_id: Optional[UUID] = None, shard: Optional[int] = None
+) -> AsyncIterator[AsyncSession]:
+    """Open a session for read-only work.
+
+    Replicas are tried in round-robin order; a replica that fails to connect
+    is skipped for ``REPLICA_FAILOVER_COOLDOWN_SECONDS``. Falls back to the
+    primary when no replica is configured or healthy, or when the user is
+    pinned to the primary after a recent write. With sharding enabled, a
+    user's reads go to their shard (replicas only serve the primary).
+    """
+    if shard_session_makers and user_id is not None:
+        async with user_session(user_id, shard) as session:
+            yield session
+        return
+
+    if replica_session_makers and not (user_id and await is_pinned_to_primary(user_id)):
+        for index in _replica_order():
+            session = replica_session_makers[index]()
+            try:
+                await session.connection()
+            except (OSError, DBAPIError, asyncio.TimeoutError) as exc:
+                await session.close()
+                _replica_down_until[index] = (
+                    time.monotonic() + settings.REPLICA_FAILOVER_COOLDOWN_SECONDS
+                )
+                logger.warning(f"Read replica {index} unavailable, failing over: {exc}")
+                continue
+            try:
+                yield session
+            finally:
+                await session.close()
+            return
+
+    async with async_session_maker() as session:
+        yield session
+
+
+def _add_months(day: date, months: int) -> date:
+    """Get the first day of the month ``months`` after ``day``'s month."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def ensure_decision_partitions(
+    conn: AsyncConnection, months_ahead: int = settings.DECISION_PARTITION_MONTHS_AHEAD
+) -> List[str]:
+    """Create monthly ``decisions`` partitions from this month on.
+
+    A default partition catches rows outside every monthly range so inserts
+    never fail if this falls behind. Postgres refuses to create a partition
+    while the default holds rows for its range, so such rows are moved into
+    the new partition first. Returns the partitions checked, or nothing if
+    ``decisions`` is still a plain table (created before partitioning).
+    """
+    relkind = await conn.execute(
+        text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass('decisions')")
+    )
+    if relkind.scalar_one_or_none() != "p":
+        logger.error(
+            "decisions is not a partitioned table; skipping its partitions until it is "
+            "recreated by the partitioning migration"
+        )
+        return []
+
+    await conn.execute(
+        text("CREATE TABLE IF NOT EXISTS decisions_default PARTITION OF decisions DEFAULT")
+    )
+    this_month = _add_months(datetime.utcnow().date(), 0)
+    names = []
+    for offset in range(months_ahead + 1):
+        start = _add_months(this_month, offset)
+        name = f"decisions_p{start:%Y_%m}"
+        exists = await conn.execute(text("SELECT to_regclass(:name)"), {"name": name})
+        if exists.scalar_one() is None:
+            await _create_decision_partition(conn, name, start, _add_months(start, 1))
+        names.append(name)
+    return names
+
+
+async def _create_decision_partition(
+    conn: AsyncConnection, name: str, start: date, end: date
+) -> None:
+    """Create one monthly partition, moving its rows out of the default partition."""
+    in_range = "created_at >= :start AND created_at < :end"
+    bounds = {"start": start, "end": end}
+    bound_spec = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+    stray = await conn.execute(
+        text(f"SELECT count(*) FROM decisions_default WHERE {in_range}"), bounds
+    )
+    stray_rows = stray.scalar_one()
+    if not stray_rows:
+        await conn.execute(text(f"CREATE TABLE {name} PARTITION OF decisions {bound_spec}"))
+        return
+
+    logger.warning(f"Moving {stray_rows} rows from decisions_default into new partition {name}")
+    await conn.execute(text("ALTER TABLE decisions DETACH PARTITION decisions_default"))
+    await conn.execute(text(f"CREATE TABLE {name} PARTITION OF decisions {bound_spec}"))
+    await conn.execute(
+        text(f"INSERT INTO {name} SELECT * FROM decisions_default WHERE {in_range}"), bounds
+    )
+    await conn.execute(text(f"DELETE FROM decisions_default WHERE {in_range}"), bounds)
+    await conn.execute(text("ALTER TABLE decisions ATTACH PARTITION decisions_default DEFAULT"))
+
+
+def _create_shard_tables(conn: Connection) -> None:
+    """Create the user-owned tables on a shard, without foreign keys to users."""
+    existing = set(inspect(conn).get_table_names())
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name == USERS_TABLE or table.name in existing:
+            continue
+        foreign_keys = [
+            constraint
+            for constraint in table.foreign_key_constraints
+            if constraint.referred_table.name != USERS_TABLE
+        ]
+        conn.execute(CreateTable(table, include_foreign_key_constraints=foreign_keys))
+        for index in table.indexes:
+            conn.execute(CreateIndex(index))
+
+
+def _create_global_tables(conn: Connection) -> None:
+    """Create only the tables the primary keeps when user data is sharded."""
+    SQLModel.metadata.create_all(conn, tables=[SQLModel.metadata.tables[USERS_TABLE]])
+
+
 async def init_db() -> None:
-    """Initialize database tables."""
+    """Initialize database tables.
+
+    With sharding enabled the primary only gets the global tables, so a
+    query that misses its shard fails instead of reading empty tables.
+    """
     async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+        if shard_engines:
+            await conn.run_sync(_create_global_tables)
+        else:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await ensure_decision_partitions(conn)
+    for shard in shard_engines:
+        async with shard.begin() as conn:
+            await conn.run_sync(_create_shard_tables)
+            await ensure_decision_partitions(conn)
 
 
 async def close_db() -> None:
     """Close database connections."""
     await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+    for shard in shard_engines:
+        await shard.dispose()
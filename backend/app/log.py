@@ -0,0 +1,135 @@
+"""Structured logging.
+
+Everything logs through loguru: standard library loggers (uvicorn, Celery,
+SQLAlchemy) are routed into it, at ``LOG_LEVEL`` and above. The sink is
+queue-backed (``enqueue=True``): the calling thread formats the record and
+puts the message on a queue, and a background thread writes it, so request
+handlers never block on stderr. Set ``LOG_JSON=True`` to emit one JSON
+object per line.
+
+Every record carries the ``request_id`` of the API request it belongs to,
+or of the request that enqueued the Celery task running it, so a request
+can be followed from the API into the worker.
+
+High-volume events are sampled: a record bound with ``sample=<rate>`` is
+kept with that probability, and the draw happens before it is queued.
+Executed SQL is such a channel (``SQL_LOG_SAMPLE_RATE``) rather than engine
+echo, which logged every statement on the request path. It has its own sink,
+so sampling SQL does not lower ``LOG_LEVEL`` for everything else.
+"""
+
+import inspect
+import logging
+import random
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "{extra[request_id]} | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan>"
+    " - <level>{message}</level>"
+)
+NO_REQUEST_ID = "-"
+SQL_CHANNEL = "sql"
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class InterceptHandler(logging.Handler):
+    """Route standard library log records into loguru."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            level: Any = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        # Report the caller of the logging call, not this handler
+        frame, depth = inspect.currentframe(), 0
+        while frame is not None and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+            frame = frame.f_back
+            depth += 1
+
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+
+def _add_request_id(record: Dict[str, Any]) -> None:
+    record["extra"].setdefault("request_id", request_id.get() or NO_REQUEST_ID)
+
+
+def _keep(record: Dict[str, Any]) -> bool:
+    """Drop SQL records and the records of sampled channels that lose their draw."""
+    if record["extra"].get("channel") == SQL_CHANNEL:
+        return False
+    rate = record["extra"].get("sample")
+    return rate is None or random.random() < rate
+
+
+def _is_sql(record: Dict[str, Any]) -> bool:
+    return record["extra"].get("channel") == SQL_CHANNEL
+
+
+def configure_logging() -> None:
+    """Replace the default handlers with the queue-backed sink."""
+    logger.remove()
+    logger.configure(patcher=_add_request_id)
+    logger.add(
+        sys.stderr,
+        level=settings.LOG_LEVEL,
+        format=TEXT_FORMAT,
+        serialize=settings.LOG_JSON,
+        filter=_keep,
+        enqueue=True,
+        backtrace=settings.DEBUG,
+        diagnose=settings.DEBUG,
+    )
+    if settings.SQL_LOG_SAMPLE_RATE > 0:
+        logger.add(
+            sys.stderr,
+            level="DEBUG",
+            format=TEXT_FORMAT,
+            serialize=settings.LOG_JSON,
+            filter=_is_sql,
+            enqueue=True,
+        )
+
+    # Filter stdlib records before they are built and routed, not in loguru
+    logging.basicConfig(handlers=[InterceptHandler()], level=settings.LOG_LEVEL, force=True)
+    for name in ("uvicorn", "uvicorn.error", "celery", "sqlalchemy"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    # Replaced by the request log, which carries the request id
+    logging.getLogger("uvicorn.access").handlers = []
+    logging.getLogger("uvicorn.access").propagate = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and random.random() < settings.SQL_LOG_SAMPLE_RATE:
+        context._log_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_log_started", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    logger.bind(channel=SQL_CHANNEL, duration_ms=round(duration_ms, 3)).debug(
+        f"SQL ({duration_ms:.1f} ms): {statement}"
+    )
+
+
+def install_sql_logging(engines: Iterable[AsyncEngine]) -> None:
+    """Log a sample of the SQL statements executed on these engines."""
+    if settings.SQL_LOG_SAMPLE_RATE <= 0:
+        return
+    for engine in engines:
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -6,8 +6,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
+from app.auth.password import password_helper
+from app.cache import close_redis
 from app.config import settings
-from app.database import close_db, init_db
+from app.database import close_db, engine, init_db, replica_engines, shard_engines
+from app.log import configure_logging, install_sql_logging
+from app.middleware import IdempotencyMiddleware, ProfilingMiddleware, RequestIdMiddleware
+from app.services.profiling import install_sql_capture
+
+configure_logging()
+install_sql_logging([engine, *replica_engines, *shard_engines])
 
 
 @asynccontextmanager
@@ -20,6 +28,11 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application...")
     await close_db()
     logger.info("Database connections closed")
+    await close_redis()
+    logger.info("Redis connections closed")
+    password_helper.shutdown()
+    # Drain the log queue before the process exits
+    await logger.complete()
 
 
 # Create FastAPI app
@@ -30,7 +43,25 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Configure CORS
+# Replay retried create requests that carry an Idempotency-Key
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=[
+        f"{settings.API_V1_PREFIX}/cases/",
+        f"{settings.API_V1_PREFIX}/characters/",
+        f"{settings.API_V1_PREFIX}/game-state/",
+    ],
+)
+
+# Profile superuser-requested and sampled requests, SQL included
+if settings.PROFILING_ENABLED:
+    install_sql_capture([engine, *replica_engines, *shard_engines])
+    app.add_middleware(ProfilingMiddleware)
+
+# Tag requests with an id carried by their logs and tasks, and log them
+app.add_middleware(RequestIdMiddleware)
+
+# Configure CORS (added last so it wraps every other middleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins_list,
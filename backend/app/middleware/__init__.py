@@ -0,0 +1,7 @@
+"""ASGI middleware."""
+
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.request_id import RequestIdMiddleware
+
+__all__ = ["IdempotencyMiddleware", "ProfilingMiddleware", "RequestIdMiddleware"]
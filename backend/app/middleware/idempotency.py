@@ -0,0 +1,267 @@
+"""Idempotency-Key support for create endpoints."""
+
+import asyncio
+import base64
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from loguru import logger
+from redis.exceptions import RedisError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.backend import bearer_user_id
+from app.cache import redis_client
+from app.config import settings
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+PENDING = "pending"
+COMPLETED = "completed"
+POLL_INTERVAL_SECONDS = 0.05
+
+# Extend a claim's expiry if this request still holds it
+_REFRESH = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class IdempotencyMiddleware:
+    """Replay stored responses for requests that repeat an Idempotency-Key.
+
+    The first request with a given key claims it in Redis and runs normally.
+    A successful (2xx) response is stored for ``IDEMPOTENCY_TTL_SECONDS``;
+    any other outcome releases the key so the client can retry for real.
+    Replays are answered from Redis before any database work, and concurrent
+    duplicates wait for the first request to finish. The claim expires after
+    ``IDEMPOTENCY_LOCK_SECONDS`` and is extended while the request runs, so
+    only a request whose worker died loses it. Keys are scoped to the
+    user id of the caller's bearer token (so a refreshed token still
+    matches), method, path and Accept header; requests without a valid
+    token pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str], methods: Iterable[str] = ("POST",)):
+        self.app = app
+        self.paths = set(paths)
+        self.methods = set(methods)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.methods
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+
+        user_id = bearer_user_id(headers.get(b"authorization", b"").decode("latin-1"))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        body, receive = await _buffer_body(receive)
+        key = _cache_key(scope, headers, user_id, idempotency_key)
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        pending = json.dumps({"state": PENDING, "fingerprint": fingerprint, "claim": uuid4().hex})
+
+        try:
+            record = await _claim_or_wait(key, fingerprint, pending)
+        except RedisError as exc:
+            logger.warning(f"Idempotency store unavailable, passing request through: {exc}")
+            await self.app(scope, receive, send)
+            return
+
+        if record is None:
+            await _run_and_store(self.app, key, fingerprint, pending, scope, receive, send)
+        elif record["fingerprint"] != fingerprint:
+            await _send_error(
+                send, 422, "Idempotency-Key was reused with a different request body"
+            )
+        elif record["state"] != COMPLETED:
+            await _send_error(
+                send, 409, "A request with this Idempotency-Key is still in progress"
+            )
+        else:
+            await _replay(record, send)
+
+
+def _cache_key(
+    scope: Scope, headers: Dict[bytes, bytes], user_id: UUID, idempotency_key: bytes
+) -> str:
+    """Build the Redis key for a request."""
+    digest = hashlib.sha256()
+    for part in (
+        user_id.bytes,
+        scope["method"].encode(),
+        scope["path"].encode(),
+        headers.get(b"accept", b""),
+        idempotency_key,
+    ):
+        digest.update(part)
+        digest.update(b"\0")
+    return f"idempotency:{digest.hexdigest()}"
+
+
+async def _buffer_body(receive: Receive) -> Tuple[bytes, Receive]:
+    """Read the full request body and return a receive callable that replays it."""
+    chunks: List[bytes] = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    body = b"".join(chunks)
+    delivered = False
+
+    async def replay_receive() -> Message:
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay_receive
+
+
+async def _claim_or_wait(key: str, fingerprint: str, pending: str) -> Optional[Dict[str, Any]]:
+    """Claim the key with the ``pending`` record, or wait for its holder to finish.
+
+    Returns None when this request now owns the key, otherwise the stored
+    record (which is still pending if the wait timed out).
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_LOCK_SECONDS
+
+    while True:
+        claimed = await redis_client.set(
+            key, pending, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS
+        )
+        if claimed:
+            return None
+
+        raw = await redis_client.get(key)
+        if raw is None:
+            # Released by a failed request between SET and GET
+            continue
+
+        record = json.loads(raw)
+        if (
+            record["state"] == COMPLETED
+            or record["fingerprint"] != fingerprint
+            or loop.time() >= deadline
+        ):
+            return record
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+async def _hold_claim(key: str, pending: str) -> None:
+    """Keep extending a claim's expiry until cancelled."""
+    while True:
+        await asyncio.sleep(settings.IDEMPOTENCY_LOCK_SECONDS / 3)
+        try:
+            await redis_client.eval(
+                _REFRESH, 1, key, pending, settings.IDEMPOTENCY_LOCK_SECONDS
+            )
+        except RedisError as exc:
+            logger.warning(f"Failed to extend idempotency claim: {exc}")
+
+
+async def _run_and_store(
+    app: ASGIApp,
+    key: str,
+    fingerprint: str,
+    pending: str,
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+) -> None:
+    """Run the request and store its response under the claimed key."""
+    start: Dict[str, Any] = {}
+    chunks: List[bytes] = []
+
+    async def capture_send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+        await send(message)
+
+    holder = asyncio.create_task(_hold_claim(key, pending))
+    try:
+        await app(scope, receive, capture_send)
+    except BaseException:
+        await _release(key)
+        raise
+    finally:
+        holder.cancel()
+
+    status_code = start.get("status", 500)
+    if not 200 <= status_code < 300:
+        # Failures (auth, conflicts, validation, rate limits, server errors) may
+        # succeed on a later attempt; only successful creates are final
+        await _release(key)
+        return
+
+    record = {
+        "state": COMPLETED,
+        "fingerprint": fingerprint,
+        "status": status_code,
+        "headers": [
+            [name.decode("latin-1"), value.decode("latin-1")]
+            for name, value in start.get("headers", [])
+        ],
+        "body": base64.b64encode(b"".join(chunks)).decode("ascii"),
+    }
+    try:
+        await redis_client.set(key, json.dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS)
+    except RedisError as exc:
+        logger.warning(f"Failed to store idempotent response: {exc}")
+
+
+async def _release(key: str) -> None:
+    """Drop a claim so the request can be retried."""
+    try:
+        await redis_client.delete(key)
+    except RedisError as exc:
+        logger.warning(f"Failed to release idempotency key: {exc}")
+
+
+async def _replay(record: Dict[str, Any], send: Send) -> None:
+    """Send a stored response."""
+    headers = [
+        (name.encode("latin-1"), value.encode("latin-1"))
+        for name, value in record["headers"]
+    ]
+    headers.append((REPLAYED_HEADER, b"true"))
+    await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+    await send({"type": "http.response.body", "body": base64.b64decode(record["body"])})
+
+
+async def _send_error(send: Send, status_code: int, detail: str) -> None:
+    """Send a JSON error response."""
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
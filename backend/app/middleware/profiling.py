@@ -0,0 +1,124 @@
+"""On-demand request profiling."""
+
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from loguru import logger
+from pyinstrument import Profiler
+from sqlalchemy import select
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.backend import bearer_user_id
+from app.config import settings
+from app.database import async_session_maker
+from app.models.profile import ProfileReport, SqlTiming
+from app.models.user import User
+from app.services.profiling import save_profile, sql_log
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_INTERVAL_SECONDS = 0.001
+
+
+class ProfilingMiddleware:
+    """Profile requests a superuser asks for, plus a random sample of traffic.
+
+    A request is profiled when it carries ``X-Profile: 1`` from a superuser
+    or is picked with probability ``PROFILE_SAMPLE_RATE``. It then runs under
+    pyinstrument (which follows the request's own task across awaits) with
+    its SQL statements timed, and the response carries ``X-Profile-Id``.
+    The report is saved after the response is sent. Other requests only pay
+    for a header scan and, when sampling, a random draw.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = settings.PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = any(
+            name == PROFILE_HEADER and value in (b"1", b"true")
+            for name, value in scope["headers"]
+        )
+        if requested and await _is_superuser(scope):
+            trigger = "header"
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            trigger = "sample"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        await _profile(self.app, trigger, scope, receive, send)
+
+
+async def _is_superuser(scope: Scope) -> bool:
+    """Check whether the request's bearer token belongs to an active superuser."""
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    user_id = bearer_user_id(authorization)
+    if user_id is None:
+        return False
+
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(User.is_superuser).where(
+                User.id == user_id,
+                User.is_active.is_(True),
+                User.deleted_at.is_(None),
+            )
+        )
+        return bool(result.scalar_one_or_none())
+
+
+async def _profile(app: ASGIApp, trigger: str, scope: Scope, receive: Receive, send: Send) -> None:
+    """Run a request under the profiler and save the report."""
+    profile_id = uuid4().hex
+    status_code: Optional[int] = None
+    statements: List[Dict[str, Any]] = []
+
+    async def send_with_id(message: Message) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            headers = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+            message = {**message, "headers": headers}
+        await send(message)
+
+    started_at = datetime.utcnow()
+    started = time.perf_counter()
+    token = sql_log.set(statements)
+    profiler = Profiler(interval=PROFILE_INTERVAL_SECONDS, async_mode="enabled")
+    profiler.start()
+    try:
+        await app(scope, receive, send_with_id)
+    finally:
+        profiler.stop()
+        sql_log.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            report = ProfileReport(
+                id=profile_id,
+                method=scope["method"],
+                path=scope["path"],
+                query_string=scope.get("query_string", b"").decode("latin-1"),
+                status_code=status_code,
+                trigger=trigger,
+                started_at=started_at,
+                duration_ms=duration_ms,
+                sql_count=len(statements),
+                sql_duration_ms=sum(statement["duration_ms"] for statement in statements),
+                sql=[SqlTiming(**statement) for statement in statements],
+            )
+            # Rendering walks the whole call tree; keep it off the event loop
+            html = await asyncio.to_thread(profiler.output_html)
+            await save_profile(report, html)
+        except Exception as exc:
+            logger.warning(f"Failed to save request profile {profile_id}: {exc}")
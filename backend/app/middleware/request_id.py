@@ -0,0 +1,69 @@
+"""Request id correlation and request logging."""
+
+import re
+import time
+from typing import Optional
+from uuid import uuid4
+
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.log import request_id
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Ids from clients are echoed into logs and headers, so only accept plain tokens
+VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """Tag each request with an id and log it once it completes.
+
+    The id comes from the ``X-Request-ID`` header when it is a plain token,
+    otherwise a new one is generated. It is set for the request's context
+    (so every log record and any Celery task enqueued by the request carry
+    it) and returned in the ``X-Request-ID`` response header. Completed
+    requests are logged with a ``ACCESS_LOG_SAMPLE_RATE`` sample, except
+    server errors, which are always logged.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = settings.ACCESS_LOG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(REQUEST_ID_HEADER, b"").decode("latin-1")
+        current_id = incoming if VALID_REQUEST_ID.match(incoming) else uuid4().hex
+        status_code: Optional[int] = None
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [*message.get("headers", []), (REQUEST_ID_HEADER, current_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_id.set(current_id)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            request_log = logger.bind(
+                channel="access",
+                method=scope["method"],
+                path=scope["path"],
+                status_code=status_code,
+                duration_ms=round(duration_ms, 3),
+            )
+            message = f"{scope['method']} {scope['path']} {status_code} ({duration_ms:.1f} ms)"
+            if status_code is None or status_code >= 500:
+                request_log.warning(message)
+            else:
+                request_log.bind(sample=self.sample_rate).info(message)
+            request_id.reset(token)
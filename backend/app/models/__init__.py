@@ -1,10 +1,27 @@
 """Database models."""
 
 from app.models.user import User, UserCreate, UserRead, UserUpdate
-from app.models.case import Case, CaseCreate, CaseRead, CaseUpdate
-from app.models.character import Character, CharacterCreate, CharacterRead, CharacterUpdate
+from app.models.case import Case, CaseCreate, CaseRead, CaseUpdate, EvidenceConnection
+from app.models.character import (
+    Character,
+    CharacterBatchUpdate,
+    CharacterCreate,
+    CharacterRead,
+    CharacterUpdate,
+    SuspectScore,
+)
 from app.models.game_state import GameState, GameStateCreate, GameStateRead, GameStateUpdate
 from app.models.decision import Decision, DecisionCreate, DecisionRead, DecisionUpdate
+from app.models.game_event import (
+    GameEvent,
+    GameEventRead,
+    GameEventType,
+    GameStateReplay,
+    GameStateSnapshot,
+)
+from app.models.search import SearchHit, SearchKind, SearchPage
+from app.models.archive import ArchivedCase, ArchivedCaseRead
+from app.models.profile import ProfileReport, ProfileSummary, SqlTiming
 
 __all__ = [
     "User",
@@ -15,10 +32,13 @@ __all__ = [
     "CaseCreate",
     "CaseRead",
     "CaseUpdate",
+    "EvidenceConnection",
     "Character",
+    "CharacterBatchUpdate",
     "CharacterCreate",
     "CharacterRead",
     "CharacterUpdate",
+    "SuspectScore",
     "GameState",
     "GameStateCreate",
     "GameStateRead",
@@ -27,4 +47,17 @@ __all__ = [
     "DecisionCreate",
     "DecisionRead",
     "DecisionUpdate",
+    "GameEvent",
+    "GameEventRead",
+    "GameEventType",
+    "GameStateReplay",
+    "GameStateSnapshot",
+    "SearchHit",
+    "SearchKind",
+    "SearchPage",
+    "ArchivedCase",
+    "ArchivedCaseRead",
+    "ProfileReport",
+    "ProfileSummary",
+    "SqlTiming",
 ]
@@ -0,0 +1,38 @@
+"""Case archive models."""
+
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import Column, LargeBinary
+from sqlmodel import Field, SQLModel
+
+from app.models.case import CaseDifficulty, CaseRead, CaseStatus
+from app.models.character import CharacterRead
+from app.models.decision import DecisionRead
+
+
+class ArchivedCase(SQLModel, table=True):
+    """Finished case moved out of the hot tables with its characters and decisions."""
+
+    __tablename__ = "archived_cases"
+
+    id: UUID = Field(primary_key=True)  # Original case id
+    user_id: UUID = Field(foreign_key="users.id", index=True)
+    title: str
+    difficulty: CaseDifficulty
+    status: CaseStatus
+    completed_at: Optional[datetime] = None
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+
+    # zlib-compressed JSON of the case, its characters and decisions
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+
+class ArchivedCaseRead(SQLModel):
+    """Archived case read schema."""
+
+    case: CaseRead
+    characters: List[CharacterRead]
+    decisions: List[DecisionRead]
+    archived_at: datetime
@@ -2,9 +2,11 @@
 
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID, uuid4
 
+from sqlalchemy import Column, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, SQLModel, Relationship
 
 
@@ -42,6 +44,10 @@ class Case(CaseBase, table=True):
     """Case database model."""
 
     __tablename__ = "cases"
+    __table_args__ = (
+        Index("ix_cases_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_cases_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(foreign_key="users.id")
@@ -49,12 +55,26 @@ class Case(CaseBase, table=True):
     completed_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    deleted_at: Optional[datetime] = Field(default=None, index=True)
 
     # Evidence and clues
     evidence_data: Optional[str] = None  # JSON string
     clues_found: int = 0
     total_clues: int = 3
 
+    # Full-text search, maintained by Postgres on every write
+    search_vector: Optional[str] = Field(
+        default=None,
+        sa_column=Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
+
     # Relationships
     decisions: list["Decision"] = Relationship(back_populates="case")
 
@@ -87,3 +107,13 @@ class CaseUpdate(SQLModel):
     completed_at: Optional[datetime] = None
     evidence_data: Optional[str] = None
     clues_found: Optional[int] = None
+
+
+class EvidenceConnection(SQLModel):
+    """Evidence connection query schema."""
+
+    source: str
+    target: str
+    connected: bool
+    path: List[str] = []
+    linking_clues: List[str] = []
@@ -2,9 +2,11 @@
 
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional
 from uuid import UUID, uuid4
 
+from sqlalchemy import Column, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, SQLModel
 
 
@@ -33,6 +35,9 @@ class Character(CharacterBase, table=True):
     """Character database model."""
 
     __tablename__ = "characters"
+    __table_args__ = (
+        Index("ix_characters_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     case_id: UUID = Field(foreign_key="cases.id")
@@ -42,6 +47,22 @@ class Character(CharacterBase, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    # Full-text search, maintained by Postgres on every write
+    search_vector: Optional[str] = Field(
+        default=None,
+        sa_column=Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(testimony, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(alibi, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+                "setweight(to_tsvector('english', coalesce(dialogue_history, '')), 'D')",
+                persisted=True,
+            ),
+        ),
+    )
+
 
 class CharacterCreate(CharacterBase):
     """Character creation schema."""
@@ -69,3 +90,23 @@ class CharacterUpdate(SQLModel):
     dialogue_history: Optional[str] = None
     testimony: Optional[str] = None
     alibi: Optional[str] = None
+
+
+class CharacterBatchUpdate(SQLModel):
+    """Character batch update schema."""
+
+    updates: Dict[UUID, CharacterUpdate]
+
+
+class SuspectScore(SQLModel):
+    """Suspect ranking schema."""
+
+    character_id: UUID
+    case_id: UUID
+    name: str
+    role: CharacterRole
+    score: float
+    probability: float
+    rank: int
+    clues_linked: int
+    evidence_linked: int
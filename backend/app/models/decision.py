@@ -40,14 +40,20 @@ class DecisionBase(SQLModel):
 
 
 class Decision(DecisionBase, table=True):
-    """Decision database model."""
+    """Decision database model.
+
+    Range-partitioned by month on ``created_at`` (see
+    ``app.database.ensure_decision_partitions``), which is therefore part of
+    the primary key.
+    """
 
     __tablename__ = "decisions"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    case_id: UUID = Field(foreign_key="cases.id")
+    case_id: UUID = Field(foreign_key="cases.id", index=True)
     character_id: Optional[UUID] = Field(default=None, foreign_key="characters.id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
 
     # Decision details
     input_data: Optional[str] = None  # JSON string
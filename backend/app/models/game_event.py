@@ -0,0 +1,74 @@
+"""Game event log models."""
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import BigInteger, Column, Index
+from sqlmodel import Field, SQLModel
+
+from app.models.game_state import GameStateBase
+
+
+class GameEventType(str, Enum):
+    """Game event type enum."""
+
+    STATE_CREATED = "state_created"
+    STATE_UPDATED = "state_updated"
+    STATE_DELETED = "state_deleted"
+    DECISION = "decision"
+    CASE_COMPLETED = "case_completed"
+    CASE_FAILED = "case_failed"
+
+
+class GameEvent(SQLModel, table=True):
+    """Append-only log of everything that changed a player's game state."""
+
+    __tablename__ = "game_events"
+    __table_args__ = (Index("ix_game_events_user_id_id", "user_id", "id"),)
+
+    id: Optional[int] = Field(
+        default=None, sa_column=Column(BigInteger, primary_key=True, autoincrement=True)
+    )
+    user_id: UUID = Field(foreign_key="users.id")
+    case_id: Optional[UUID] = None
+    event_type: GameEventType
+    payload: str = "{}"  # JSON object
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class GameStateSnapshot(SQLModel, table=True):
+    """Game state as of a given event, so replays start close to their target."""
+
+    __tablename__ = "game_state_snapshots"
+    __table_args__ = (
+        Index("ix_game_state_snapshots_user_id_event_id", "user_id", "event_id"),
+    )
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="users.id")
+    event_id: int = Field(sa_column=Column(BigInteger, nullable=False))
+    taken_at: datetime  # created_at of the event at event_id
+    state: str = "null"  # JSON object, null once the game state was deleted
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class GameEventRead(SQLModel):
+    """Game event read schema."""
+
+    id: int
+    user_id: UUID
+    case_id: Optional[UUID]
+    event_type: GameEventType
+    payload: str
+    created_at: datetime
+
+
+class GameStateReplay(GameStateBase):
+    """Game state rebuilt from the event log."""
+
+    user_id: UUID
+    at: datetime
+    event_id: Optional[int] = None  # Last event applied
+    events_replayed: int = 0  # Events applied on top of the snapshot
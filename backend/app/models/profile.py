@@ -0,0 +1,35 @@
+"""Request profile schemas."""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlmodel import SQLModel
+
+
+class SqlTiming(SQLModel):
+    """SQL statement executed during a profiled request."""
+
+    statement: str
+    duration_ms: float
+    executemany: bool = False
+
+
+class ProfileSummary(SQLModel):
+    """Profiled request summary schema."""
+
+    id: str
+    method: str
+    path: str
+    query_string: str = ""
+    status_code: Optional[int] = None
+    trigger: str  # "header" or "sample"
+    started_at: datetime
+    duration_ms: float
+    sql_count: int
+    sql_duration_ms: float
+
+
+class ProfileReport(ProfileSummary):
+    """Profiled request with its SQL statements."""
+
+    sql: List[SqlTiming] = []
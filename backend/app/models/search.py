@@ -0,0 +1,32 @@
+"""Search schemas."""
+
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+from sqlmodel import SQLModel
+
+
+class SearchKind(str, Enum):
+    """Search result kind enum."""
+
+    CASE = "case"
+    CHARACTER = "character"
+
+
+class SearchHit(SQLModel):
+    """Search result schema."""
+
+    kind: SearchKind
+    id: UUID
+    case_id: UUID
+    title: str
+    rank: float
+    snippet: str
+
+
+class SearchPage(SQLModel):
+    """Search results page schema."""
+
+    results: List[SearchHit]
+    next_cursor: Optional[str] = None
@@ -1,13 +1,27 @@
 """User model."""
 
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Optional
 from uuid import UUID, uuid4
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID
+from pydantic import AfterValidator
 from sqlmodel import Field, SQLModel
 
 
+def _check_timezone(value: str) -> str:
+    """Reject names that are not IANA time zones."""
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {value}")
+    return value
+
+
+TimeZoneName = Annotated[str, AfterValidator(_check_timezone)]
+
+
 class UserBase(SQLModel):
     """Base user model."""
 
@@ -16,6 +30,7 @@ class UserBase(SQLModel):
     is_active: bool = True
     is_superuser: bool = False
     is_verified: bool = False
+    timezone: str = "UTC"  # IANA name; sets the player's day boundary
 
 
 class User(UserBase, SQLAlchemyBaseUserTableUUID, table=True):
@@ -26,6 +41,8 @@ class User(UserBase, SQLAlchemyBaseUserTableUUID, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    deleted_at: Optional[datetime] = Field(default=None, index=True)
+    shard: Optional[int] = None  # Set when rebalanced off the user's hashed shard
 
 
 class UserCreate(SQLModel):
@@ -34,6 +51,7 @@ class UserCreate(SQLModel):
     email: str
     username: str
     password: str
+    timezone: TimeZoneName = "UTC"
 
 
 class UserRead(UserBase):
@@ -53,3 +71,4 @@ class UserUpdate(SQLModel):
     is_active: Optional[bool] = None
     is_superuser: Optional[bool] = None
     is_verified: Optional[bool] = None
+    timezone: Optional[TimeZoneName] = None
@@ -0,0 +1 @@
+"""Game logic services."""
@@ -0,0 +1,65 @@
+"""Per-user write admission control.
+
+Each user has a token bucket in Redis refilled at ``WRITE_RATE_PER_SECOND``
+up to ``WRITE_BURST`` tokens; every write request takes one. The bucket is
+updated by a single script using the Redis clock, so all API workers share
+it and their own clocks do not matter. If Redis is unavailable writes are
+admitted rather than failing the whole API.
+"""
+
+import math
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.cache import redis_client
+from app.config import settings
+
+# Returns 0 when admitted, otherwise the milliseconds until a token is free
+_TAKE_TOKEN = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(bucket[1]) or burst
+local at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - at) * rate / 1000)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+
+def _bucket_key(user_id: UUID) -> str:
+    return f"write_bucket:{user_id}"
+
+
+async def admit_write(user_id: UUID, redis: Redis = redis_client) -> Optional[int]:
+    """Take a write token for a user.
+
+    Returns None when admitted, otherwise the seconds to wait before retrying.
+    """
+    try:
+        wait_ms = await redis.eval(
+            _TAKE_TOKEN,
+            1,
+            _bucket_key(user_id),
+            settings.WRITE_RATE_PER_SECOND,
+            settings.WRITE_BURST,
+        )
+    except RedisError as exc:
+        logger.warning(f"Write admission store unavailable, admitting: {exc}")
+        return None
+    return math.ceil(wait_ms / 1000) if wait_ms else None
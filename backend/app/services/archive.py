@@ -0,0 +1,138 @@
+"""Archive storage for finished cases.
+
+Cases that reached ``completed`` or ``failed`` more than
+``ARCHIVE_AFTER_DAYS`` ago are moved, with their characters and decisions,
+into one ``archived_cases`` row holding a zlib-compressed JSON document. The
+hot ``cases``, ``characters`` and ``decisions`` tables (and their indexes)
+then only hold live data. Each case is moved in a single transaction, so it
+is always in exactly one place.
+
+Archived cases are read back by decompressing the whole document, which is
+slower than a hot read but needs no joins. Archiving also drops the case from
+its owner's ownership set, since it no longer accepts character routes.
+"""
+
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from redis.asyncio import Redis
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive import ArchivedCase, ArchivedCaseRead
+from app.models.case import Case, CaseRead, CaseStatus
+from app.models.character import Character, CharacterRead
+from app.models.decision import Decision, DecisionRead
+from app.services.case_ownership import remove_case
+
+ARCHIVABLE_STATUSES = (CaseStatus.COMPLETED, CaseStatus.FAILED)
+COMPRESSION_LEVEL = 6
+
+
+def compress(document: Dict[str, Any]) -> bytes:
+    """Serialize and compress an archive document."""
+    return zlib.compress(json.dumps(document, separators=(",", ":")).encode(), COMPRESSION_LEVEL)
+
+
+def decompress(payload: bytes) -> Dict[str, Any]:
+    """Decompress and parse an archive document."""
+    return json.loads(zlib.decompress(payload))
+
+
+async def archive_case(session: AsyncSession, case_id: UUID, redis: Redis) -> bool:
+    """Move one finished case into the archive. Returns False if it no longer qualifies."""
+    result = await session.execute(
+        select(Case)
+        .where(
+            Case.id == case_id,
+            Case.status.in_(ARCHIVABLE_STATUSES),
+            Case.deleted_at.is_(None),
+        )
+        .with_for_update()
+    )
+    case = result.scalar_one_or_none()
+    if case is None:
+        return False
+
+    characters = (
+        await session.execute(select(Character).where(Character.case_id == case_id))
+    ).scalars().all()
+    character_ids = select(Character.id).where(Character.case_id == case_id)
+    in_case = or_(Decision.case_id == case_id, Decision.character_id.in_(character_ids))
+    decisions = (
+        await session.execute(select(Decision).where(in_case).order_by(Decision.created_at))
+    ).scalars().all()
+
+    document = {
+        "case": CaseRead.model_validate(case).model_dump(mode="json"),
+        "characters": [
+            CharacterRead.model_validate(character).model_dump(mode="json")
+            for character in characters
+        ],
+        "decisions": [
+            DecisionRead.model_validate(decision).model_dump(mode="json")
+            for decision in decisions
+        ],
+    }
+    user_id = case.user_id
+    session.add(
+        ArchivedCase(
+            id=case.id,
+            user_id=user_id,
+            title=case.title,
+            difficulty=case.difficulty,
+            status=case.status,
+            completed_at=case.completed_at,
+            payload=compress(document),
+        )
+    )
+
+    for statement in (
+        delete(Decision).where(in_case),
+        delete(Character).where(Character.case_id == case_id),
+        delete(Case).where(Case.id == case_id),
+    ):
+        await session.execute(statement.execution_options(synchronize_session=False))
+    await session.commit()
+    await remove_case(user_id, case_id, redis)
+    return True
+
+
+async def archive_finished_cases(
+    session: AsyncSession, redis: Redis, cutoff: datetime, limit: int
+) -> int:
+    """Archive up to ``limit`` cases that finished before ``cutoff``."""
+    finished_at = func.coalesce(Case.completed_at, Case.updated_at)
+    result = await session.execute(
+        select(Case.id)
+        .where(
+            Case.status.in_(ARCHIVABLE_STATUSES),
+            Case.deleted_at.is_(None),
+            finished_at < cutoff,
+        )
+        .order_by(finished_at)
+        .limit(limit)
+    )
+
+    archived = 0
+    for case_id in result.scalars().all():
+        if await archive_case(session, case_id, redis):
+            archived += 1
+    return archived
+
+
+async def load_archived_case(
+    session: AsyncSession, case_id: UUID, user_id: UUID
+) -> Optional[ArchivedCaseRead]:
+    """Get a user's archived case with its characters and decisions."""
+    result = await session.execute(
+        select(ArchivedCase).where(ArchivedCase.id == case_id, ArchivedCase.user_id == user_id)
+    )
+    archived = result.scalar_one_or_none()
+    if archived is None:
+        return None
+
+    return ArchivedCaseRead(**decompress(archived.payload), archived_at=archived.archived_at)
@@ -0,0 +1,246 @@
+"""Monte Carlo calibration of case difficulty parameters.
+
+Replays synthetic playthroughs of each ``CaseDifficulty`` and derives
+``time_limit_minutes``, ``stress_impact`` and ``reputation_reward`` from the
+simulated outcomes instead of hand-tuned constants.
+
+A playthrough is a sequence of decisions. Each step draws a
+``DecisionType`` from ``DECISION_TYPE_PROBABILITIES`` and a
+``DecisionOutcome`` from the difficulty's outcome distribution; successful
+(or partially successful) steps may uncover a clue, and the case is solved
+once ``total_clues`` clues are found. Every step costs the decision type's
+minutes and adds stress according to its outcome, scaled by
+``STRESS_INCREMENT_RATE``.
+
+All playthroughs of a chunk are simulated at once as ``(playthroughs,
+steps)`` arrays; chunks are spread over a process pool with independent
+random streams.
+
+Run from the command line::
+
+    python -m app.services.calibration --playthroughs 20000 --workers 4
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.models.case import CaseDifficulty
+from app.models.decision import DecisionOutcome, DecisionType
+
+DECISION_TYPES = list(DecisionType)
+OUTCOMES = list(DecisionOutcome)
+
+# How a typical player spreads their decisions
+DECISION_TYPE_PROBABILITIES = {
+    DecisionType.INTERROGATE: 0.30,
+    DecisionType.SEARCH: 0.25,
+    DecisionType.ARREST: 0.05,
+    DecisionType.RELEASE: 0.05,
+    DecisionType.ANALYZE_EVIDENCE: 0.20,
+    DecisionType.CONSULT: 0.15,
+}
+
+# In-game minutes each decision takes
+DECISION_MINUTES = {
+    DecisionType.INTERROGATE: 10,
+    DecisionType.SEARCH: 15,
+    DecisionType.ARREST: 5,
+    DecisionType.RELEASE: 5,
+    DecisionType.ANALYZE_EVIDENCE: 20,
+    DecisionType.CONSULT: 5,
+}
+
+# Chance that a fully successful decision uncovers a clue
+DECISION_CLUE_CHANCE = {
+    DecisionType.INTERROGATE: 0.35,
+    DecisionType.SEARCH: 0.50,
+    DecisionType.ARREST: 0.0,
+    DecisionType.RELEASE: 0.0,
+    DecisionType.ANALYZE_EVIDENCE: 0.60,
+    DecisionType.CONSULT: 0.25,
+}
+
+# Clue chance multiplier and stress multiplier per outcome
+OUTCOME_CLUE_FACTOR = {
+    DecisionOutcome.SUCCESS: 1.0,
+    DecisionOutcome.PARTIAL_SUCCESS: 0.5,
+    DecisionOutcome.FAILURE: 0.0,
+    DecisionOutcome.NEUTRAL: 0.0,
+}
+OUTCOME_STRESS_FACTOR = {
+    DecisionOutcome.SUCCESS: 0.0,
+    DecisionOutcome.PARTIAL_SUCCESS: 0.5,
+    DecisionOutcome.FAILURE: 1.5,
+    DecisionOutcome.NEUTRAL: 0.25,
+}
+
+
+@dataclass(frozen=True)
+class DifficultyProfile:
+    """Simulation inputs for one difficulty."""
+
+    total_clues: int
+    outcome_probabilities: Tuple[float, float, float, float]  # in OUTCOMES order
+    clue_multiplier: float
+    target_solve_rate: float
+
+
+DIFFICULTY_PROFILES = {
+    CaseDifficulty.EASY: DifficultyProfile(3, (0.55, 0.25, 0.10, 0.10), 1.0, 0.90),
+    CaseDifficulty.MEDIUM: DifficultyProfile(4, (0.45, 0.25, 0.18, 0.12), 0.85, 0.75),
+    CaseDifficulty.HARD: DifficultyProfile(5, (0.35, 0.25, 0.26, 0.14), 0.7, 0.60),
+    CaseDifficulty.EXTREME: DifficultyProfile(6, (0.25, 0.25, 0.35, 0.15), 0.55, 0.45),
+}
+
+MAX_STEPS = 120
+
+_TYPE_PROBS = np.array([DECISION_TYPE_PROBABILITIES[t] for t in DECISION_TYPES])
+_TYPE_MINUTES = np.array([DECISION_MINUTES[t] for t in DECISION_TYPES], dtype=float)
+_TYPE_CLUE_CHANCE = np.array([DECISION_CLUE_CHANCE[t] for t in DECISION_TYPES])
+_OUTCOME_CLUE_FACTOR = np.array([OUTCOME_CLUE_FACTOR[o] for o in OUTCOMES])
+_OUTCOME_STRESS = np.array([OUTCOME_STRESS_FACTOR[o] for o in OUTCOMES])
+
+
+def simulate(
+    difficulty: CaseDifficulty,
+    playthroughs: int,
+    seed: Optional[np.random.SeedSequence] = None,
+    stress_rate: float = settings.STRESS_INCREMENT_RATE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Simulate playthroughs of one difficulty.
+
+    Returns the minutes each playthrough needed to solve the case (``inf``
+    if it never did within ``MAX_STEPS``) and the stress it accumulated up
+    to that point.
+    """
+    profile = DIFFICULTY_PROFILES[difficulty]
+    rng = np.random.default_rng(seed)
+    shape = (playthroughs, MAX_STEPS)
+
+    types = rng.choice(len(DECISION_TYPES), size=shape, p=_TYPE_PROBS)
+    outcome_cdf = np.cumsum(profile.outcome_probabilities)
+    outcomes = np.searchsorted(outcome_cdf, rng.random(shape) * outcome_cdf[-1], side="right")
+
+    clue_chance = _TYPE_CLUE_CHANCE[types] * _OUTCOME_CLUE_FACTOR[outcomes] * profile.clue_multiplier
+    clues = np.cumsum(rng.random(shape) < clue_chance, axis=1)
+    minutes = np.cumsum(_TYPE_MINUTES[types], axis=1)
+    stress = np.cumsum(_OUTCOME_STRESS[outcomes] * stress_rate, axis=1)
+
+    solved_mask = clues >= profile.total_clues
+    solved = solved_mask.any(axis=1)
+    solve_step = np.where(solved, solved_mask.argmax(axis=1), MAX_STEPS - 1)
+    rows = np.arange(playthroughs)
+
+    solve_minutes = np.where(solved, minutes[rows, solve_step], np.inf)
+    return solve_minutes, stress[rows, solve_step]
+
+
+def _simulate_chunk(
+    args: Tuple[CaseDifficulty, int, np.random.SeedSequence, float]
+) -> Tuple[CaseDifficulty, np.ndarray, np.ndarray]:
+    difficulty, playthroughs, seed, stress_rate = args
+    return (difficulty, *simulate(difficulty, playthroughs, seed, stress_rate))
+
+
+def calibrate(
+    playthroughs: int = 10_000,
+    workers: int = 0,
+    chunk_size: int = 5_000,
+    seed: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Calibrate every difficulty.
+
+    ``workers`` > 0 spreads chunks over a process pool; 0 runs in-process
+    (use this inside Celery workers, which cannot fork children).
+
+    For each difficulty:
+
+    * ``time_limit_minutes`` is the solve time reached by the difficulty's
+      target share of playthroughs.
+    * ``stress_impact`` is the median stress accumulated by the time the case
+      is solved (or abandoned).
+    * ``reputation_reward`` scales ``REPUTATION_INCREMENT_RATE`` by the
+      median solve time relative to ``CASE_DURATION_MINUTES`` and by the
+      risk of failing (one over the target solve rate).
+
+    Calibrated values are None for a difficulty no playthrough could solve.
+    """
+    root = np.random.SeedSequence(seed)
+    stress_rate = float(settings.STRESS_INCREMENT_RATE)
+
+    jobs = []
+    for difficulty in DIFFICULTY_PROFILES:
+        sizes = [chunk_size] * (playthroughs // chunk_size)
+        if playthroughs % chunk_size:
+            sizes.append(playthroughs % chunk_size)
+        for size, child in zip(sizes, root.spawn(len(sizes))):
+            jobs.append((difficulty, size, child, stress_rate))
+
+    if workers > 0:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, jobs))
+    else:
+        chunks = [_simulate_chunk(job) for job in jobs]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for difficulty, profile in DIFFICULTY_PROFILES.items():
+        solve_minutes = np.concatenate([c[1] for c in chunks if c[0] == difficulty])
+        stress = np.concatenate([c[2] for c in chunks if c[0] == difficulty])
+        solved = np.isfinite(solve_minutes)
+        solve_rate = float(solved.mean())
+
+        calibrated: Dict[str, Any] = {
+            "time_limit_minutes": None,
+            "stress_impact": int(round(float(np.median(stress)))),
+            "reputation_reward": None,
+        }
+        time_limit = float("inf")
+        median_minutes = None
+        if solved.any():
+            time_limit = float(np.quantile(solve_minutes, profile.target_solve_rate))
+            if not np.isfinite(time_limit):
+                # Too few playthroughs solve the case; use the longest solve seen
+                time_limit = float(solve_minutes[solved].max())
+            median_minutes = float(np.median(solve_minutes[solved]))
+            calibrated["time_limit_minutes"] = int(np.ceil(time_limit))
+            calibrated["reputation_reward"] = int(
+                round(
+                    settings.REPUTATION_INCREMENT_RATE
+                    * median_minutes
+                    / settings.CASE_DURATION_MINUTES
+                    / profile.target_solve_rate
+                )
+            )
+
+        results[difficulty.value] = {
+            **calibrated,
+            "total_clues": profile.total_clues,
+            "target_solve_rate": profile.target_solve_rate,
+            "solve_rate": solve_rate,
+            "solve_rate_at_limit": float((solve_minutes <= time_limit).mean()),
+            "median_solve_minutes": median_minutes,
+            "playthroughs": int(solve_minutes.size),
+        }
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Calibrate case difficulty parameters.")
+    parser.add_argument("--playthroughs", type=int, default=10_000, help="Per difficulty")
+    parser.add_argument("--workers", type=int, default=4, help="Processes (0 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    results = calibrate(args.playthroughs, args.workers, args.chunk_size, args.seed)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Per-user case ownership index.
+
+Character routes must check that a case belongs to the caller, but joining
+``cases`` on every character query would slow the hottest path. Instead each
+user's live case ids are kept in a Redis set, loaded from Postgres on first
+use (with a marker member, so an empty set is distinguishable from a missing
+one) and kept for ``CASE_OWNERSHIP_TTL_SECONDS``. Creating a case adds it to
+the set and deleting it removes it.
+
+Removed ids are also remembered in a second set for the same TTL. A load
+reads Postgres before it writes the set, so a case deleted in between would
+otherwise be written back after its removal; loads and adds skip those ids,
+in one script each so a removal cannot land between the check and the write.
+
+A case's owner never changes, so a cached "yes" can only be stale about the
+case having just been deleted, never about who owns it. A "no" may come
+from a set that was loaded just before the case was created, so it is
+double-checked against Postgres before access is refused. If Redis is down
+every check goes to Postgres.
+"""
+
+from typing import List, Set
+from uuid import UUID
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import redis_client
+from app.config import settings
+from app.models.case import Case
+
+LOADED_MARKER = "*"
+
+# Replace the set with the marker and the ids that were not removed meanwhile
+_LOAD = """
+redis.call('DEL', KEYS[1])
+redis.call('SADD', KEYS[1], ARGV[2])
+local loaded = {}
+for i = 3, #ARGV do
+    if redis.call('SISMEMBER', KEYS[2], ARGV[i]) == 0 then
+        redis.call('SADD', KEYS[1], ARGV[i])
+        table.insert(loaded, ARGV[i])
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return loaded
+"""
+
+# Add an id unless it was removed
+_ADD = """
+if redis.call('SISMEMBER', KEYS[2], ARGV[2]) == 1 then
+    return 0
+end
+redis.call('SADD', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+def _owner_key(user_id: UUID) -> str:
+    return f"case_owner:{user_id}"
+
+
+def _removed_key(user_id: UUID) -> str:
+    return f"case_removed:{user_id}"
+
+
+async def _owns_case_in_db(session: AsyncSession, user_id: UUID, case_id: UUID) -> bool:
+    result = await session.execute(
+        select(Case.id).where(
+            Case.id == case_id,
+            Case.user_id == user_id,
+            Case.deleted_at.is_(None),
+        )
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def _load(session: AsyncSession, user_id: UUID, redis: Redis) -> Set[str]:
+    """Load a user's live case ids from Postgres into their set."""
+    result = await session.execute(
+        select(Case.id).where(Case.user_id == user_id, Case.deleted_at.is_(None))
+    )
+    case_ids: List[str] = [str(case_id) for case_id in result.scalars().all()]
+
+    loaded = await redis.eval(
+        _LOAD,
+        2,
+        _owner_key(user_id),
+        _removed_key(user_id),
+        settings.CASE_OWNERSHIP_TTL_SECONDS,
+        LOADED_MARKER,
+        *case_ids,
+    )
+    return set(loaded)
+
+
+async def owns_case(
+    session: AsyncSession, user_id: UUID, case_id: UUID, redis: Redis = redis_client
+) -> bool:
+    """Check whether a live case belongs to a user."""
+    try:
+        loaded, owned = await redis.smismember(
+            _owner_key(user_id), [LOADED_MARKER, str(case_id)]
+        )
+        if owned:
+            return True
+        if not loaded:
+            return str(case_id) in await _load(session, user_id, redis)
+    except RedisError as exc:
+        logger.warning(f"Case ownership index unavailable, checking Postgres: {exc}")
+        return await _owns_case_in_db(session, user_id, case_id)
+
+    # Possibly created after the set was loaded
+    if not await _owns_case_in_db(session, user_id, case_id):
+        return False
+    await add_case(user_id, case_id, redis)
+    return True
+
+
+async def add_case(user_id: UUID, case_id: UUID, redis: Redis = redis_client) -> None:
+    """Record a new case in its owner's set."""
+    try:
+        await redis.eval(
+            _ADD,
+            2,
+            _owner_key(user_id),
+            _removed_key(user_id),
+            settings.CASE_OWNERSHIP_TTL_SECONDS,
+            str(case_id),
+        )
+    except RedisError as exc:
+        logger.warning(f"Failed to add case to ownership index: {exc}")
+
+
+async def remove_case(user_id: UUID, case_id: UUID, redis: Redis = redis_client) -> None:
+    """Drop a deleted case from its owner's set and keep it out of later loads."""
+    removed_key = _removed_key(user_id)
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.srem(_owner_key(user_id), str(case_id))
+            pipe.sadd(removed_key, str(case_id))
+            pipe.expire(removed_key, settings.CASE_OWNERSHIP_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as exc:
+        logger.warning(f"Failed to remove case from ownership index: {exc}")
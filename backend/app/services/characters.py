@@ -0,0 +1,59 @@
+"""Character bulk operations."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Boolean, case, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.character import Character, CharacterUpdate
+
+UPDATABLE_FIELDS = tuple(CharacterUpdate.model_fields)
+
+
+async def bulk_update_characters(
+    session: AsyncSession, case_id: UUID, updates: Dict[UUID, CharacterUpdate]
+) -> Tuple[List[Character], Set[UUID]]:
+    """Apply many character updates of one case in a single UPDATE.
+
+    Each payload only changes the fields it sets: every field travels with a
+    ``<field>_set`` flag in a VALUES list joined to ``characters``. Rows of
+    other cases are never touched. Returns the updated characters and the
+    ids that were not found in the case; the caller decides whether to
+    commit.
+    """
+    table = Character.__table__
+    columns = [column("id", table.c.id.type)]
+    for field in UPDATABLE_FIELDS:
+        columns.append(column(field, table.c[field].type))
+        columns.append(column(f"{field}_set", Boolean))
+
+    rows: List[Tuple[Any, ...]] = []
+    for character_id, payload in updates.items():
+        data = payload.model_dump(exclude_unset=True)
+        row: List[Any] = [character_id]
+        for field in UPDATABLE_FIELDS:
+            row.extend([data.get(field), field in data])
+        rows.append(tuple(row))
+
+    payloads = values(*columns, name="payloads").data(rows)
+    assignments = {
+        field: case(
+            (payloads.c[f"{field}_set"], payloads.c[field]),
+            else_=table.c[field],
+        )
+        for field in UPDATABLE_FIELDS
+    }
+    assignments["updated_at"] = datetime.utcnow()
+
+    result = await session.execute(
+        update(Character)
+        .where(Character.id == payloads.c.id, Character.case_id == case_id)
+        .values(assignments)
+        .returning(Character)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    updated = list(result.scalars().all())
+    missing = set(updates) - {character.id for character in updated}
+    return updated, missing
@@ -0,0 +1,239 @@
+"""Evidence graph built from ``Case.evidence_data``.
+
+``evidence_data`` is a JSON object describing clues, characters and
+locations and the links between them::
+
+    {
+        "clues": [{"id": "knife", "label": "Bloody knife",
+                   "characters": ["<character uuid>"], "locations": ["alley"]}],
+        "characters": [{"id": "<character uuid>", "label": "Vera"}],
+        "locations": [{"id": "alley", "label": "Back alley"}],
+        "links": [["location:alley", "location:docks"]]
+    }
+
+Nodes are addressed as ``"<kind>:<id>"`` (``clue``, ``character`` or
+``location``). Clues may list the characters and locations they point to
+inline; ``links`` adds any other undirected edge. Nodes referenced by a link
+but not declared are added with their id as label.
+
+The graph is parsed once per case version and kept in an in-process LRU
+cache, so connectivity checks are a dictionary lookup and path queries are a
+breadth-first search over integer adjacency lists.
+"""
+
+import json
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.case import Case
+
+NODE_KINDS = ("clue", "character", "location")
+_KIND_FIELDS = (("clue", "clues"), ("character", "characters"), ("location", "locations"))
+
+
+class EvidenceGraph:
+    """Indexed, undirected graph of clues, characters and locations."""
+
+    __slots__ = ("keys", "labels", "index", "adjacency", "component")
+
+    def __init__(self, nodes: Dict[str, str], edges: Iterable[Tuple[str, str]]):
+        self.keys: List[str] = list(nodes)
+        self.labels: List[str] = [nodes[key] for key in self.keys]
+        self.index: Dict[str, int] = {key: i for i, key in enumerate(self.keys)}
+
+        adjacency: List[Set[int]] = [set() for _ in self.keys]
+        for source, target in edges:
+            a, b = self.index[source], self.index[target]
+            if a != b:
+                adjacency[a].add(b)
+                adjacency[b].add(a)
+        self.adjacency: List[Tuple[int, ...]] = [tuple(sorted(n)) for n in adjacency]
+        self.component: List[int] = self._label_components()
+
+    @classmethod
+    def from_json(cls, raw: Optional[str]) -> "EvidenceGraph":
+        """Parse ``evidence_data``. Raises ValueError on malformed data."""
+        if not raw:
+            return cls({}, [])
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Evidence data is not valid JSON: {exc}") from exc
+        if not isinstance(data, dict):
+            raise ValueError("Evidence data must be a JSON object")
+
+        nodes: Dict[str, str] = {}
+        edges: List[Tuple[str, str]] = []
+
+        for kind, field in _KIND_FIELDS:
+            for item in _as_list(data.get(field), field):
+                node_id, label = _node_id_and_label(item, field)
+                key = f"{kind}:{node_id}"
+                nodes[key] = label
+                if kind == "clue" and isinstance(item, dict):
+                    for linked_kind, linked_field in _KIND_FIELDS[1:]:
+                        for linked in _as_list(item.get(linked_field), linked_field):
+                            edges.append((key, f"{linked_kind}:{linked}"))
+
+        for link in _as_list(data.get("links"), "links"):
+            if isinstance(link, dict):
+                link = (link.get("source"), link.get("target"))
+            if not isinstance(link, (list, tuple)) or len(link) != 2:
+                raise ValueError(f"Invalid evidence link: {link!r}")
+            edges.append((str(link[0]), str(link[1])))
+
+        for edge in edges:
+            for key in edge:
+                kind, _, node_id = key.partition(":")
+                if kind not in NODE_KINDS or not node_id:
+                    raise ValueError(f"Invalid evidence node reference: {key!r}")
+                nodes.setdefault(key, node_id)
+
+        return cls(nodes, edges)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _label_components(self) -> List[int]:
+        """Assign a connected-component id to every node."""
+        component = [-1] * len(self.keys)
+        for start in range(len(self.keys)):
+            if component[start] != -1:
+                continue
+            component[start] = start
+            stack = [start]
+            while stack:
+                node = stack.pop()
+                for neighbor in self.adjacency[node]:
+                    if component[neighbor] == -1:
+                        component[neighbor] = start
+                        stack.append(neighbor)
+        return component
+
+    def neighbors(self, key: str, kind: Optional[str] = None) -> List[str]:
+        """Get the nodes adjacent to ``key``, optionally of one kind."""
+        keys = (self.keys[i] for i in self.adjacency[self.index[key]])
+        if kind is None:
+            return list(keys)
+        return [neighbor for neighbor in keys if neighbor.startswith(f"{kind}:")]
+
+    def connected(self, source: str, target: str) -> bool:
+        """Check whether two nodes are linked by any chain of evidence."""
+        return self.component[self.index[source]] == self.component[self.index[target]]
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Get the shortest chain of nodes from ``source`` to ``target``."""
+        start, goal = self.index[source], self.index[target]
+        if self.component[start] != self.component[goal]:
+            return None
+
+        previous = {start: start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if node == goal:
+                break
+            for neighbor in self.adjacency[node]:
+                if neighbor not in previous:
+                    previous[neighbor] = node
+                    queue.append(neighbor)
+
+        path = [goal]
+        while path[-1] != start:
+            path.append(previous[path[-1]])
+        return [self.keys[i] for i in reversed(path)]
+
+    def linking_clues(self, source: str, target: str) -> List[str]:
+        """Get the clues directly linked to both nodes."""
+        shared = set(self.adjacency[self.index[source]]).intersection(
+            self.adjacency[self.index[target]]
+        )
+        return sorted(self.keys[i] for i in shared if self.keys[i].startswith("clue:"))
+
+    def label(self, key: str) -> str:
+        """Get the display label of a node."""
+        return self.labels[self.index[key]]
+
+
+def _as_list(value: Any, field: str) -> List[Any]:
+    """Validate an optional JSON array field."""
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"Evidence field '{field}' must be a list")
+    return value
+
+
+def _node_id_and_label(item: Any, field: str) -> Tuple[str, str]:
+    """Read the id and label of a declared node."""
+    if isinstance(item, str):
+        return item, item
+    if isinstance(item, dict) and item.get("id") is not None:
+        node_id = str(item["id"])
+        return node_id, str(item.get("label", node_id))
+    raise ValueError(f"Invalid entry in evidence field '{field}': {item!r}")
+
+
+class EvidenceGraphCache:
+    """LRU cache of parsed evidence graphs keyed by case and version."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[UUID, Tuple[datetime, EvidenceGraph]]" = OrderedDict()
+
+    def get(self, case_id: UUID, version: datetime) -> Optional[EvidenceGraph]:
+        """Get the cached graph if it was built from this case version."""
+        entry = self._entries.get(case_id)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(case_id)
+        return entry[1]
+
+    def put(self, case_id: UUID, version: datetime, graph: EvidenceGraph) -> None:
+        """Cache a graph for a case version."""
+        self._entries[case_id] = (version, graph)
+        self._entries.move_to_end(case_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, case_id: UUID) -> None:
+        """Drop the cached graph of a case."""
+        self._entries.pop(case_id, None)
+
+
+evidence_graph_cache = EvidenceGraphCache(settings.EVIDENCE_GRAPH_CACHE_SIZE)
+
+
+async def load_evidence_graph(
+    session: AsyncSession, case_id: UUID, user_id: UUID
+) -> Optional[EvidenceGraph]:
+    """Get the evidence graph of a user's case, parsing it only when it changed.
+
+    Returns None if the case does not exist or belongs to another user.
+    """
+    result = await session.execute(
+        select(Case.updated_at).where(
+            Case.id == case_id,
+            Case.user_id == user_id,
+            Case.deleted_at.is_(None),
+        )
+    )
+    version = result.scalar_one_or_none()
+    if version is None:
+        return None
+
+    graph = evidence_graph_cache.get(case_id, version)
+    if graph is None:
+        result = await session.execute(select(Case.evidence_data).where(Case.id == case_id))
+        graph = EvidenceGraph.from_json(result.scalar_one_or_none())
+        evidence_graph_cache.put(case_id, version, graph)
+    return graph
@@ -0,0 +1,329 @@
+"""Event-sourced game state history.
+
+Every change to a player's game state is appended to ``game_events``:
+game state creates, updates and deletes, decisions (their stress and
+reputation impacts) and case outcomes (solved/failed counters, the case's
+reputation reward or stress impact). The ``game_states`` row stays the live
+projection and is updated in the same transaction as its event.
+
+Decision and case outcome impacts are applied by the server; before the
+event log, clients applied them themselves through ``PATCH``. While such
+clients remain, set ``GAME_EVENTS_APPLY_IMPACTS=False``: the events are then
+still logged, but marked ``"applied": false`` and skipped by the reducer, so
+replays stay faithful to whichever behaviour was active when they happened.
+
+Game states created before the log existed have no ``state_created`` event;
+``backfill_snapshots`` gives each a baseline snapshot of its current row
+(run ``python -m app.services.game_events backfill`` once after deploying).
+
+``total_playtime_minutes`` is owned by the client, which reports it as an
+absolute value (possibly through the write-behind buffer); a decision's
+``time_taken_minutes`` is kept in its event but not added to it.
+
+``apply_event`` is the single reducer used both for that live projection
+and for replays. ``replay`` rebuilds a user's state at any point in time
+from the latest ``game_state_snapshots`` row before it plus the events that
+follow; the ``compact_game_events`` task keeps those replays short by taking
+a snapshot every ``GAME_SNAPSHOT_INTERVAL_EVENTS`` events, and, when
+``GAME_EVENT_RETENTION_DAYS`` is set, folds older events into one snapshot.
+"""
+
+import argparse
+import asyncio
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import data_worker_session_makers
+from app.models.game_event import GameEvent, GameEventType, GameStateSnapshot
+from app.models.game_state import GameState, GameStateBase
+
+STATE_FIELDS = tuple(GameStateBase.model_fields)
+IMPACT_EVENTS = (GameEventType.DECISION, GameEventType.CASE_COMPLETED, GameEventType.CASE_FAILED)
+
+
+@dataclass
+class Replay:
+    """Result of replaying a user's event log."""
+
+    state: Optional[Dict[str, Any]]  # None if there is no game state at that time
+    event_id: Optional[int] = None
+    event_at: Optional[datetime] = None
+    events_replayed: int = 0
+
+
+def _clamp(value: int) -> int:
+    return max(0, min(100, value))
+
+
+def state_payload(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the event-sourced fields of a game state update, JSON-ready."""
+    return {
+        key: str(value) if isinstance(value, UUID) else value
+        for key, value in values.items()
+        if key in STATE_FIELDS
+    }
+
+
+def apply_event(
+    state: Optional[Dict[str, Any]], event_type: GameEventType, payload: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Return the state after one event."""
+    if event_type == GameEventType.STATE_DELETED:
+        return None
+    if event_type in IMPACT_EVENTS and not payload.get("applied", True):
+        return state
+
+    if state is None:
+        state = GameStateBase().model_dump(mode="json")
+    else:
+        state = dict(state)
+
+    if event_type in (GameEventType.STATE_CREATED, GameEventType.STATE_UPDATED):
+        state.update(state_payload(payload))
+    elif event_type == GameEventType.DECISION:
+        state["stress_level"] = _clamp(state["stress_level"] + payload.get("stress_impact", 0))
+        state["reputation"] = _clamp(state["reputation"] + payload.get("reputation_impact", 0))
+    elif event_type == GameEventType.CASE_COMPLETED:
+        state["cases_solved"] += 1
+        state["reputation"] = _clamp(state["reputation"] + payload.get("reputation_reward", 0))
+    elif event_type == GameEventType.CASE_FAILED:
+        state["cases_failed"] += 1
+        state["stress_level"] = _clamp(state["stress_level"] + payload.get("stress_impact", 0))
+
+    if event_type in (GameEventType.CASE_COMPLETED, GameEventType.CASE_FAILED):
+        if state["current_case_id"] == payload.get("case_id"):
+            state["current_case_id"] = None
+
+    return state
+
+
+def append_event(
+    session: AsyncSession,
+    user_id: UUID,
+    event_type: GameEventType,
+    payload: Dict[str, Any],
+    case_id: Optional[UUID] = None,
+) -> GameEvent:
+    """Add an event to the session; it is written with the caller's commit."""
+    event = GameEvent(
+        user_id=user_id, case_id=case_id, event_type=event_type, payload=json.dumps(payload)
+    )
+    session.add(event)
+    return event
+
+
+async def record_event(
+    session: AsyncSession,
+    user_id: UUID,
+    event_type: GameEventType,
+    payload: Dict[str, Any],
+    case_id: Optional[UUID] = None,
+) -> GameEvent:
+    """Append an impact event and, if enabled, apply it to the user's game state row."""
+    payload = {**payload, "applied": settings.GAME_EVENTS_APPLY_IMPACTS}
+    if not settings.GAME_EVENTS_APPLY_IMPACTS:
+        return append_event(session, user_id, event_type, payload, case_id)
+
+    result = await session.execute(
+        select(GameState).where(GameState.user_id == user_id).with_for_update()
+    )
+    game_state = result.scalar_one_or_none()
+    event = append_event(session, user_id, event_type, payload, case_id)
+
+    if game_state is not None:
+        current = state_payload({key: getattr(game_state, key) for key in STATE_FIELDS})
+        updated = GameStateBase.model_validate(apply_event(current, event_type, payload))
+        for key in STATE_FIELDS:
+            setattr(game_state, key, getattr(updated, key))
+        game_state.updated_at = datetime.utcnow()
+
+    return event
+
+
+async def replay(
+    session: AsyncSession, user_id: UUID, at: Optional[datetime] = None
+) -> Replay:
+    """Rebuild a user's game state as of ``at`` (default: now)."""
+    query = select(GameStateSnapshot).where(GameStateSnapshot.user_id == user_id)
+    if at is not None:
+        query = query.where(GameStateSnapshot.taken_at <= at)
+    result = await session.execute(query.order_by(GameStateSnapshot.event_id.desc()).limit(1))
+    snapshot = result.scalar_one_or_none()
+
+    if snapshot is None:
+        current = Replay(state=None)
+    else:
+        current = Replay(
+            state=json.loads(snapshot.state),
+            event_id=snapshot.event_id,
+            event_at=snapshot.taken_at,
+        )
+
+    query = select(
+        GameEvent.id, GameEvent.event_type, GameEvent.payload, GameEvent.created_at
+    ).where(GameEvent.user_id == user_id)
+    if current.event_id is not None:
+        query = query.where(GameEvent.id > current.event_id)
+    if at is not None:
+        query = query.where(GameEvent.created_at <= at)
+    result = await session.execute(query.order_by(GameEvent.id))
+
+    for event_id, event_type, payload, created_at in result.all():
+        current.state = apply_event(current.state, event_type, json.loads(payload))
+        current.event_id = event_id
+        current.event_at = created_at
+        current.events_replayed += 1
+
+    return current
+
+
+async def _save_snapshot(session: AsyncSession, user_id: UUID, at: Optional[datetime]) -> Replay:
+    """Snapshot a user's state as of ``at`` unless that snapshot already exists."""
+    state = await replay(session, user_id, at)
+    if state.event_id is not None and state.events_replayed:
+        session.add(
+            GameStateSnapshot(
+                user_id=user_id,
+                event_id=state.event_id,
+                taken_at=state.event_at,
+                state=json.dumps(state.state),
+            )
+        )
+    return state
+
+
+async def take_due_snapshots(session: AsyncSession, interval: int, limit: int) -> int:
+    """Snapshot users with at least ``interval`` events since their last snapshot."""
+    latest = (
+        select(
+            GameStateSnapshot.user_id,
+            func.max(GameStateSnapshot.event_id).label("event_id"),
+        )
+        .group_by(GameStateSnapshot.user_id)
+        .subquery()
+    )
+    result = await session.execute(
+        select(GameEvent.user_id)
+        .outerjoin(latest, latest.c.user_id == GameEvent.user_id)
+        .where(GameEvent.id > func.coalesce(latest.c.event_id, 0))
+        .group_by(GameEvent.user_id)
+        .having(func.count() >= interval)
+        .limit(limit)
+    )
+    user_ids: List[UUID] = list(result.scalars().all())
+
+    for user_id in user_ids:
+        await _save_snapshot(session, user_id, None)
+        await session.commit()
+    return len(user_ids)
+
+
+async def compact_events(session: AsyncSession, cutoff: datetime, limit: int) -> int:
+    """Fold events older than ``cutoff`` into a snapshot and delete them.
+
+    History before ``cutoff`` is then only available as that one snapshot.
+    Returns the number of events deleted.
+    """
+    result = await session.execute(
+        select(GameEvent.user_id).where(GameEvent.created_at < cutoff).distinct().limit(limit)
+    )
+    deleted = 0
+
+    for user_id in result.scalars().all():
+        anchor = await _save_snapshot(session, user_id, cutoff)
+        if anchor.event_id is None:
+            continue
+        removed = await session.execute(
+            delete(GameEvent).where(GameEvent.user_id == user_id, GameEvent.id <= anchor.event_id)
+        )
+        await session.execute(
+            delete(GameStateSnapshot).where(
+                GameStateSnapshot.user_id == user_id,
+                GameStateSnapshot.event_id < anchor.event_id,
+            )
+        )
+        await session.commit()
+        deleted += removed.rowcount
+    return deleted
+
+
+async def backfill_snapshots(session: AsyncSession, limit: int) -> int:
+    """Take a baseline snapshot of game states that predate the event log.
+
+    The snapshot holds the row as it is now and sits after any events the
+    user already has, so replays from now on start from the real state.
+    Returns the number of snapshots taken.
+    """
+    has_snapshot = (
+        select(GameStateSnapshot.id)
+        .where(GameStateSnapshot.user_id == GameState.user_id)
+        .exists()
+    )
+    was_created = (
+        select(GameEvent.id)
+        .where(
+            GameEvent.user_id == GameState.user_id,
+            GameEvent.event_type == GameEventType.STATE_CREATED,
+        )
+        .exists()
+    )
+    result = await session.execute(
+        select(GameState)
+        .where(~has_snapshot, ~was_created)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    game_states = result.scalars().all()
+
+    now = datetime.utcnow()
+    for game_state in game_states:
+        last_event = await session.execute(
+            select(func.max(GameEvent.id)).where(GameEvent.user_id == game_state.user_id)
+        )
+        state = state_payload({key: getattr(game_state, key) for key in STATE_FIELDS})
+        session.add(
+            GameStateSnapshot(
+                user_id=game_state.user_id,
+                event_id=last_event.scalar_one() or 0,
+                taken_at=now,
+                state=json.dumps(state),
+            )
+        )
+    await session.commit()
+    return len(game_states)
+
+
+async def backfill_all(batch_size: int) -> int:
+    """Backfill baseline snapshots on every database holding game states."""
+    total = 0
+    for session_maker in data_worker_session_makers():
+        async with session_maker() as session:
+            while True:
+                taken = await backfill_snapshots(session, batch_size)
+                if not taken:
+                    break
+                total += taken
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain the game event log.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = commands.add_parser(
+        "backfill", help="Snapshot game states created before the event log"
+    )
+    backfill_parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    print(json.dumps({"snapshots": asyncio.run(backfill_all(args.batch_size))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
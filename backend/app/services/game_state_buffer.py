@@ -0,0 +1,202 @@
+"""Write-behind buffer for high-frequency game state fields.
+
+Clients report ``total_playtime_minutes`` and ``last_played`` many times a
+minute. With ``GAME_STATE_WRITE_BEHIND`` enabled, PATCHes that only touch
+these fields are written to a Redis hash per user instead of Postgres, and
+the ``flush_game_states`` task copies all pending hashes to ``game_states``
+in one batched UPDATE every ``GAME_STATE_FLUSH_INTERVAL_SECONDS``.
+
+Each hash carries a ``version`` counter bumped on every tick. A flush only
+removes a hash if its version is unchanged after the rows were committed, so
+ticks that arrive mid-flush are kept for the next run and a crashed flush is
+simply repeated; at most one flush interval of ticks is ever at risk.
+
+Flushed playtime values are appended to the game event log in the same
+transaction, one ``state_updated`` event per user and flush.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from redis.asyncio import Redis
+from sqlalchemy import bindparam, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import redis_client
+from app.models.game_event import GameEvent, GameEventType
+from app.models.game_state import GameState
+
+BUFFERED_FIELDS = frozenset({"total_playtime_minutes", "last_played"})
+DIRTY_SET_KEY = "game_state:dirty"
+VERSION_FIELD = "version"
+
+# Delete a pending hash only if no tick arrived since it was read
+_DISCARD_IF_UNCHANGED = """
+if redis.call('HGET', KEYS[1], 'version') == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    redis.call('SREM', KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+def _pending_key(user_id: Any) -> str:
+    return f"game_state:pending:{user_id}"
+
+
+def is_bufferable(update_data: Dict[str, Any]) -> bool:
+    """Check whether an update only touches write-behind fields."""
+    return bool(update_data) and set(update_data) <= BUFFERED_FIELDS
+
+
+def _decode(raw: Dict[str, str]) -> Dict[str, Any]:
+    """Convert a pending hash to typed GameState values."""
+    values: Dict[str, Any] = {}
+    if "total_playtime_minutes" in raw:
+        values["total_playtime_minutes"] = int(raw["total_playtime_minutes"])
+    if "last_played" in raw:
+        values["last_played"] = datetime.fromisoformat(raw["last_played"])
+    return values
+
+
+async def buffer_tick(
+    user_id: UUID, update_data: Dict[str, Any], redis: Redis = redis_client
+) -> Dict[str, Any]:
+    """Record a tick and return all pending values for the user."""
+    fields = {
+        key: value.isoformat() if isinstance(value, datetime) else str(value)
+        for key, value in update_data.items()
+        if key in BUFFERED_FIELDS and value is not None
+    }
+    key = _pending_key(user_id)
+    async with redis.pipeline(transaction=True) as pipe:
+        if fields:
+            pipe.hset(key, mapping=fields)
+        pipe.hincrby(key, VERSION_FIELD, 1)
+        pipe.sadd(DIRTY_SET_KEY, str(user_id))
+        pipe.hgetall(key)
+        results = await pipe.execute()
+    return _decode(results[-1])
+
+
+async def get_pending(
+    user_id: UUID, redis: Redis = redis_client
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Get a user's pending values and the buffer version they were read at."""
+    raw = await redis.hgetall(_pending_key(user_id))
+    return _decode(raw), raw.get(VERSION_FIELD)
+
+
+async def discard_pending(
+    user_id: UUID, version: Optional[str], redis: Redis = redis_client
+) -> bool:
+    """Drop a user's pending values if they are still at ``version``."""
+    if version is None:
+        return False
+    discarded = await redis.eval(
+        _DISCARD_IF_UNCHANGED, 2, _pending_key(user_id), DIRTY_SET_KEY, version, str(user_id)
+    )
+    return bool(discarded)
+
+
+async def clear_pending(user_id: UUID, redis: Redis = redis_client) -> None:
+    """Drop a user's pending values unconditionally."""
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.delete(_pending_key(user_id))
+        pipe.srem(DIRTY_SET_KEY, str(user_id))
+        await pipe.execute()
+
+
+def apply_pending(game_state: Any, pending: Dict[str, Any]) -> Any:
+    """Overlay pending values on a game state object."""
+    for key, value in pending.items():
+        setattr(game_state, key, value)
+    return game_state
+
+
+async def dirty_users(redis: Redis, batch_size: int) -> List[str]:
+    """Get the ids of users with pending values."""
+    return [user_id async for user_id in redis.sscan_iter(DIRTY_SET_KEY, count=batch_size)]
+
+
+async def flush_pending(
+    session: AsyncSession,
+    redis: Redis,
+    batch_size: int,
+    user_ids: Optional[List[str]] = None,
+) -> int:
+    """Write pending buffers to ``game_states``. Returns users flushed.
+
+    Flushes every dirty user unless ``user_ids`` narrows it down (e.g. to
+    the users living on ``session``'s shard).
+    """
+    if user_ids is None:
+        user_ids = await dirty_users(redis, batch_size)
+    flushed = 0
+
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        async with redis.pipeline(transaction=False) as pipe:
+            for user_id in batch:
+                pipe.hgetall(_pending_key(user_id))
+            hashes = await pipe.execute()
+
+        rows: List[Dict[str, Any]] = []
+        versions: List[Tuple[str, str]] = []
+        now = datetime.utcnow()
+        for user_id, raw in zip(batch, hashes):
+            if not raw:
+                await redis.srem(DIRTY_SET_KEY, user_id)
+                continue
+            values = _decode(raw)
+            rows.append(
+                {
+                    "b_user_id": UUID(user_id),
+                    "b_playtime": values.get("total_playtime_minutes"),
+                    "b_last_played": values.get("last_played"),
+                    "b_updated_at": now,
+                }
+            )
+            versions.append((user_id, raw[VERSION_FIELD]))
+
+        if not rows:
+            continue
+
+        table = GameState.__table__
+        await session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam("b_user_id"))
+            .values(
+                total_playtime_minutes=_coalesce(table.c.total_playtime_minutes, "b_playtime"),
+                last_played=_coalesce(table.c.last_played, "b_last_played"),
+                updated_at=bindparam("b_updated_at"),
+            ),
+            rows,
+        )
+        events = [
+            {
+                "user_id": row["b_user_id"],
+                "event_type": GameEventType.STATE_UPDATED,
+                "payload": json.dumps({"total_playtime_minutes": row["b_playtime"]}),
+                "created_at": now,
+            }
+            for row in rows
+            if row["b_playtime"] is not None
+        ]
+        if events:
+            await session.execute(insert(GameEvent), events)
+        await session.commit()
+
+        for user_id, version in versions:
+            await discard_pending(user_id, version, redis)
+        flushed += len(rows)
+
+    return flushed
+
+
+def _coalesce(column: Any, param: str) -> Any:
+    """Keep the stored value when a buffer has no value for the column."""
+    return func.coalesce(bindparam(param, type_=column.type), column)
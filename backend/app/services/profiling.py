@@ -0,0 +1,107 @@
+"""Request profile capture and storage.
+
+SQL statements are timed by engine event listeners that only record while a
+profiled request has set ``sql_log`` for its context; for every other
+request the listeners cost a context variable read. Statement parameters are
+never recorded.
+
+Profiles are stored in Redis for ``PROFILE_TTL_SECONDS`` as a hash holding
+the report (JSON) and the pyinstrument HTML call tree, indexed by start
+time; only the newest ``PROFILE_MAX_STORED`` are kept.
+"""
+
+import json
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional
+
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.cache import redis_client
+from app.config import settings
+from app.models.profile import ProfileReport, ProfileSummary
+
+PROFILE_INDEX_KEY = "profiles"
+
+sql_log: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("profile_sql_log", default=None)
+
+
+def _profile_key(profile_id: str) -> str:
+    return f"profile:{profile_id}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and sql_log.get() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    log = sql_log.get()
+    started = getattr(context, "_profile_started", None)
+    if log is None or started is None:
+        return
+    log.append(
+        {
+            "statement": statement,
+            "duration_ms": (time.perf_counter() - started) * 1000,
+            "executemany": executemany,
+        }
+    )
+
+
+def install_sql_capture(engines: Iterable[AsyncEngine]) -> None:
+    """Time SQL statements of profiled requests on these engines."""
+    for engine in engines:
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def save_profile(report: ProfileReport, html: str, redis: Redis = redis_client) -> None:
+    """Store a profile and drop the oldest beyond ``PROFILE_MAX_STORED``."""
+    key = _profile_key(report.id)
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={"report": report.model_dump_json(), "html": html})
+        pipe.expire(key, settings.PROFILE_TTL_SECONDS)
+        pipe.zadd(PROFILE_INDEX_KEY, {report.id: report.started_at.timestamp()})
+        pipe.zremrangebyscore(
+            PROFILE_INDEX_KEY, "-inf", time.time() - settings.PROFILE_TTL_SECONDS
+        )
+        await pipe.execute()
+
+    evicted = await redis.zrange(PROFILE_INDEX_KEY, 0, -(settings.PROFILE_MAX_STORED + 1))
+    if evicted:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(PROFILE_INDEX_KEY, *evicted)
+            pipe.delete(*(_profile_key(profile_id) for profile_id in evicted))
+            await pipe.execute()
+
+
+async def list_profiles(limit: int, redis: Redis = redis_client) -> List[ProfileSummary]:
+    """Get the newest stored profiles."""
+    profile_ids = await redis.zrevrange(PROFILE_INDEX_KEY, 0, limit - 1)
+    async with redis.pipeline(transaction=False) as pipe:
+        for profile_id in profile_ids:
+            pipe.hget(_profile_key(profile_id), "report")
+        reports = await pipe.execute()
+
+    summaries = []
+    for raw in reports:
+        if raw is None:
+            continue  # Expired
+        data: Dict[str, Any] = json.loads(raw)
+        data.pop("sql", None)
+        summaries.append(ProfileSummary(**data))
+    return summaries
+
+
+async def get_profile(profile_id: str, redis: Redis = redis_client) -> Optional[ProfileReport]:
+    """Get a stored profile report."""
+    raw = await redis.hget(_profile_key(profile_id), "report")
+    return None if raw is None else ProfileReport.model_validate_json(raw)
+
+
+async def get_profile_html(profile_id: str, redis: Redis = redis_client) -> Optional[str]:
+    """Get a stored profile's HTML call tree."""
+    return await redis.hget(_profile_key(profile_id), "html")
@@ -0,0 +1,132 @@
+"""Daily case quota.
+
+``MAX_CASES_PER_DAY`` is enforced with one Redis counter per user and local
+day, expiring at the player's next local midnight (``User.timezone``). The
+first create of a day seeds the counter from Postgres, so a flushed or
+restarted Redis does not reset anyone's quota; after that each create is a
+single atomic script call. If Redis is unavailable the quota is checked
+with a count over ``cases`` instead.
+
+Cases count against the day they were created even if later deleted, so
+deleting and recreating does not bypass the limit. The count comes from
+``cases`` rows, so a deleted case is not purged until ``QUOTA_DAY_MAX``
+after it was created, when no local day it fell in can still be running.
+"""
+
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional, Tuple
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import redis_client
+from app.config import settings
+from app.models.case import Case
+
+# Longest a local day can last (25 hours when DST ends), with a margin
+QUOTA_DAY_MAX = timedelta(hours=26)
+
+# Take a slot unless the limit is reached
+_RESERVE = """
+local count = redis.call('INCR', KEYS[1])
+if count > tonumber(ARGV[1]) then
+    redis.call('DECR', KEYS[1])
+    return 0
+end
+return 1
+"""
+
+# Give a slot back, unless the day's counter has already expired
+_RELEASE = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('DECR', KEYS[1])
+end
+"""
+
+
+class QuotaExceeded(Exception):
+    """Raised when a user has used up their daily case quota."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Daily case limit reached")
+        self.retry_after = retry_after
+
+
+def day_window(tz_name: str, now: Optional[datetime] = None) -> Tuple[str, datetime, int]:
+    """Get a user's local day, its start as naive UTC, and seconds until it ends."""
+    try:
+        tz = ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = ZoneInfo("UTC")
+
+    now_utc = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    local_now = now_utc.astimezone(tz)
+    start = datetime.combine(local_now.date(), time.min, tzinfo=tz).astimezone(timezone.utc)
+    end = datetime.combine(
+        local_now.date() + timedelta(days=1), time.min, tzinfo=tz
+    ).astimezone(timezone.utc)
+    # Subtract in UTC: same-zone aware datetimes subtract as wall clock time,
+    # which is off by an hour on DST change days
+    seconds_left = max(int((end - now_utc).total_seconds()), 1)
+    return local_now.date().isoformat(), start.replace(tzinfo=None), seconds_left
+
+
+def counts_toward_quota(created_at: datetime, now: Optional[datetime] = None) -> bool:
+    """Check whether a case (``created_at`` in naive UTC) may still count today."""
+    return created_at > (now or datetime.utcnow()) - QUOTA_DAY_MAX
+
+
+def _quota_key(user_id: UUID, day: str) -> str:
+    return f"case_quota:{user_id}:{day}"
+
+
+async def _count_created_since(session: AsyncSession, user_id: UUID, since: datetime) -> int:
+    result = await session.execute(
+        select(func.count())
+        .select_from(Case)
+        .where(Case.user_id == user_id, Case.created_at >= since)
+    )
+    return result.scalar_one()
+
+
+async def reserve_case_slot(
+    session: AsyncSession, user_id: UUID, tz_name: str, redis: Redis = redis_client
+) -> Optional[str]:
+    """Take one of today's case slots, raising ``QuotaExceeded`` if none is left.
+
+    Returns the quota key to pass to ``release_case_slot`` if the case is
+    not created after all (None when the slot was checked in Postgres).
+    """
+    day, day_start, seconds_left = day_window(tz_name)
+    key = _quota_key(user_id, day)
+    limit = settings.MAX_CASES_PER_DAY
+
+    try:
+        if not await redis.exists(key):
+            used = await _count_created_since(session, user_id, day_start)
+            await redis.set(key, used, nx=True, ex=seconds_left)
+        allowed = await redis.eval(_RESERVE, 1, key, limit)
+    except RedisError as exc:
+        logger.warning(f"Case quota store unavailable, counting in Postgres: {exc}")
+        if await _count_created_since(session, user_id, day_start) >= limit:
+            raise QuotaExceeded(retry_after=seconds_left)
+        return None
+
+    if not allowed:
+        raise QuotaExceeded(retry_after=seconds_left)
+    return key
+
+
+async def release_case_slot(key: Optional[str], redis: Redis = redis_client) -> None:
+    """Give back a slot taken by ``reserve_case_slot``."""
+    if key is None:
+        return
+    try:
+        await redis.eval(_RELEASE, 1, key)
+    except RedisError as exc:
+        logger.warning(f"Failed to release case quota slot: {exc}")
@@ -0,0 +1,139 @@
+"""Full-text search over cases and characters.
+
+Both tables carry a generated ``search_vector`` column with a GIN index, so
+matching never parses text at query time. Results from both tables are
+ranked together with ``ts_rank_cd`` and paginated by keyset on
+``(rank DESC, kind, id)``; snippets are only highlighted for the rows of the
+returned page.
+"""
+
+import base64
+import json
+from typing import Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, literal, or_, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.case import Case
+from app.models.character import Character
+from app.models.search import SearchHit, SearchKind, SearchPage
+
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+
+def encode_cursor(rank: float, kind: str, hit_id: UUID) -> str:
+    """Encode the position after a result as an opaque cursor."""
+    payload = json.dumps([rank, kind, str(hit_id)]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str, UUID]:
+    """Decode a cursor. Raises ValueError if it is malformed."""
+    try:
+        rank, kind, hit_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), SearchKind(kind).value, UUID(hit_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid search cursor") from exc
+
+
+def build_search_query(
+    text: str,
+    user_id: Optional[UUID],
+    limit: int,
+    cursor: Optional[str] = None,
+):
+    """Build the ranked, paginated search statement.
+
+    ``user_id`` restricts results to that user's cases and their characters;
+    pass None to search across all users. Selects ``limit + 1`` rows so the
+    caller can tell whether another page exists.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+
+    case_hits = select(
+        literal(SearchKind.CASE.value).label("kind"),
+        Case.id.label("id"),
+        Case.id.label("case_id"),
+        Case.title.label("title"),
+        func.ts_rank_cd(Case.search_vector, query).label("rank"),
+        Case.description.label("body"),
+    ).where(Case.search_vector.op("@@")(query), Case.deleted_at.is_(None))
+
+    character_hits = select(
+        literal(SearchKind.CHARACTER.value).label("kind"),
+        Character.id.label("id"),
+        Character.case_id.label("case_id"),
+        Character.name.label("title"),
+        func.ts_rank_cd(Character.search_vector, query).label("rank"),
+        func.concat_ws(
+            " ",
+            Character.testimony,
+            Character.alibi,
+            Character.description,
+            Character.dialogue_history,
+        ).label("body"),
+    ).join(Case, Case.id == Character.case_id).where(
+        Character.search_vector.op("@@")(query),
+        Case.deleted_at.is_(None),
+    )
+
+    if user_id is not None:
+        case_hits = case_hits.where(Case.user_id == user_id)
+        character_hits = character_hits.where(Case.user_id == user_id)
+
+    hits = union_all(case_hits, character_hits).subquery("hits")
+
+    page = select(hits)
+    if cursor:
+        rank, kind, hit_id = decode_cursor(cursor)
+        page = page.where(
+            or_(
+                hits.c.rank < rank,
+                and_(hits.c.rank == rank, tuple_(hits.c.kind, hits.c.id) > tuple_(kind, hit_id)),
+            )
+        )
+    page = (
+        page.order_by(hits.c.rank.desc(), hits.c.kind, hits.c.id)
+        .limit(limit + 1)
+        .subquery("page")
+    )
+
+    return select(
+        page.c.kind,
+        page.c.id,
+        page.c.case_id,
+        page.c.title,
+        page.c.rank,
+        func.ts_headline(SEARCH_CONFIG, page.c.body, query, HEADLINE_OPTIONS).label("snippet"),
+    ).order_by(page.c.rank.desc(), page.c.kind, page.c.id)
+
+
+async def search(
+    session: AsyncSession,
+    text: str,
+    user_id: Optional[UUID],
+    limit: int,
+    cursor: Optional[str] = None,
+) -> SearchPage:
+    """Run a search and return one page of results."""
+    result = await session.execute(build_search_query(text, user_id, limit, cursor))
+    rows = result.all()
+
+    results = [
+        SearchHit(
+            kind=row.kind,
+            id=row.id,
+            case_id=row.case_id,
+            title=row.title,
+            rank=row.rank,
+            snippet=row.snippet or "",
+        )
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = results[-1]
+        next_cursor = encode_cursor(last.rank, last.kind.value, last.id)
+    return SearchPage(results=results, next_cursor=next_cursor)
@@ -0,0 +1,215 @@
+"""User shard placement and rebalancing.
+
+With ``DATABASE_SHARD_URLS`` set, every user-owned row (game state, cases,
+characters, decisions, game events, snapshots and archived cases) lives on
+one shard; the primary keeps the ``users`` table. A user's shard is
+``User.shard`` when set, otherwise the jump consistent hash of their id over
+the configured shards (``app.database.shard_for_user``).
+
+Adding a shard changes the hashed shard of about ``1/n`` of the users, so:
+
+1. ``pin`` stores every user's current shard (run with the old shard list);
+2. deploy the new ``DATABASE_SHARD_URLS`` (new users spread over all shards);
+3. ``rebalance`` moves each pinned user whose hashed shard changed and
+   clears the pin.
+
+``move_user`` copies a user's rows to the target shard, checks the source
+did not change meanwhile, switches ``User.shard`` and only then deletes the
+old rows. Requests from the user during a move may fail or be refused, so
+moves are best run while the user is offline.
+
+Run from the command line::
+
+    python -m app.services.sharding pin
+    python -m app.services.sharding rebalance --limit 1000
+    python -m app.services.sharding move <user_id> <shard>
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Table, delete, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import shard_for_user, worker_session_maker, worker_shard_session_makers
+from app.models.archive import ArchivedCase
+from app.models.case import Case
+from app.models.character import Character
+from app.models.decision import Decision
+from app.models.game_event import GameEvent, GameStateSnapshot
+from app.models.game_state import GameState
+from app.models.user import User
+
+
+def _owned_rows(user_id: UUID) -> List[Tuple[Table, Any]]:
+    """Get each user-owned table with the condition selecting the user's rows.
+
+    Tables are listed parents first, so copying in this order and deleting
+    in reverse order never violates a foreign key.
+    """
+    case_ids = select(Case.id).where(Case.user_id == user_id)
+    character_ids = select(Character.id).where(Character.case_id.in_(case_ids))
+    return [
+        (GameState.__table__, GameState.user_id == user_id),
+        (Case.__table__, Case.user_id == user_id),
+        (Character.__table__, Character.case_id.in_(case_ids)),
+        (
+            Decision.__table__,
+            or_(Decision.case_id.in_(case_ids), Decision.character_id.in_(character_ids)),
+        ),
+        (GameEvent.__table__, GameEvent.user_id == user_id),
+        (GameStateSnapshot.__table__, GameStateSnapshot.user_id == user_id),
+        (ArchivedCase.__table__, ArchivedCase.user_id == user_id),
+    ]
+
+
+async def load_placements(
+    session: AsyncSession, user_ids: Iterable[UUID]
+) -> Dict[UUID, Optional[int]]:
+    """Get the shard of each existing user (None when sharding is off)."""
+    result = await session.execute(
+        select(User.id, User.shard).where(User.id.in_(list(user_ids)))
+    )
+    return {user_id: shard_for_user(user_id, shard) for user_id, shard in result.all()}
+
+
+async def _count_rows(session: AsyncSession, user_id: UUID) -> Dict[str, int]:
+    counts = {}
+    for table, condition in _owned_rows(user_id):
+        result = await session.execute(select(func.count()).select_from(table).where(condition))
+        counts[table.name] = result.scalar_one()
+    return counts
+
+
+async def _copy_rows(source: AsyncSession, target: AsyncSession, user_id: UUID) -> Dict[str, int]:
+    """Copy a user's rows without committing the target."""
+    copied = {}
+    for table, condition in _owned_rows(user_id):
+        # Generated columns are recomputed by the target
+        columns = [column for column in table.columns if column.computed is None]
+        result = await source.stream(select(*columns).where(condition))
+        copied[table.name] = 0
+        async for rows in result.mappings().partitions(settings.PURGE_BATCH_SIZE):
+            await target.execute(insert(table), [dict(row) for row in rows])
+            copied[table.name] += len(rows)
+    return copied
+
+
+async def _delete_rows(session: AsyncSession, user_id: UUID) -> None:
+    for table, condition in reversed(_owned_rows(user_id)):
+        await session.execute(delete(table).where(condition))
+
+
+async def move_user(user_id: UUID, target: int) -> Dict[str, int]:
+    """Move a user's rows to another shard. Returns the rows copied per table."""
+    if not 0 <= target < len(worker_shard_session_makers):
+        raise ValueError(f"Shard {target} is not configured")
+
+    async with worker_session_maker() as primary:
+        user = await primary.get(User, user_id)
+        if user is None:
+            raise ValueError(f"User {user_id} not found")
+        source = shard_for_user(user_id, user.shard)
+        if source == target:
+            return {}
+
+        source_session = worker_shard_session_makers[source]()
+        target_session = worker_shard_session_makers[target]()
+        try:
+            # Leftovers from an interrupted move are stale copies
+            await _delete_rows(target_session, user_id)
+            copied = await _copy_rows(source_session, target_session, user_id)
+            if await _count_rows(source_session, user_id) != copied:
+                await target_session.rollback()
+                raise RuntimeError(f"Rows of user {user_id} changed during the move; retry")
+            await target_session.commit()
+
+            try:
+                user.shard = None if target == shard_for_user(user_id) else target
+                await primary.commit()
+            except BaseException:
+                await _delete_rows(target_session, user_id)
+                await target_session.commit()
+                raise
+
+            await _delete_rows(source_session, user_id)
+            await source_session.commit()
+        finally:
+            await source_session.close()
+            await target_session.close()
+
+    return copied
+
+
+async def pin_users() -> int:
+    """Store the current shard of every user without one."""
+    if not worker_shard_session_makers:
+        raise ValueError("Sharding is not enabled")
+
+    pinned = 0
+    async with worker_session_maker() as session:
+        while True:
+            result = await session.execute(
+                select(User.id).where(User.shard.is_(None)).limit(settings.PURGE_BATCH_SIZE)
+            )
+            user_ids = result.scalars().all()
+            if not user_ids:
+                return pinned
+            for user_id in user_ids:
+                await session.execute(
+                    update(User).where(User.id == user_id).values(shard=shard_for_user(user_id))
+                )
+            await session.commit()
+            pinned += len(user_ids)
+
+
+async def rebalance(limit: int) -> Dict[str, int]:
+    """Move pinned users to their hashed shard and clear their pin."""
+    moved = unpinned = 0
+    async with worker_session_maker() as session:
+        result = await session.execute(
+            select(User.id, User.shard).where(User.shard.is_not(None)).limit(limit)
+        )
+        placements = result.all()
+
+    for user_id, shard in placements:
+        target = shard_for_user(user_id)
+        if target == shard_for_user(user_id, shard):
+            async with worker_session_maker() as session:
+                await session.execute(update(User).where(User.id == user_id).values(shard=None))
+                await session.commit()
+            unpinned += 1
+        else:
+            await move_user(user_id, target)
+            moved += 1
+    return {"moved": moved, "unpinned": unpinned}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage user shard placement.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("pin", help="Store every user's current shard")
+    rebalance_parser = commands.add_parser(
+        "rebalance", help="Move pinned users to their hashed shard"
+    )
+    rebalance_parser.add_argument("--limit", type=int, default=1000)
+    move_parser = commands.add_parser("move", help="Move one user to a shard")
+    move_parser.add_argument("user_id", type=UUID)
+    move_parser.add_argument("shard", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "pin":
+        result: Any = {"pinned": asyncio.run(pin_users())}
+    elif args.command == "rebalance":
+        result = asyncio.run(rebalance(args.limit))
+    else:
+        result = asyncio.run(move_user(args.user_id, args.shard))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Suspect ranking engine.
+
+Scores every character of one or many cases from the character's own
+suspicion and trust levels plus the decisions that targeted it. All cases in
+a batch are scored together: per-character features are aggregated with
+``np.bincount`` and normalised with a per-case softmax, so the cost is a few
+array passes regardless of how many cases are in the batch.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.character import Character, SuspectScore
+from app.models.decision import Decision, DecisionOutcome, DecisionType
+
+FEATURE_NAMES = (
+    "suspicion",
+    "distrust",
+    "clues",
+    "evidence",
+    "outcomes",
+    "pressure",
+)
+
+# Default weights, one per entry in FEATURE_NAMES
+DEFAULT_WEIGHTS = np.array([1.5, 0.75, 1.0, 1.25, 0.5, 0.5])
+
+# How much a decision outcome against a character counts towards suspicion
+OUTCOME_WEIGHTS = {
+    DecisionOutcome.SUCCESS: 1.0,
+    DecisionOutcome.PARTIAL_SUCCESS: 0.5,
+    DecisionOutcome.NEUTRAL: 0.0,
+    DecisionOutcome.FAILURE: -0.25,
+}
+
+# Arresting a character implicates them, releasing one clears them
+PRESSURE_WEIGHTS = {
+    DecisionType.ARREST: 1.0,
+    DecisionType.RELEASE: -1.0,
+}
+
+
+def build_features(
+    characters: Sequence[Character], decisions: Sequence[Decision]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Build the feature matrix for a batch of characters.
+
+    Returns the ``(n_characters, n_features)`` feature matrix and the raw
+    clue and evidence counts per character. Decisions that do not target a
+    character in the batch are ignored.
+    """
+    n = len(characters)
+    row_by_id = {character.id: row for row, character in enumerate(characters)}
+
+    linked = [
+        (row_by_id[decision.character_id], decision)
+        for decision in decisions
+        if decision.character_id in row_by_id
+    ]
+    rows = np.fromiter((row for row, _ in linked), dtype=np.intp, count=len(linked))
+    clue = np.fromiter(
+        (decision.clue_discovered for _, decision in linked), dtype=float, count=len(linked)
+    )
+    evidence = np.fromiter(
+        (decision.evidence_obtained for _, decision in linked), dtype=float, count=len(linked)
+    )
+    outcome = np.fromiter(
+        (OUTCOME_WEIGHTS.get(decision.outcome, 0.0) for _, decision in linked),
+        dtype=float,
+        count=len(linked),
+    )
+    pressure = np.fromiter(
+        (PRESSURE_WEIGHTS.get(decision.decision_type, 0.0) for _, decision in linked),
+        dtype=float,
+        count=len(linked),
+    )
+
+    suspicion = np.fromiter(
+        (character.suspicion_level for character in characters), dtype=float, count=n
+    )
+    trust = np.fromiter((character.trust_level for character in characters), dtype=float, count=n)
+
+    clue_counts = np.bincount(rows, weights=clue, minlength=n)
+    evidence_counts = np.bincount(rows, weights=evidence, minlength=n)
+
+    features = np.column_stack(
+        [
+            np.clip(suspicion, 0, 100) / 100.0,
+            1.0 - np.clip(trust, 0, 100) / 100.0,
+            np.log1p(clue_counts),
+            np.log1p(evidence_counts),
+            np.tanh(np.bincount(rows, weights=outcome, minlength=n)),
+            np.tanh(np.bincount(rows, weights=pressure, minlength=n)),
+        ]
+    )
+    return features, clue_counts, evidence_counts
+
+
+def score_characters(
+    characters: Sequence[Character],
+    decisions: Sequence[Decision],
+    weights: Optional[Sequence[float]] = None,
+) -> Dict[UUID, List[SuspectScore]]:
+    """Score and rank characters, grouped by case.
+
+    ``characters`` may span any number of cases. Returns the ranked suspects
+    of each case, most suspicious first.
+    """
+    if not characters:
+        return {}
+
+    weight_vector = DEFAULT_WEIGHTS if weights is None else np.asarray(weights, dtype=float)
+    if weight_vector.shape != DEFAULT_WEIGHTS.shape:
+        raise ValueError(f"Expected {len(FEATURE_NAMES)} weights, got {weight_vector.size}")
+
+    features, clue_counts, evidence_counts = build_features(characters, decisions)
+    scores = features @ weight_vector
+
+    index_by_case: Dict[UUID, int] = {}
+    case_index = np.fromiter(
+        (index_by_case.setdefault(character.case_id, len(index_by_case)) for character in characters),
+        dtype=np.intp,
+        count=len(characters),
+    )
+    n_cases = len(index_by_case)
+
+    # Softmax within each case
+    case_max = np.full(n_cases, -np.inf)
+    np.maximum.at(case_max, case_index, scores)
+    exp_scores = np.exp(scores - case_max[case_index])
+    probabilities = exp_scores / np.bincount(case_index, weights=exp_scores, minlength=n_cases)[
+        case_index
+    ]
+
+    # Rank within each case: sort by case, then by descending score
+    order = np.lexsort((-scores, case_index))
+    sorted_cases = case_index[order]
+    first_in_case = np.searchsorted(sorted_cases, sorted_cases)
+    ranks = np.empty(len(characters), dtype=np.intp)
+    ranks[order] = np.arange(len(characters)) - first_in_case + 1
+
+    rankings: Dict[UUID, List[SuspectScore]] = {}
+    for row in order:
+        character = characters[row]
+        rankings.setdefault(character.case_id, []).append(
+            SuspectScore(
+                character_id=character.id,
+                case_id=character.case_id,
+                name=character.name,
+                role=character.role,
+                score=float(scores[row]),
+                probability=float(probabilities[row]),
+                rank=int(ranks[row]),
+                clues_linked=int(clue_counts[row]),
+                evidence_linked=int(evidence_counts[row]),
+            )
+        )
+    return rankings
+
+
+async def load_cases(
+    session: AsyncSession, case_ids: Sequence[UUID]
+) -> Tuple[List[Character], List[Decision]]:
+    """Load the characters and character-targeted decisions of the given cases."""
+    characters = await session.execute(
+        select(Character).where(Character.case_id.in_(case_ids))
+    )
+    decisions = await session.execute(
+        select(Decision).where(
+            Decision.case_id.in_(case_ids),
+            Decision.character_id.is_not(None),
+        )
+    )
+    return list(characters.scalars().all()), list(decisions.scalars().all())
+
+
+async def rank_case(session: AsyncSession, case_id: UUID) -> List[SuspectScore]:
+    """Rank the suspects of a single case."""
+    characters, decisions = await load_cases(session, [case_id])
+    return score_characters(characters, decisions).get(case_id, [])
@@ -1,5 +1,6 @@
 """Celery task package."""
 
 from .celery_app import celery_app
+from . import archive, calibration, game_events, game_state, purge, suspects  # noqa: F401  (registers tasks)
 
 __all__ = ["celery_app"]
@@ -0,0 +1,53 @@
+"""Case archival and decision partition tasks."""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List
+
+from redis import asyncio as aioredis
+
+from app.config import settings
+from app.database import (
+    data_worker_session_makers,
+    ensure_decision_partitions,
+    worker_engine,
+    worker_shard_engines,
+)
+from app.services.archive import archive_finished_cases
+from app.tasks.celery_app import celery_app
+
+
+async def _archive_cases() -> int:
+    cutoff = datetime.utcnow() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    archived = 0
+    # Each task runs in a fresh event loop, so it needs its own Redis client
+    redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        for session_maker in data_worker_session_makers():
+            async with session_maker() as session:
+                archived += await archive_finished_cases(
+                    session, redis, cutoff, settings.ARCHIVE_BATCH_SIZE
+                )
+    finally:
+        await redis.aclose()
+    return archived
+
+
+async def _create_decision_partitions() -> List[str]:
+    names: List[str] = []
+    for engine in worker_shard_engines or [worker_engine]:
+        async with engine.begin() as conn:
+            names.extend(await ensure_decision_partitions(conn))
+    return names
+
+
+@celery_app.task(name="app.tasks.archive_cases")
+def archive_cases() -> int:
+    """Move cases finished more than ``ARCHIVE_AFTER_DAYS`` ago into the archive."""
+    return asyncio.run(_archive_cases())
+
+
+@celery_app.task(name="app.tasks.create_decision_partitions")
+def create_decision_partitions() -> List[str]:
+    """Make sure the upcoming monthly ``decisions`` partitions exist."""
+    return asyncio.run(_create_decision_partitions())
@@ -0,0 +1,18 @@
+"""Difficulty calibration tasks."""
+
+from typing import Any, Dict, Optional
+
+from app.services.calibration import calibrate
+from app.tasks.celery_app import celery_app
+
+
+@celery_app.task(name="app.tasks.calibrate_difficulty")
+def calibrate_difficulty(
+    playthroughs: int = 10_000, seed: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Run the Monte Carlo difficulty calibration.
+
+    Runs in-process: prefork Celery workers cannot start a process pool, and
+    the simulation is already vectorized. Use the CLI for multi-process runs.
+    """
+    return calibrate(playthroughs=playthroughs, workers=0, seed=seed)
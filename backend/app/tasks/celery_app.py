@@ -1,8 +1,13 @@
 """Celery application instance."""
 
 from celery import Celery
+from celery.signals import before_task_publish, setup_logging, task_postrun, task_prerun
 
 from app.config import settings
+from app.database import worker_engine, worker_shard_engines
+from app.log import configure_logging, install_sql_logging, request_id
+
+REQUEST_ID_HEADER = "request_id"
 
 # Initialize Celery application
 celery_app = Celery("nightshift_analyst")
@@ -11,6 +16,30 @@ celery_app = Celery("nightshift_analyst")
 celery_app.conf.broker_url = settings.CELERY_BROKER_URL
 celery_app.conf.result_backend = settings.CELERY_RESULT_BACKEND
 
+# Periodic jobs (run with `celery -A app.tasks.celery_app beat`)
+celery_app.conf.beat_schedule = {
+    "purge-deleted": {
+        "task": "app.tasks.purge_deleted",
+        "schedule": settings.PURGE_SWEEP_INTERVAL_SECONDS,
+    },
+    "flush-game-states": {
+        "task": "app.tasks.flush_game_states",
+        "schedule": settings.GAME_STATE_FLUSH_INTERVAL_SECONDS,
+    },
+    "archive-cases": {
+        "task": "app.tasks.archive_cases",
+        "schedule": settings.ARCHIVE_INTERVAL_SECONDS,
+    },
+    "create-decision-partitions": {
+        "task": "app.tasks.create_decision_partitions",
+        "schedule": 86400,
+    },
+    "compact-game-events": {
+        "task": "app.tasks.compact_game_events",
+        "schedule": settings.GAME_EVENT_COMPACTION_INTERVAL_SECONDS,
+    },
+}
+
 # Eagerly import task modules to ensure registration
 celery_app.autodiscover_tasks(["app"])
 
@@ -19,3 +48,29 @@ celery_app.autodiscover_tasks(["app"])
 def health_check() -> str:
     """Simple task used to verify Celery worker is running."""
     return "ok"
+
+
+@setup_logging.connect
+def _setup_logging(**kwargs) -> None:
+    """Log through the app's pipeline instead of Celery's own handlers."""
+    configure_logging()
+    install_sql_logging([worker_engine, *worker_shard_engines])
+
+
+@before_task_publish.connect
+def _attach_request_id(headers=None, **kwargs) -> None:
+    """Send the enqueuing request's id along with the task."""
+    current_id = request_id.get()
+    if current_id is not None and headers is not None:
+        headers.setdefault(REQUEST_ID_HEADER, current_id)
+
+
+@task_prerun.connect
+def _restore_request_id(task_id=None, task=None, **kwargs) -> None:
+    """Log a task under the id of the request that enqueued it (or its own id)."""
+    request_id.set(getattr(task.request, REQUEST_ID_HEADER, None) or task_id)
+
+
+@task_postrun.connect
+def _clear_request_id(**kwargs) -> None:
+    request_id.set(None)
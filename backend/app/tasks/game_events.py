@@ -0,0 +1,31 @@
+"""Game event log tasks."""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict
+
+from app.config import settings
+from app.database import data_worker_session_makers
+from app.services.game_events import compact_events, take_due_snapshots
+from app.tasks.celery_app import celery_app
+
+
+async def _compact_game_events() -> Dict[str, int]:
+    totals = {"snapshots": 0, "events_compacted": 0}
+    for session_maker in data_worker_session_makers():
+        async with session_maker() as session:
+            totals["snapshots"] += await take_due_snapshots(
+                session, settings.GAME_SNAPSHOT_INTERVAL_EVENTS, settings.PURGE_BATCH_SIZE
+            )
+            if settings.GAME_EVENT_RETENTION_DAYS > 0:
+                cutoff = datetime.utcnow() - timedelta(days=settings.GAME_EVENT_RETENTION_DAYS)
+                totals["events_compacted"] += await compact_events(
+                    session, cutoff, settings.PURGE_BATCH_SIZE
+                )
+    return totals
+
+
+@celery_app.task(name="app.tasks.compact_game_events")
+def compact_game_events() -> Dict[str, int]:
+    """Snapshot busy event logs and fold events past retention into snapshots."""
+    return asyncio.run(_compact_game_events())
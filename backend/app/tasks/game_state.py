@@ -0,0 +1,49 @@
+"""Game state tasks."""
+
+import asyncio
+from collections import defaultdict
+from typing import Dict, List
+from uuid import UUID
+
+from redis import asyncio as aioredis
+
+from app.config import settings
+from app.database import worker_session_maker, worker_shard_session_makers
+from app.services.game_state_buffer import clear_pending, dirty_users, flush_pending
+from app.services.sharding import load_placements
+from app.tasks.celery_app import celery_app
+
+
+async def _flush_game_states() -> int:
+    # Each task runs in a fresh event loop, so it needs its own Redis client
+    redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    batch_size = settings.GAME_STATE_FLUSH_BATCH_SIZE
+    try:
+        if not worker_shard_session_makers:
+            async with worker_session_maker() as session:
+                return await flush_pending(session, redis, batch_size)
+
+        user_ids = await dirty_users(redis, batch_size)
+        async with worker_session_maker() as session:
+            placements = await load_placements(session, [UUID(user_id) for user_id in user_ids])
+        by_shard: Dict[int, List[str]] = defaultdict(list)
+        for user_id, shard in placements.items():
+            by_shard[shard].append(str(user_id))
+        for user_id in user_ids:
+            if UUID(user_id) not in placements:
+                # Deleted user; nothing left to write to
+                await clear_pending(UUID(user_id), redis)
+
+        flushed = 0
+        for shard, shard_user_ids in by_shard.items():
+            async with worker_shard_session_makers[shard]() as session:
+                flushed += await flush_pending(session, redis, batch_size, shard_user_ids)
+        return flushed
+    finally:
+        await redis.aclose()
+
+
+@celery_app.task(name="app.tasks.flush_game_states")
+def flush_game_states() -> int:
+    """Write buffered game state ticks to Postgres."""
+    return asyncio.run(_flush_game_states())
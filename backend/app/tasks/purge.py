@@ -0,0 +1,243 @@
+"""Deferred deletion tasks.
+
+Deleting a case or an account only stamps ``deleted_at`` so the request
+returns immediately. These tasks then remove the rows in bounded batches,
+committing after each one so no single transaction holds locks for long.
+
+A deleted case still counts against its owner's daily quota, which is
+counted from ``cases`` rows, so it is only purged once it can no longer
+fall in the owner's current day. Until then the periodic sweep skips it.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from kombu.exceptions import OperationalError
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.asyncio import Redis
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import data_worker_session_makers, user_session_maker, worker_session_maker
+from app.models.archive import ArchivedCase
+from app.models.case import Case
+from app.models.character import Character
+from app.models.decision import Decision
+from app.models.game_event import GameEvent, GameStateSnapshot
+from app.models.game_state import GameState
+from app.models.user import User
+from app.services.case_ownership import remove_case
+from app.services.quotas import QUOTA_DAY_MAX, counts_toward_quota
+from app.tasks.celery_app import celery_app
+
+
+async def _delete_in_batches(session: AsyncSession, model: Any, condition: Any) -> int:
+    """Delete matching rows ``PURGE_BATCH_SIZE`` at a time."""
+    total = 0
+    while True:
+        batch = select(model.id).where(condition).limit(settings.PURGE_BATCH_SIZE)
+        result = await session.execute(
+            delete(model)
+            .where(model.id.in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        total += result.rowcount
+        if result.rowcount < settings.PURGE_BATCH_SIZE:
+            return total
+
+
+def _redis() -> Redis:
+    # Each task runs in a fresh event loop, so it needs its own Redis client
+    return aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def _purge_case(
+    session: AsyncSession, redis: Redis, case_id: UUID, keep_counted: bool = True
+) -> Dict[str, int]:
+    """Remove a soft-deleted case with its decisions and characters.
+
+    With ``keep_counted`` a case that still counts against its owner's daily
+    quota is left for a later sweep.
+    """
+    result = await session.execute(
+        select(Case.user_id, Case.deleted_at, Case.created_at).where(Case.id == case_id)
+    )
+    row = result.one_or_none()
+    if row is None or row.deleted_at is None:
+        # Missing, already purged, or not deleted
+        return {"decisions": 0, "characters": 0, "cases": 0}
+    if keep_counted and counts_toward_quota(row.created_at):
+        return {"decisions": 0, "characters": 0, "cases": 0}
+    await remove_case(row.user_id, case_id, redis)
+
+    character_ids = select(Character.id).where(Character.case_id == case_id)
+    decisions = await _delete_in_batches(
+        session,
+        Decision,
+        or_(Decision.case_id == case_id, Decision.character_id.in_(character_ids)),
+    )
+    characters = await _delete_in_batches(session, Character, Character.case_id == case_id)
+    result = await session.execute(
+        delete(Case).where(Case.id == case_id, Case.deleted_at.is_not(None))
+    )
+    await session.commit()
+    return {"decisions": decisions, "characters": characters, "cases": result.rowcount}
+
+
+async def _purge_user_rows(session: AsyncSession, redis: Redis, user_id: UUID) -> int:
+    """Remove everything a user owns. Returns the number of cases purged."""
+    # Hide any remaining cases first so they disappear from every read path
+    await session.execute(
+        update(Case)
+        .where(Case.user_id == user_id, Case.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow())
+    )
+    await session.commit()
+
+    cases = 0
+    while True:
+        result = await session.execute(
+            select(Case.id).where(Case.user_id == user_id).limit(settings.PURGE_BATCH_SIZE)
+        )
+        purged = 0
+        for case_id in result.scalars().all():
+            # The account is gone, so its quota no longer matters
+            purged += (await _purge_case(session, redis, case_id, keep_counted=False))["cases"]
+        if not purged:
+            break
+        cases += purged
+
+    await session.execute(delete(ArchivedCase).where(ArchivedCase.user_id == user_id))
+    await session.execute(delete(GameState).where(GameState.user_id == user_id))
+    await session.execute(delete(GameStateSnapshot).where(GameStateSnapshot.user_id == user_id))
+    await _delete_in_batches(session, GameEvent, GameEvent.user_id == user_id)
+    return cases
+
+
+async def _purge_user(session: AsyncSession, redis: Redis, user_id: UUID) -> Dict[str, int]:
+    """Remove a soft-deleted user and everything they own.
+
+    ``session`` is on the primary; the user's rows are removed from their
+    shard first when sharding is enabled.
+    """
+    result = await session.execute(
+        select(User.deleted_at, User.shard).where(User.id == user_id)
+    )
+    row = result.one_or_none()
+    if row is None or row.deleted_at is None:
+        return {"cases": 0, "users": 0}
+
+    async with user_session_maker(user_id, row.shard, worker=True)() as data_session:
+        cases = await _purge_user_rows(data_session, redis, user_id)
+
+    result = await session.execute(
+        delete(User).where(User.id == user_id, User.deleted_at.is_not(None))
+    )
+    await session.commit()
+    return {"cases": cases, "users": result.rowcount}
+
+
+async def _purge_deleted() -> Dict[str, int]:
+    """Purge everything still marked as deleted."""
+    purged = {"cases": 0, "users": 0}
+    redis = _redis()
+    try:
+        async with worker_session_maker() as session:
+            result = await session.execute(
+                select(User.id)
+                .where(User.deleted_at.is_not(None))
+                .limit(settings.PURGE_BATCH_SIZE)
+            )
+            for user_id in result.scalars().all():
+                purged["users"] += (await _purge_user(session, redis, user_id))["users"]
+
+        for session_maker in data_worker_session_makers():
+            async with session_maker() as session:
+                result = await session.execute(
+                    select(Case.id)
+                    .where(
+                        Case.deleted_at.is_not(None),
+                        Case.created_at <= datetime.utcnow() - QUOTA_DAY_MAX,
+                    )
+                    .limit(settings.PURGE_BATCH_SIZE)
+                )
+                for case_id in result.scalars().all():
+                    purged["cases"] += (await _purge_case(session, redis, case_id))["cases"]
+    finally:
+        await redis.aclose()
+    return purged
+
+
+async def _run_purge_case(case_id: UUID, shard: Optional[int]) -> Dict[str, int]:
+    session_makers = data_worker_session_makers()
+    if shard is not None and shard < len(session_makers):
+        session_makers = [session_makers[shard]]
+
+    purged = {"decisions": 0, "characters": 0, "cases": 0}
+    redis = _redis()
+    try:
+        for session_maker in session_makers:
+            async with session_maker() as session:
+                for key, count in (await _purge_case(session, redis, case_id)).items():
+                    purged[key] += count
+    finally:
+        await redis.aclose()
+    return purged
+
+
+async def _run_purge_user(user_id: UUID) -> Dict[str, int]:
+    redis = _redis()
+    try:
+        async with worker_session_maker() as session:
+            return await _purge_user(session, redis, user_id)
+    finally:
+        await redis.aclose()
+
+
+@celery_app.task(name="app.tasks.purge_case")
+def purge_case(case_id: str, shard: Optional[int] = None) -> Dict[str, int]:
+    """Purge a soft-deleted case (from every shard if ``shard`` is unknown)."""
+    return asyncio.run(_run_purge_case(UUID(case_id), shard))
+
+
+@celery_app.task(name="app.tasks.purge_user")
+def purge_user(user_id: str) -> Dict[str, int]:
+    """Purge a soft-deleted user."""
+    return asyncio.run(_run_purge_user(UUID(user_id)))
+
+
+@celery_app.task(name="app.tasks.purge_deleted")
+def purge_deleted() -> Dict[str, int]:
+    """Periodic sweep for deletions whose purge task was never run."""
+    return asyncio.run(_purge_deleted())
+
+
+async def schedule_case_purge(
+    case_id: UUID, created_at: datetime, shard: Optional[int] = None
+) -> None:
+    """Queue a case purge once its soft delete is committed.
+
+    Publishing is a blocking broker round-trip, so it runs in the threadpool.
+    The periodic sweep retries if the broker is down, and purges cases that
+    still counted against the daily quota when they were deleted.
+    """
+    if counts_toward_quota(created_at):
+        return
+    try:
+        await run_in_threadpool(purge_case.delay, str(case_id), shard)
+    except OperationalError as exc:
+        logger.warning(f"Could not queue purge for case {case_id}: {exc}")
+
+
+async def schedule_user_purge(user_id: UUID) -> None:
+    """Queue a user purge once their soft delete is committed (see ``schedule_case_purge``)."""
+    try:
+        await run_in_threadpool(purge_user.delay, str(user_id))
+    except OperationalError as exc:
+        logger.warning(f"Could not queue purge for user {user_id}: {exc}")
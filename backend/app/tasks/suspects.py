@@ -0,0 +1,49 @@
+"""Suspect ranking tasks."""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.database import data_worker_session_makers
+from app.services.suspect_ranking import load_cases, score_characters
+from app.tasks.celery_app import celery_app
+
+
+async def _score_cases(case_ids: List[UUID], weights: Optional[List[float]]) -> Dict[str, Any]:
+    """Batch-score cases and measure how often the guilty character ranks first."""
+    characters: List[Any] = []
+    decisions: List[Any] = []
+    for session_maker in data_worker_session_makers():
+        async with session_maker() as session:
+            shard_characters, shard_decisions = await load_cases(session, case_ids)
+        characters.extend(shard_characters)
+        decisions.extend(shard_decisions)
+
+    rankings = score_characters(characters, decisions, weights)
+    guilty = {character.id for character in characters if character.is_guilty}
+
+    solvable = [
+        ranking
+        for ranking in rankings.values()
+        if any(suspect.character_id in guilty for suspect in ranking)
+    ]
+    hits = sum(1 for ranking in solvable if ranking[0].character_id in guilty)
+
+    return {
+        "cases_scored": len(rankings),
+        "cases_with_guilty": len(solvable),
+        "top1_accuracy": hits / len(solvable) if solvable else None,
+        "rankings": {
+            str(case_id): [suspect.model_dump(mode="json") for suspect in ranking]
+            for case_id, ranking in rankings.items()
+        },
+    }
+
+
+@celery_app.task(name="app.tasks.score_cases")
+def score_cases(case_ids: List[str], weights: Optional[List[float]] = None) -> Dict[str, Any]:
+    """Score the suspects of many cases in one batch.
+
+    Tuning jobs pass candidate ``weights`` and compare ``top1_accuracy``.
+    """
+    return asyncio.run(_score_cases([UUID(case_id) for case_id in case_ids], weights))
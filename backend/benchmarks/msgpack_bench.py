@@ -0,0 +1,127 @@
+"""JSON vs MessagePack payload benchmark.
+
+Builds ``CaseRead`` and ``CharacterRead`` lists the way the API serializes
+them and compares payload size and encode/decode time of the JSON rendering
+used by FastAPI against MessagePack.
+
+Usage::
+
+    python -m benchmarks.msgpack_bench
+    python -m benchmarks.msgpack_bench --rows 50 200 1000
+"""
+
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+
+import msgpack
+from fastapi.encoders import jsonable_encoder
+
+from app.models.case import CaseDifficulty, CaseRead, CaseStatus
+from app.models.character import CharacterRead, CharacterRole
+
+WORDS = "alley docks knife ledger witness alibi midnight rain smuggler widow casino harbor".split()
+
+
+def _text(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def make_cases(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    user_id = uuid4()
+    cases = [
+        CaseRead(
+            id=uuid4(),
+            user_id=user_id,
+            title=_text(rng, 4),
+            description=_text(rng, 40),
+            difficulty=rng.choice(list(CaseDifficulty)),
+            status=rng.choice(list(CaseStatus)),
+            started_at=now - timedelta(minutes=rng.randint(1, 600)),
+            completed_at=None,
+            created_at=now,
+            updated_at=now,
+            evidence_data=json.dumps({"clues": [_text(rng, 2) for _ in range(5)]}),
+            clues_found=rng.randint(0, 3),
+            total_clues=3,
+        )
+        for _ in range(count)
+    ]
+    return jsonable_encoder(cases)
+
+
+def make_characters(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    case_id = uuid4()
+    characters = [
+        CharacterRead(
+            id=uuid4(),
+            case_id=case_id,
+            name=_text(rng, 2),
+            role=rng.choice(list(CharacterRole)),
+            description=_text(rng, 20),
+            personality_traits=json.dumps([_text(rng, 1) for _ in range(3)]),
+            suspicion_level=rng.randint(0, 100),
+            trust_level=rng.randint(0, 100),
+            is_guilty=False,
+            dialogue_history=json.dumps([_text(rng, 12) for _ in range(6)]),
+            testimony=_text(rng, 30),
+            alibi=_text(rng, 15),
+            created_at=now,
+            updated_at=now,
+        )
+        for _ in range(count)
+    ]
+    return jsonable_encoder(characters)
+
+
+def json_encode(content: Any) -> bytes:
+    # Same settings as starlette.responses.JSONResponse.render
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _best_of(func: Callable[[], Any], number: int) -> float:
+    """Best per-call time in microseconds."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def run(rows: List[int], number: int) -> None:
+    rng = random.Random(42)
+    print(
+        f"{'payload':<18}{'rows':>6}{'json B':>10}{'msgpack B':>11}{'size':>7}"
+        f"{'json enc':>10}{'mp enc':>9}{'json dec':>10}{'mp dec':>9}  (us)"
+    )
+    for name, factory in (("CaseRead", make_cases), ("CharacterRead", make_characters)):
+        for count in rows:
+            content = factory(rng, count)
+            as_json = json_encode(content)
+            as_msgpack = msgpack.packb(content, use_bin_type=True)
+            assert msgpack.unpackb(as_msgpack, raw=False) == json.loads(as_json)
+
+            print(
+                f"{name:<18}{count:>6}{len(as_json):>10}{len(as_msgpack):>11}"
+                f"{len(as_msgpack) / len(as_json):>7.0%}"
+                f"{_best_of(lambda: json_encode(content), number):>10.1f}"
+                f"{_best_of(lambda: msgpack.packb(content, use_bin_type=True), number):>9.1f}"
+                f"{_best_of(lambda: json.loads(as_json), number):>10.1f}"
+                f"{_best_of(lambda: msgpack.unpackb(as_msgpack, raw=False), number):>9.1f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    run(args.rows, args.number)
+
+
+if __name__ == "__main__":
+    main()
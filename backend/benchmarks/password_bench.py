@@ -0,0 +1,100 @@
+"""Event-loop latency during login storms.
+
+Runs a small ASGI app in-process with a simulated login endpoint that
+verifies a password either inline (the fastapi-users default) or through
+the pooled helper used by ``UserManager``. While ``--logins`` clients hammer
+the login endpoint, a probe requests an unrelated endpoint every few
+milliseconds; its latency percentiles show how much hashing stalls the loop.
+
+Usage::
+
+    python -m benchmarks.password_bench
+    python -m benchmarks.password_bench --logins 32 --duration 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from fastapi_users.password import PasswordHelper
+
+from app.auth.password import PooledPasswordHelper
+from app.config import settings
+
+PASSWORD = "correct horse battery staple"
+
+
+def build_app(pooled: PooledPasswordHelper) -> FastAPI:
+    inline = PasswordHelper()
+    hashed = inline.hash(PASSWORD)
+    app = FastAPI()
+
+    @app.post("/login/inline")
+    async def login_inline():
+        return {"ok": inline.verify_and_update(PASSWORD, hashed)[0]}
+
+    @app.post("/login/pooled")
+    async def login_pooled():
+        return {"ok": (await pooled.verify_and_update_async(PASSWORD, hashed))[0]}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def run_mode(app: FastAPI, mode: str, logins: int, duration: float) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + duration
+        login_count = 0
+
+        async def login_client() -> None:
+            nonlocal login_count
+            while time.perf_counter() < deadline:
+                await client.post(f"/login/{mode}")
+                login_count += 1
+
+        async def probe(samples: List[float]) -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/health")
+                samples.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        samples: List[float] = []
+        await asyncio.gather(probe(samples), *(login_client() for _ in range(logins)))
+
+    samples.sort()
+    p99 = samples[max(int(len(samples) * 0.99) - 1, 0)]
+    print(
+        f"{mode:<7} logins/s={login_count / duration:7.1f} "
+        f"health p50={statistics.median(samples) * 1000:7.2f}ms "
+        f"p99={p99 * 1000:8.2f}ms max={samples[-1] * 1000:8.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=16, help="Concurrent login clients")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode")
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_CONCURRENCY)
+    parser.add_argument("--processes", action="store_true", help="Use a process pool")
+    args = parser.parse_args()
+
+    pooled = PooledPasswordHelper(args.workers, use_processes=args.processes)
+    app = build_app(pooled)
+    try:
+        for mode in ("inline", "pooled"):
+            asyncio.run(run_mode(app, mode, args.logins, args.duration))
+    finally:
+        pooled.shutdown()
+
+
+if __name__ == "__main__":
+    main()
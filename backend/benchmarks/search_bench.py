@@ -0,0 +1,163 @@
+"""Full-text search benchmark.
+
+Seeds a synthetic corpus (by default 200k cases with 4 characters each, one
+million searchable rows) into the test database and times the search query
+used by ``GET /api/v1/search``.
+
+Usage::
+
+    python -m benchmarks.search_bench
+    python -m benchmarks.search_bench --cases 50000 --skip-seed
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+import app.models  # noqa: F401  (registers tables)
+from app.config import settings
+from app.services.search import search
+
+WORDS = (
+    "alley docks warehouse knife revolver ledger witness alibi midnight rain "
+    "smuggler detective bartender widow casino harbor letter poison motive "
+    "fingerprint cigarette train station hotel diary debt blackmail jazz club "
+    "landlord accountant courier mayor informant senator pawnshop lantern fog"
+).split()
+QUERIES = ("knife", "midnight alley", "blackmail OR poison", "\"jazz club\"", "senator -mayor")
+BATCH_SIZE = 20_000
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+async def seed(url: str, n_cases: int, characters_per_case: int, seed_value: int) -> UUID:
+    """Create the tables and bulk-load the corpus with COPY."""
+    engine = create_async_engine(url.replace("postgresql://", "postgresql+asyncpg://"))
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    await engine.dispose()
+
+    rng = random.Random(seed_value)
+    user_id = uuid4()
+    now = datetime.utcnow()
+    conn = await asyncpg.connect(url)
+    try:
+        await conn.execute(
+            "INSERT INTO users (id, email, username, hashed_password, is_active, "
+            "is_superuser, is_verified, created_at, updated_at) "
+            "VALUES ($1, $2, $3, 'x', true, false, true, $4, $4)",
+            user_id,
+            f"bench-{user_id}@example.com",
+            f"bench-{user_id}",
+            now,
+        )
+
+        for start in range(0, n_cases, BATCH_SIZE):
+            cases, characters = [], []
+            for _ in range(min(BATCH_SIZE, n_cases - start)):
+                case_id = uuid4()
+                cases.append(
+                    (case_id, user_id, _sentence(rng, 4), _sentence(rng, 40), "MEDIUM",
+                     "PENDING", 15, 10, 20, now, now, 0, 3)
+                )
+                for _ in range(characters_per_case):
+                    characters.append(
+                        (uuid4(), case_id, _sentence(rng, 2), "SUSPECT", _sentence(rng, 20),
+                         "[]", 0, 50, False, _sentence(rng, 80), _sentence(rng, 30),
+                         _sentence(rng, 15), now, now)
+                    )
+            await conn.copy_records_to_table(
+                "cases",
+                records=cases,
+                columns=[
+                    "id", "user_id", "title", "description", "difficulty", "status",
+                    "time_limit_minutes", "stress_impact", "reputation_reward",
+                    "created_at", "updated_at", "clues_found", "total_clues",
+                ],
+            )
+            await conn.copy_records_to_table(
+                "characters",
+                records=characters,
+                columns=[
+                    "id", "case_id", "name", "role", "description", "personality_traits",
+                    "suspicion_level", "trust_level", "is_guilty", "dialogue_history",
+                    "testimony", "alibi", "created_at", "updated_at",
+                ],
+            )
+            print(f"seeded {start + len(cases)}/{n_cases} cases")
+
+        await conn.execute("ANALYZE cases")
+        await conn.execute("ANALYZE characters")
+    finally:
+        await conn.close()
+    return user_id
+
+
+def _report(label: str, timings: List[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<45} p50={statistics.median(timings) * 1000:7.2f}ms "
+        f"p95={p95 * 1000:7.2f}ms max={timings[-1] * 1000:7.2f}ms"
+    )
+
+
+async def benchmark(url: str, user_id: Optional[UUID], iterations: int) -> None:
+    """Time first and second pages for a set of queries."""
+    engine = create_async_engine(url.replace("postgresql://", "postgresql+asyncpg://"))
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with session_maker() as session:
+            for text in QUERIES:
+                for scope, scope_user in (("user", user_id), ("all", None)):
+                    if scope == "user" and user_id is None:
+                        continue
+                    first, second = [], []
+                    for _ in range(iterations):
+                        started = time.perf_counter()
+                        page = await search(session, text, scope_user, limit=20)
+                        first.append(time.perf_counter() - started)
+                        if page.next_cursor:
+                            started = time.perf_counter()
+                            await search(session, text, scope_user, 20, page.next_cursor)
+                            second.append(time.perf_counter() - started)
+                    _report(f"{text!r} scope={scope} page=1", first)
+                    if second:
+                        _report(f"{text!r} scope={scope} page=2", second)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.TEST_DATABASE_URL)
+    parser.add_argument("--cases", type=int, default=200_000)
+    parser.add_argument("--characters-per-case", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse an existing corpus")
+    args = parser.parse_args()
+
+    async def run() -> None:
+        user_id = None
+        if not args.skip_seed:
+            user_id = await seed(args.database_url, args.cases, args.characters_per_case, args.seed)
+        await benchmark(args.database_url, user_id, args.iterations)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""Shared test configuration."""
+
+import os
+
+# Settings require these; set them before any app module is imported
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-key")
@@ -0,0 +1,58 @@
+"""Tests for Monte Carlo difficulty calibration."""
+
+import numpy as np
+import pytest
+
+from app.models.case import CaseDifficulty
+from app.services.calibration import DIFFICULTY_PROFILES, calibrate, simulate
+
+
+def test_simulate_is_reproducible_with_a_seed():
+    first = simulate(CaseDifficulty.MEDIUM, 500, np.random.SeedSequence(7))
+    second = simulate(CaseDifficulty.MEDIUM, 500, np.random.SeedSequence(7))
+
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+    assert first[0].shape == first[1].shape == (500,)
+
+
+def test_unsolved_playthroughs_take_forever():
+    solve_minutes, stress = simulate(CaseDifficulty.EXTREME, 2000, np.random.SeedSequence(1))
+
+    assert np.isfinite(solve_minutes).any()
+    assert (solve_minutes[np.isfinite(solve_minutes)] > 0).all()
+    assert (stress >= 0).all()
+
+
+def test_harder_cases_are_solved_less_and_take_longer():
+    results = calibrate(playthroughs=4000, seed=3)
+
+    solve_rates = [results[difficulty.value]["solve_rate"] for difficulty in DIFFICULTY_PROFILES]
+    medians = [
+        results[difficulty.value]["median_solve_minutes"] for difficulty in DIFFICULTY_PROFILES
+    ]
+    assert solve_rates == sorted(solve_rates, reverse=True)
+    assert medians == sorted(medians)
+
+
+def test_time_limit_hits_the_target_solve_rate():
+    results = calibrate(playthroughs=8000, seed=11)
+
+    for difficulty, profile in DIFFICULTY_PROFILES.items():
+        result = results[difficulty.value]
+        assert result["playthroughs"] == 8000
+        assert result["time_limit_minutes"] is not None
+        assert result["solve_rate_at_limit"] == pytest.approx(
+            min(profile.target_solve_rate, result["solve_rate"]), abs=0.02
+        )
+
+
+def test_calibration_converges_across_seeds():
+    first = calibrate(playthroughs=20000, chunk_size=5000, seed=1)
+    second = calibrate(playthroughs=20000, chunk_size=5000, seed=2)
+
+    for difficulty in DIFFICULTY_PROFILES:
+        a, b = first[difficulty.value], second[difficulty.value]
+        assert a["solve_rate"] == pytest.approx(b["solve_rate"], abs=0.02)
+        assert a["time_limit_minutes"] == pytest.approx(b["time_limit_minutes"], rel=0.1)
+        assert a["stress_impact"] == pytest.approx(b["stress_impact"], rel=0.1, abs=2)
@@ -0,0 +1,114 @@
+"""Tests for the per-user case ownership index."""
+
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from app.services.case_ownership import add_case, owns_case, remove_case
+
+
+class CasesSession:
+    """Session answering the ownership queries from a set of live case ids."""
+
+    def __init__(self, user_id, case_ids, on_load=None):
+        self.user_id = user_id
+        self.case_ids = set(case_ids)
+        self.on_load = on_load
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        params = statement.compile().params
+        owned = self.case_ids if params["user_id_1"] == self.user_id else set()
+        if "id_1" in params:
+            match = params["id_1"] if params["id_1"] in owned else None
+            return SimpleNamespace(scalar_one_or_none=lambda: match)
+        rows = list(owned)
+        if self.on_load is not None:
+            await self.on_load()
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+
+@pytest.fixture
+def redis():
+    return FakeAsyncRedis(decode_responses=True)
+
+
+def test_first_check_loads_the_set_and_later_checks_skip_postgres(redis):
+    user_id, case_id = uuid4(), uuid4()
+    session = CasesSession(user_id, [case_id, uuid4()])
+
+    assert asyncio.run(owns_case(session, user_id, case_id, redis))
+    assert asyncio.run(owns_case(session, user_id, case_id, redis))
+    assert session.queries == 1
+    assert asyncio.run(redis.scard(f"case_owner:{user_id}")) == 3
+
+
+def test_other_users_cases_are_refused(redis):
+    owner, case_id = uuid4(), uuid4()
+    session = CasesSession(owner, [case_id])
+
+    assert not asyncio.run(owns_case(session, uuid4(), case_id, redis))
+
+
+def test_case_created_after_the_load_is_found_and_added(redis):
+    user_id, case_id = uuid4(), uuid4()
+    session = CasesSession(user_id, [])
+    assert not asyncio.run(owns_case(session, user_id, case_id, redis))
+
+    session.case_ids.add(case_id)
+
+    assert asyncio.run(owns_case(session, user_id, case_id, redis))
+    assert asyncio.run(redis.sismember(f"case_owner:{user_id}", str(case_id)))
+
+
+def test_removed_case_is_refused(redis):
+    user_id, case_id = uuid4(), uuid4()
+    session = CasesSession(user_id, [case_id])
+    asyncio.run(owns_case(session, user_id, case_id, redis))
+
+    session.case_ids.discard(case_id)
+    asyncio.run(remove_case(user_id, case_id, redis))
+
+    assert not asyncio.run(owns_case(session, user_id, case_id, redis))
+
+
+def test_case_removed_during_a_load_is_not_written_back(redis):
+    user_id, case_id = uuid4(), uuid4()
+
+    async def delete_meanwhile():
+        # The delete commits and removes the case after the SELECT read it
+        session.case_ids.discard(case_id)
+        await remove_case(user_id, case_id, redis)
+
+    session = CasesSession(user_id, [case_id], on_load=delete_meanwhile)
+
+    assert not asyncio.run(owns_case(session, user_id, case_id, redis))
+    assert not asyncio.run(redis.sismember(f"case_owner:{user_id}", str(case_id)))
+
+
+def test_removed_case_is_not_added_back(redis):
+    user_id, case_id = uuid4(), uuid4()
+    asyncio.run(remove_case(user_id, case_id, redis))
+
+    asyncio.run(add_case(user_id, case_id, redis))
+
+    assert not asyncio.run(redis.sismember(f"case_owner:{user_id}", str(case_id)))
+
+
+def test_checks_go_to_postgres_without_redis():
+    server = FakeServer()
+    server.connected = False
+    redis = FakeAsyncRedis(server=server, decode_responses=True)
+    user_id, case_id = uuid4(), uuid4()
+    session = CasesSession(user_id, [case_id])
+
+    assert asyncio.run(owns_case(session, user_id, case_id, redis))
+    assert not asyncio.run(owns_case(session, user_id, uuid4(), redis))
+    assert session.queries == 2
+    # Writes to the index fail quietly
+    asyncio.run(add_case(user_id, case_id, redis))
+    asyncio.run(remove_case(user_id, case_id, redis))
@@ -0,0 +1,169 @@
+"""Tests for the batch character update."""
+
+import asyncio
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.routes import characters
+from app.models.character import CharacterBatchUpdate, CharacterUpdate
+from app.services.characters import bulk_update_characters
+
+
+class CaseCharactersSession:
+    """Session whose UPDATE matches the given characters of one case."""
+
+    def __init__(self, case_id, character_ids):
+        self.case_id = case_id
+        self.character_ids = set(character_ids)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, statement):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        self.statements.append(compiled)
+        matched = []
+        if compiled.params["case_id_1"] == self.case_id:
+            matched = [
+                SimpleNamespace(id=value)
+                for value in compiled.params.values()
+                if isinstance(value, UUID) and value in self.character_ids
+            ]
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: matched))
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def owned(monkeypatch):
+    async def owns_case(session, user_id, case_id):
+        return True
+
+    monkeypatch.setattr(characters, "owns_case", owns_case)
+
+
+def update_case_characters(session, case_id, updates):
+    user = SimpleNamespace(id=uuid4())
+    batch = CharacterBatchUpdate(updates=updates)
+    return asyncio.run(characters.update_case_characters(case_id, batch, session, user))
+
+
+def test_one_update_statement_sets_only_the_given_fields():
+    case_id, first, second = uuid4(), uuid4(), uuid4()
+    session = CaseCharactersSession(case_id, [first, second])
+
+    updated, missing = asyncio.run(
+        bulk_update_characters(
+            session,
+            case_id,
+            {
+                first: CharacterUpdate(trust_level=10),
+                second: CharacterUpdate(suspicion_level=90, alibi=None),
+            },
+        )
+    )
+
+    assert {character.id for character in updated} == {first, second}
+    assert missing == set()
+    (compiled,) = session.statements
+    sql = str(compiled)
+    assert sql.startswith("UPDATE characters SET")
+    assert "FROM (VALUES" in sql
+    assert "characters.case_id = " in sql
+    # Each row is the id, then a value and set flag per field (nulls are
+    # rendered inline, so they are not parameters)
+    rows = list(compiled.params.values())
+    first_row = rows[rows.index(first):rows.index(first) + 7]
+    assert first_row == [first, False, 10, True, False, False, False]
+    second_row = rows[rows.index(second):rows.index(second) + 7]
+    # An explicit null is set; omitted fields keep their stored value
+    assert second_row == [second, 90, True, False, False, False, True]
+
+
+def test_characters_of_other_cases_are_reported_missing():
+    case_id, mine, theirs = uuid4(), uuid4(), uuid4()
+    session = CaseCharactersSession(case_id, [mine])
+
+    updated, missing = asyncio.run(
+        bulk_update_characters(
+            session,
+            case_id,
+            {mine: CharacterUpdate(trust_level=1), theirs: CharacterUpdate(trust_level=1)},
+        )
+    )
+
+    assert [character.id for character in updated] == [mine]
+    assert missing == {theirs}
+
+
+def test_batch_commits_when_every_character_is_found(owned):
+    case_id, first, second = uuid4(), uuid4(), uuid4()
+    session = CaseCharactersSession(case_id, [first, second])
+
+    updated = update_case_characters(
+        session,
+        case_id,
+        {first: CharacterUpdate(trust_level=1), second: CharacterUpdate(trust_level=2)},
+    )
+
+    assert len(updated) == 2
+    assert (session.commits, session.rollbacks) == (1, 0)
+
+
+def test_unknown_character_fails_the_whole_batch(owned):
+    case_id, known, unknown = uuid4(), uuid4(), uuid4()
+    session = CaseCharactersSession(case_id, [known])
+
+    with pytest.raises(HTTPException) as exc_info:
+        update_case_characters(
+            session,
+            case_id,
+            {known: CharacterUpdate(trust_level=1), unknown: CharacterUpdate(trust_level=2)},
+        )
+
+    assert exc_info.value.status_code == 404
+    assert str(unknown) in exc_info.value.detail
+    assert (session.commits, session.rollbacks) == (0, 1)
+
+
+def test_batch_on_someone_elses_case_is_a_404(monkeypatch):
+    async def owns_case(session, user_id, case_id):
+        return False
+
+    monkeypatch.setattr(characters, "owns_case", owns_case)
+    session = CaseCharactersSession(uuid4(), [])
+
+    with pytest.raises(HTTPException) as exc_info:
+        update_case_characters(session, uuid4(), {uuid4(): CharacterUpdate(trust_level=1)})
+
+    assert exc_info.value.status_code == 404
+    assert session.statements == []
+
+
+def test_oversized_batch_is_refused(owned):
+    updates = {
+        uuid4(): CharacterUpdate(trust_level=1)
+        for _ in range(characters.MAX_BATCH_UPDATE_SIZE + 1)
+    }
+    session = CaseCharactersSession(uuid4(), [])
+
+    with pytest.raises(HTTPException) as exc_info:
+        update_case_characters(session, uuid4(), updates)
+
+    assert exc_info.value.status_code == 422
+    assert session.statements == []
+
+
+def test_empty_batch_does_nothing(owned):
+    session = CaseCharactersSession(uuid4(), [])
+
+    assert update_case_characters(session, uuid4(), {}) == []
+    assert session.statements == []
@@ -0,0 +1,86 @@
+"""Tests for monthly decision partitions."""
+
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.database import _add_months, _create_decision_partition, ensure_decision_partitions
+
+
+class RecordingConnection:
+    """Connection recording the SQL it runs, answering queries from ``answers``."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        answer = next((value for prefix, value in self.answers if sql.startswith(prefix)), None)
+        return SimpleNamespace(scalar_one=lambda: answer, scalar_one_or_none=lambda: answer)
+
+
+@pytest.mark.parametrize(
+    "day, months, expected",
+    [
+        (date(2025, 6, 17), 0, date(2025, 6, 1)),
+        (date(2025, 11, 30), 1, date(2025, 12, 1)),
+        (date(2025, 12, 31), 1, date(2026, 1, 1)),
+        (date(2025, 11, 1), 3, date(2026, 2, 1)),
+        (date(2025, 1, 15), -1, date(2024, 12, 1)),
+        (date(2025, 3, 1), 24, date(2027, 3, 1)),
+    ],
+)
+def test_add_months(day, months, expected):
+    assert _add_months(day, months) == expected
+
+
+def test_partition_is_created_directly_when_the_default_is_empty():
+    conn = RecordingConnection([("SELECT count(*)", 0)])
+
+    asyncio.run(
+        _create_decision_partition(conn, "decisions_p2026_01", date(2026, 1, 1), date(2026, 2, 1))
+    )
+
+    assert conn.statements[1:] == [
+        "CREATE TABLE decisions_p2026_01 PARTITION OF decisions "
+        "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')"
+    ]
+
+
+def test_rows_in_the_default_partition_are_moved_into_the_new_one():
+    conn = RecordingConnection([("SELECT count(*)", 3)])
+
+    asyncio.run(
+        _create_decision_partition(conn, "decisions_p2026_01", date(2026, 1, 1), date(2026, 2, 1))
+    )
+
+    in_range = "created_at >= :start AND created_at < :end"
+    assert conn.statements[1:] == [
+        "ALTER TABLE decisions DETACH PARTITION decisions_default",
+        "CREATE TABLE decisions_p2026_01 PARTITION OF decisions "
+        "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')",
+        f"INSERT INTO decisions_p2026_01 SELECT * FROM decisions_default WHERE {in_range}",
+        f"DELETE FROM decisions_default WHERE {in_range}",
+        "ALTER TABLE decisions ATTACH PARTITION decisions_default DEFAULT",
+    ]
+
+
+def test_missing_partitions_are_created_ahead():
+    conn = RecordingConnection([("SELECT relkind", "p"), ("SELECT count(*)", 0)])
+
+    names = asyncio.run(ensure_decision_partitions(conn, months_ahead=2))
+
+    assert len(names) == 3
+    created = [sql for sql in conn.statements if sql.startswith("CREATE TABLE decisions_p")]
+    assert [sql.split()[2] for sql in created] == names
+
+
+def test_plain_decisions_table_is_left_alone():
+    conn = RecordingConnection([("SELECT relkind", "r")])
+
+    assert asyncio.run(ensure_decision_partitions(conn)) == []
+    assert len(conn.statements) == 1
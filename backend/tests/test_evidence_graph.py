@@ -0,0 +1,115 @@
+"""Tests for evidence graph parsing, queries and caching."""
+
+import json
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.services.evidence_graph import EvidenceGraph, EvidenceGraphCache
+
+EVIDENCE = json.dumps(
+    {
+        "clues": [
+            {
+                "id": "knife",
+                "label": "Bloody knife",
+                "characters": ["vera"],
+                "locations": ["alley"],
+            },
+            {"id": "ticket", "characters": ["vera", "sam"]},
+            "note",
+        ],
+        "characters": [{"id": "vera", "label": "Vera"}, {"id": "sam", "label": "Sam"}],
+        "locations": [{"id": "alley", "label": "Back alley"}, "docks"],
+        "links": [
+            ["location:alley", "location:docks"],
+            {"source": "clue:note", "target": "location:pier"},
+        ],
+    }
+)
+
+
+@pytest.fixture
+def graph():
+    return EvidenceGraph.from_json(EVIDENCE)
+
+
+def test_parses_declared_and_referenced_nodes(graph):
+    assert len(graph) == 8
+    assert graph.label("clue:knife") == "Bloody knife"
+    assert graph.label("clue:ticket") == "ticket"
+    # Only referenced by a link, so labelled with its id
+    assert "location:pier" in graph
+    assert graph.label("location:pier") == "pier"
+
+
+def test_neighbors_filter_by_kind(graph):
+    assert sorted(graph.neighbors("clue:knife")) == ["character:vera", "location:alley"]
+    assert graph.neighbors("clue:knife", kind="location") == ["location:alley"]
+
+
+def test_connected_follows_chains(graph):
+    assert graph.connected("character:sam", "location:docks")
+    assert graph.connected("clue:note", "location:pier")
+    assert not graph.connected("character:sam", "clue:note")
+
+
+def test_shortest_path(graph):
+    assert graph.shortest_path("character:sam", "location:docks") == [
+        "character:sam",
+        "clue:ticket",
+        "character:vera",
+        "clue:knife",
+        "location:alley",
+        "location:docks",
+    ]
+    assert graph.shortest_path("character:vera", "character:vera") == ["character:vera"]
+    assert graph.shortest_path("character:sam", "location:pier") is None
+
+
+def test_linking_clues(graph):
+    assert graph.linking_clues("character:vera", "character:sam") == ["clue:ticket"]
+    assert graph.linking_clues("character:vera", "location:alley") == ["clue:knife"]
+    assert graph.linking_clues("character:sam", "location:alley") == []
+
+
+def test_empty_evidence_gives_an_empty_graph():
+    assert len(EvidenceGraph.from_json(None)) == 0
+    assert len(EvidenceGraph.from_json("")) == 0
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "not json",
+        "[]",
+        json.dumps({"clues": "knife"}),
+        json.dumps({"clues": [{"label": "no id"}]}),
+        json.dumps({"links": [["clue:a"]]}),
+        json.dumps({"links": [["weapon:a", "clue:b"]]}),
+    ],
+)
+def test_malformed_evidence_is_rejected(raw):
+    with pytest.raises(ValueError):
+        EvidenceGraph.from_json(raw)
+
+
+def test_cache_keys_on_case_version_and_evicts_oldest():
+    cache = EvidenceGraphCache(max_size=2)
+    first, second, third = uuid4(), uuid4(), uuid4()
+    version = datetime(2025, 1, 1)
+    graph = EvidenceGraph({}, [])
+
+    cache.put(first, version, graph)
+    assert cache.get(first, version) is graph
+    assert cache.get(first, version + timedelta(seconds=1)) is None
+
+    cache.put(second, version, graph)
+    cache.get(first, version)  # first is now the most recently used
+    cache.put(third, version, graph)
+    assert cache.get(second, version) is None
+    assert cache.get(first, version) is graph
+
+    cache.invalidate(first)
+    assert cache.get(first, version) is None
@@ -0,0 +1,208 @@
+"""Tests for the event-sourced game state history."""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.config import settings
+from app.models.game_event import GameEventType
+from app.models.game_state import GameStateBase
+from app.services.game_events import _save_snapshot, apply_event, record_event, replay
+
+START = datetime(2025, 6, 1, 20, 0)
+CASE_ID = str(uuid4())
+
+
+def base_state(**values):
+    return {**GameStateBase().model_dump(mode="json"), **values}
+
+
+class EventLogSession:
+    """Session over an in-memory event log and its snapshots."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.events = []
+        self.snapshots = []
+        self.added = []
+
+    def log(self, event_type, payload, minutes):
+        self.events.append(
+            SimpleNamespace(
+                id=len(self.events) + 1,
+                event_type=event_type,
+                payload=json.dumps(payload),
+                created_at=START + timedelta(minutes=minutes),
+            )
+        )
+
+    async def execute(self, statement):
+        params = statement.compile().params
+        at = params.get("taken_at_1") or params.get("created_at_1")
+        if "game_state_snapshots" in str(statement):
+            snapshots = [
+                snapshot for snapshot in self.snapshots if at is None or snapshot.taken_at <= at
+            ]
+            latest = max(snapshots, key=lambda snapshot: snapshot.event_id, default=None)
+            return SimpleNamespace(scalar_one_or_none=lambda: latest)
+        after = params.get("id_1", 0)
+        rows = [
+            (event.id, event.event_type, event.payload, event.created_at)
+            for event in self.events
+            if event.id > after and (at is None or event.created_at <= at)
+        ]
+        return SimpleNamespace(all=lambda: rows)
+
+    def add(self, row):
+        self.added.append(row)
+
+
+@pytest.fixture
+def session():
+    session = EventLogSession(uuid4())
+    session.log(GameEventType.STATE_CREATED, {"current_day": 1, "reputation": 50}, 0)
+    session.log(GameEventType.STATE_UPDATED, {"current_case_id": CASE_ID}, 1)
+    session.log(GameEventType.DECISION, {"stress_impact": 30, "reputation_impact": -10}, 2)
+    session.log(GameEventType.DECISION, {"stress_impact": 30, "applied": False}, 3)
+    session.log(
+        GameEventType.CASE_COMPLETED, {"case_id": CASE_ID, "reputation_reward": 20}, 4
+    )
+    session.log(GameEventType.STATE_UPDATED, {"total_playtime_minutes": 42}, 5)
+    return session
+
+
+def test_decisions_clamp_to_the_scale():
+    state = apply_event(
+        base_state(stress_level=90, reputation=5),
+        GameEventType.DECISION,
+        {"stress_impact": 25, "reputation_impact": -20},
+    )
+
+    assert (state["stress_level"], state["reputation"]) == (100, 0)
+
+
+def test_case_outcomes_update_counters_and_clear_the_current_case():
+    solved = apply_event(
+        base_state(current_case_id=CASE_ID),
+        GameEventType.CASE_COMPLETED,
+        {"case_id": CASE_ID, "reputation_reward": 20},
+    )
+    failed = apply_event(
+        base_state(current_case_id=CASE_ID),
+        GameEventType.CASE_FAILED,
+        {"case_id": str(uuid4()), "stress_impact": 15},
+    )
+
+    assert (solved["cases_solved"], solved["reputation"], solved["current_case_id"]) == (
+        1,
+        70,
+        None,
+    )
+    assert (failed["cases_failed"], failed["stress_level"], failed["current_case_id"]) == (
+        1,
+        15,
+        CASE_ID,
+    )
+
+
+def test_unapplied_impacts_and_deletes():
+    state = base_state(stress_level=10)
+
+    unapplied = {"stress_impact": 50, "applied": False}
+
+    assert apply_event(state, GameEventType.DECISION, unapplied) == state
+    assert apply_event(state, GameEventType.STATE_DELETED, {}) is None
+    # Updates only take game state fields
+    assert apply_event(None, GameEventType.STATE_UPDATED, {"stress_level": 5, "user_id": "x"}) == (
+        base_state(stress_level=5)
+    )
+
+
+def test_replay_without_snapshots_folds_the_whole_log(session):
+    result = asyncio.run(replay(session, session.user_id))
+
+    assert result.events_replayed == 6
+    assert result.event_id == 6
+    assert result.state == base_state(
+        stress_level=30,
+        reputation=60,
+        cases_solved=1,
+        total_playtime_minutes=42,
+    )
+
+
+def test_replay_from_a_snapshot_matches_the_full_replay(session):
+    full = asyncio.run(replay(session, session.user_id))
+    # Snapshot as of the third event, as the compaction task takes them
+    asyncio.run(_save_snapshot(session, session.user_id, START + timedelta(minutes=2)))
+    (snapshot,) = session.added
+    session.snapshots.append(snapshot)
+
+    result = asyncio.run(replay(session, session.user_id))
+
+    assert snapshot.event_id == 3
+    assert result.events_replayed == 3
+    assert result.state == full.state
+
+
+def test_replay_at_a_past_time(session):
+    session.snapshots.append(
+        SimpleNamespace(
+            event_id=5,
+            taken_at=START + timedelta(minutes=4),
+            state=json.dumps(base_state(reputation=99)),
+        )
+    )
+
+    result = asyncio.run(replay(session, session.user_id, at=START + timedelta(minutes=2)))
+
+    # The later snapshot is ignored
+    assert result.event_id == 3
+    assert result.state == base_state(stress_level=30, reputation=40, current_case_id=CASE_ID)
+    assert result.event_at == START + timedelta(minutes=2)
+
+
+class GameStateSession:
+    """Session holding one user's game state row."""
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.added = []
+
+    async def execute(self, statement):
+        return SimpleNamespace(scalar_one_or_none=lambda: self.game_state)
+
+    def add(self, row):
+        self.added.append(row)
+
+
+def test_recorded_impacts_update_the_live_row(monkeypatch):
+    monkeypatch.setattr(settings, "GAME_EVENTS_APPLY_IMPACTS", True)
+    game_state = SimpleNamespace(**GameStateBase(stress_level=95).model_dump(), updated_at=None)
+    session = GameStateSession(game_state)
+
+    event = asyncio.run(
+        record_event(session, uuid4(), GameEventType.DECISION, {"stress_impact": 10})
+    )
+
+    assert game_state.stress_level == 100
+    assert game_state.updated_at is not None
+    assert session.added == [event]
+    assert json.loads(event.payload) == {"stress_impact": 10, "applied": True}
+
+
+def test_impacts_are_only_logged_while_clients_apply_them(monkeypatch):
+    monkeypatch.setattr(settings, "GAME_EVENTS_APPLY_IMPACTS", False)
+    game_state = SimpleNamespace(**GameStateBase().model_dump())
+    session = GameStateSession(game_state)
+
+    event = asyncio.run(
+        record_event(session, uuid4(), GameEventType.DECISION, {"stress_impact": 10})
+    )
+
+    assert game_state.stress_level == 0
+    assert json.loads(event.payload)["applied"] is False
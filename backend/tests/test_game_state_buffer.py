@@ -0,0 +1,131 @@
+"""Tests for the game state write-behind buffer."""
+
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from app.services.game_state_buffer import (
+    DIRTY_SET_KEY,
+    buffer_tick,
+    discard_pending,
+    flush_pending,
+    get_pending,
+    is_bufferable,
+)
+
+
+class FlushSession:
+    """Session recording the flush's statements; ``on_commit`` runs mid-flush."""
+
+    def __init__(self, on_commit=None):
+        self.on_commit = on_commit
+        self.executed = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.executed.append((statement.table.name, params))
+
+    async def commit(self):
+        self.commits += 1
+        if self.on_commit is not None:
+            await self.on_commit()
+
+
+@pytest.fixture
+def redis():
+    return FakeAsyncRedis(decode_responses=True)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.mark.parametrize(
+    "update_data, expected",
+    [
+        ({"total_playtime_minutes": 5}, True),
+        ({"total_playtime_minutes": 5, "last_played": datetime(2025, 6, 1)}, True),
+        ({"total_playtime_minutes": 5, "stress_level": 40}, False),
+        ({}, False),
+    ],
+)
+def test_only_tick_fields_are_bufferable(update_data, expected):
+    assert is_bufferable(update_data) is expected
+
+
+def test_ticks_accumulate_and_bump_the_version(redis):
+    user_id = uuid4()
+
+    run(buffer_tick(user_id, {"total_playtime_minutes": 5}, redis))
+    merged = run(buffer_tick(user_id, {"last_played": datetime(2025, 6, 1, 20, 0)}, redis))
+
+    assert merged == {"total_playtime_minutes": 5, "last_played": datetime(2025, 6, 1, 20, 0)}
+    assert run(get_pending(user_id, redis)) == (merged, "2")
+    assert run(redis.smembers(DIRTY_SET_KEY)) == {str(user_id)}
+
+
+def test_discard_only_drops_an_unchanged_buffer(redis):
+    user_id = uuid4()
+    run(buffer_tick(user_id, {"total_playtime_minutes": 5}, redis))
+    _, version = run(get_pending(user_id, redis))
+    run(buffer_tick(user_id, {"total_playtime_minutes": 6}, redis))
+
+    assert not run(discard_pending(user_id, version, redis))
+    _, version = run(get_pending(user_id, redis))
+    assert run(discard_pending(user_id, version, redis))
+    assert run(get_pending(user_id, redis)) == ({}, None)
+    assert run(redis.smembers(DIRTY_SET_KEY)) == set()
+
+
+def test_flush_writes_every_buffer_in_one_update(redis):
+    users = [uuid4(), uuid4()]
+    run(buffer_tick(users[0], {"total_playtime_minutes": 5}, redis))
+    run(buffer_tick(users[1], {"last_played": datetime(2025, 6, 1, 20, 0)}, redis))
+    session = FlushSession()
+
+    assert run(flush_pending(session, redis, batch_size=10)) == 2
+
+    (table, rows), (events_table, events) = session.executed
+    assert table == "game_states"
+    assert {row["b_user_id"] for row in rows} == set(users)
+    # Only playtime changes are logged as events
+    assert events_table == "game_events"
+    assert [event["user_id"] for event in events] == [users[0]]
+    assert run(redis.smembers(DIRTY_SET_KEY)) == set()
+
+
+def test_ticks_during_a_flush_are_kept_for_the_next(redis):
+    user_id = uuid4()
+    run(buffer_tick(user_id, {"total_playtime_minutes": 5}, redis))
+
+    async def tick_meanwhile():
+        await buffer_tick(user_id, {"total_playtime_minutes": 6}, redis)
+
+    run(flush_pending(FlushSession(on_commit=tick_meanwhile), redis, batch_size=10))
+
+    assert run(get_pending(user_id, redis)) == ({"total_playtime_minutes": 6}, "2")
+    session = FlushSession()
+    assert run(flush_pending(session, redis, batch_size=10)) == 1
+    assert session.executed[0][1][0]["b_playtime"] == 6
+    assert run(get_pending(user_id, redis)) == ({}, None)
+
+
+def test_flush_commits_per_batch(redis):
+    for _ in range(5):
+        run(buffer_tick(uuid4(), {"total_playtime_minutes": 1}, redis))
+    session = FlushSession()
+
+    assert run(flush_pending(session, redis, batch_size=2)) == 5
+    assert session.commits == 3
+
+
+def test_users_without_a_buffer_leave_the_dirty_set(redis):
+    run(redis.sadd(DIRTY_SET_KEY, str(uuid4())))
+    session = FlushSession()
+
+    assert run(flush_pending(session, redis, batch_size=10)) == 0
+    assert session.executed == []
+    assert run(redis.smembers(DIRTY_SET_KEY)) == set()
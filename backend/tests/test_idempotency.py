@@ -0,0 +1,160 @@
+"""Tests for Idempotency-Key replay."""
+
+import asyncio
+import json
+from uuid import uuid4
+
+import httpx
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi_users.jwt import generate_jwt
+
+from app.auth.backend import JWT_AUDIENCE
+from app.config import settings
+from app.middleware import idempotency
+from app.middleware.idempotency import IdempotencyMiddleware
+
+PATH = "/api/v1/cases/"
+
+
+class CreateApp:
+    """ASGI app answering every request with ``status`` and counting calls."""
+
+    def __init__(self, status=201, delay=0.0):
+        self.status = status
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        body = json.dumps({"call": self.calls}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    redis = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(idempotency, "redis_client", redis)
+    return redis
+
+
+def token(user_id, **claims):
+    return generate_jwt(
+        {"sub": str(user_id), "aud": JWT_AUDIENCE, **claims}, settings.JWT_SECRET_KEY, 60
+    )
+
+
+def client(app):
+    transport = httpx.ASGITransport(app=IdempotencyMiddleware(app, paths=[PATH]))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def post(app, body, headers):
+    async def run():
+        async with client(app) as http:
+            return await http.post(PATH, json=body, headers=headers)
+
+    return asyncio.run(run())
+
+
+def stored_keys(redis):
+    return asyncio.run(redis.keys("idempotency:*"))
+
+
+def test_retry_replays_the_stored_response():
+    app = CreateApp()
+    headers = {"Authorization": f"Bearer {token(uuid4())}", "Idempotency-Key": "abc"}
+
+    first = post(app, {"title": "Docks"}, headers)
+    second = post(app, {"title": "Docks"}, headers)
+
+    assert app.calls == 1
+    assert second.status_code == 201
+    assert second.json() == first.json()
+    assert second.headers["idempotent-replayed"] == "true"
+
+
+def test_key_reused_with_another_body_is_rejected():
+    app = CreateApp()
+    headers = {"Authorization": f"Bearer {token(uuid4())}", "Idempotency-Key": "abc"}
+
+    post(app, {"title": "Docks"}, headers)
+    response = post(app, {"title": "Alley"}, headers)
+
+    assert response.status_code == 422
+    assert app.calls == 1
+
+
+def test_refreshed_token_still_replays():
+    app = CreateApp()
+    user_id = uuid4()
+
+    post(app, {}, {"Authorization": f"Bearer {token(user_id)}", "Idempotency-Key": "abc"})
+    response = post(
+        app,
+        {},
+        {"Authorization": f"Bearer {token(user_id, refreshed=True)}", "Idempotency-Key": "abc"},
+    )
+
+    assert app.calls == 1
+    assert response.headers["idempotent-replayed"] == "true"
+
+
+def test_keys_are_scoped_per_user():
+    app = CreateApp()
+
+    post(app, {}, {"Authorization": f"Bearer {token(uuid4())}", "Idempotency-Key": "abc"})
+    post(app, {}, {"Authorization": f"Bearer {token(uuid4())}", "Idempotency-Key": "abc"})
+
+    assert app.calls == 2
+
+
+def test_claim_outlives_its_expiry_while_the_request_runs(monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_LOCK_SECONDS", 1)
+    app = CreateApp(delay=2.0)
+    headers = {"Authorization": f"Bearer {token(uuid4())}", "Idempotency-Key": "abc"}
+
+    async def run():
+        async with client(app) as http:
+            first = asyncio.create_task(http.post(PATH, json={}, headers=headers))
+            # Retry once the original claim would have expired
+            await asyncio.sleep(1.5)
+            retry = await http.post(PATH, json={}, headers=headers)
+            return await first, retry
+
+    first, retry = asyncio.run(run())
+
+    assert app.calls == 1
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+
+
+@pytest.mark.parametrize("status", [401, 409, 422, 429, 500])
+def test_failures_are_not_stored(status, redis):
+    app = CreateApp(status=status)
+    headers = {"Authorization": f"Bearer {token(uuid4())}", "Idempotency-Key": "abc"}
+
+    post(app, {}, headers)
+    retry = post(app, {}, headers)
+
+    assert app.calls == 2
+    assert "idempotent-replayed" not in retry.headers
+    assert stored_keys(redis) == []
+
+
+def test_requests_without_a_valid_token_pass_through(redis):
+    app = CreateApp()
+
+    post(app, {}, {"Authorization": "Bearer not-a-token", "Idempotency-Key": "abc"})
+    post(app, {}, {"Idempotency-Key": "abc"})
+
+    assert app.calls == 2
+    assert stored_keys(redis) == []
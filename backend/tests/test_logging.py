@@ -0,0 +1,158 @@
+"""Tests for request ids, log sampling and request id propagation into Celery."""
+
+import asyncio
+import logging
+from importlib import import_module
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+import pytest
+from celery.contrib.testing.worker import start_worker
+from loguru import logger
+
+from app import log
+from app.auth.manager import UserManager
+from app.config import settings
+from app.log import InterceptHandler, request_id
+from app.middleware.request_id import RequestIdMiddleware
+from app.tasks.celery_app import celery_app
+
+celery_module = import_module("app.tasks.celery_app")
+
+
+@celery_app.task(name="tests.current_request_id")
+def current_request_id():
+    logger.info("Task ran")
+    return request_id.get()
+
+
+@pytest.fixture
+def records():
+    """Collect log records, tagged with request ids as the app's pipeline does."""
+    records = []
+    logger.configure(patcher=log._add_request_id)
+    sink_id = logger.add(lambda message: records.append(message.record), level="DEBUG")
+    yield records
+    logger.remove(sink_id)
+    logger.configure(patcher=lambda record: None)
+
+
+async def endpoint(scope, receive, send):
+    logger.info("Handling request")
+    body = (request_id.get() or "").encode()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+def get(headers=None, sample_rate=1.0):
+    async def run():
+        transport = httpx.ASGITransport(app=RequestIdMiddleware(endpoint, sample_rate))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/v1/cases/", headers=headers)
+
+    return asyncio.run(run())
+
+
+def test_incoming_request_id_is_used_and_returned(records):
+    response = get({"X-Request-ID": "checkout-42"})
+
+    assert response.text == "checkout-42"
+    assert response.headers["x-request-id"] == "checkout-42"
+    handled, access = records
+    assert handled["extra"]["request_id"] == "checkout-42"
+    assert access["extra"]["request_id"] == "checkout-42"
+    assert access["extra"]["status_code"] == 200
+    assert request_id.get() is None
+
+
+@pytest.mark.parametrize("incoming", ["", "has spaces", "a" * 129, "new\nline"])
+def test_unsafe_request_ids_are_replaced(incoming):
+    response = get({"X-Request-ID": incoming})
+
+    assert response.text != incoming
+    assert len(response.text) == 32
+    assert response.headers["x-request-id"] == response.text
+
+
+def test_records_outside_requests_have_a_placeholder_id(records):
+    logger.info("Startup")
+
+    assert records[0]["extra"]["request_id"] == log.NO_REQUEST_ID
+
+
+def record(extra):
+    return {"extra": extra}
+
+
+def test_sampling_and_sql_channel_filters(monkeypatch):
+    monkeypatch.setattr(log.random, "random", lambda: 0.5)
+
+    assert log._keep(record({}))
+    assert log._keep(record({"sample": 0.6}))
+    assert not log._keep(record({"sample": 0.4}))
+    # SQL goes to its own sink only
+    assert not log._keep(record({"channel": log.SQL_CHANNEL}))
+    assert log._is_sql(record({"channel": log.SQL_CHANNEL}))
+    assert not log._is_sql(record({"channel": "access"}))
+
+
+def test_stdlib_records_are_routed_into_loguru(records):
+    stdlib_logger = logging.getLogger("tests.stdlib")
+    stdlib_logger.addHandler(InterceptHandler())
+    stdlib_logger.propagate = False
+    try:
+        stdlib_logger.warning("From the standard library")
+    finally:
+        stdlib_logger.handlers.clear()
+
+    assert records[0]["message"] == "From the standard library"
+    assert records[0]["level"].name == "WARNING"
+    assert records[0]["function"] == "test_stdlib_records_are_routed_into_loguru"
+
+
+@pytest.mark.parametrize("debug", [True, False])
+def test_reset_tokens_are_only_logged_in_debug(records, monkeypatch, debug):
+    monkeypatch.setattr(settings, "DEBUG", debug)
+    user = SimpleNamespace(id=uuid4())
+
+    asyncio.run(UserManager(None).on_after_forgot_password(user, "secret-token"))
+
+    logged_token = any("secret-token" in record["message"] for record in records)
+    assert logged_token is debug
+
+
+@pytest.fixture(scope="module")
+def worker():
+    """Run a worker on an in-memory broker, keeping the test run's logging."""
+    conf = {
+        "broker_url": "memory://",
+        "broker_transport_options": {"polling_interval": 0.01},
+        "result_backend": "cache+memory://",
+    }
+    previous = {key: celery_app.conf[key] for key in conf}
+    celery_app.conf.update(conf)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(celery_module, "configure_logging", lambda: None)
+        monkeypatch.setattr(celery_module, "install_sql_logging", lambda engines: None)
+        with start_worker(celery_app, pool="solo", perform_ping_check=False, loglevel="WARNING"):
+            yield
+    celery_app.conf.update(previous)
+
+
+def test_tasks_log_under_the_enqueuing_request_id(worker, records):
+    token = request_id.set("checkout-42")
+    try:
+        result = current_request_id.delay()
+    finally:
+        request_id.reset(token)
+
+    assert result.get(timeout=10) == "checkout-42"
+    ran = next(record for record in records if record["message"] == "Task ran")
+    assert ran["extra"]["request_id"] == "checkout-42"
+
+
+def test_tasks_enqueued_outside_requests_use_their_own_id(worker):
+    result = current_request_id.delay()
+
+    assert result.get(timeout=10) == result.id
@@ -0,0 +1,135 @@
+"""Tests for MessagePack content negotiation."""
+
+import asyncio
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import httpx
+import msgpack
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import PlainTextResponse
+from sqlmodel import SQLModel
+
+from app.api.negotiation import MsgPackRoute, _accepts_msgpack
+
+MSGPACK = "application/msgpack"
+
+
+class Note(SQLModel):
+    text: str
+    stress: int = 0
+
+
+class NoteRead(Note):
+    id: UUID
+    created_at: datetime
+
+
+router = APIRouter(route_class=MsgPackRoute)
+
+
+@router.post("/notes", response_model=NoteRead, status_code=201)
+async def create_note(note: Note):
+    return NoteRead(**note.model_dump(), id=uuid4(), created_at=datetime(2025, 6, 1, 20, 0))
+
+
+@router.get("/plain", response_class=PlainTextResponse)
+async def plain():
+    return "plain"
+
+
+app = FastAPI()
+app.include_router(router)
+
+
+def request(method, path, **kwargs):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_msgpack_round_trip():
+    response = request(
+        "POST",
+        "/notes",
+        content=msgpack.packb({"text": "Docks at midnight", "stress": 5}),
+        headers={"Content-Type": MSGPACK, "Accept": MSGPACK},
+    )
+
+    assert response.status_code == 201
+    assert response.headers["content-type"] == MSGPACK
+    assert response.headers["vary"] == "Accept"
+    note = msgpack.unpackb(response.content)
+    assert note["text"] == "Docks at midnight"
+    assert note["stress"] == 5
+    # Same serialized values as the JSON response
+    assert note["created_at"] == "2025-06-01T20:00:00"
+    assert UUID(note["id"])
+
+
+def test_msgpack_body_with_json_response():
+    response = request(
+        "POST",
+        "/notes",
+        content=msgpack.packb({"text": "Alley"}),
+        headers={"Content-Type": "application/x-msgpack; charset=binary"},
+    )
+
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["text"] == "Alley"
+
+
+def test_json_body_with_msgpack_response():
+    response = request("POST", "/notes", json={"text": "Pier"}, headers={"Accept": MSGPACK})
+
+    assert msgpack.unpackb(response.content)["text"] == "Pier"
+
+
+def test_invalid_msgpack_is_a_json_400():
+    response = request(
+        "POST", "/notes", content=b"\xc1", headers={"Content-Type": MSGPACK, "Accept": MSGPACK}
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid MessagePack body"}
+
+
+def test_validation_errors_stay_json():
+    response = request(
+        "POST",
+        "/notes",
+        content=msgpack.packb({"stress": "high"}),
+        headers={"Content-Type": MSGPACK, "Accept": MSGPACK},
+    )
+
+    assert response.status_code == 422
+    assert response.headers["content-type"] == "application/json"
+    assert {error["loc"][-1] for error in response.json()["detail"]} == {"text", "stress"}
+
+
+def test_explicit_response_class_is_kept():
+    response = request("GET", "/plain", headers={"Accept": MSGPACK})
+
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text == "plain"
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, False),
+        ("application/json", False),
+        ("application/msgpack", True),
+        ("application/json;q=0.9, application/x-msgpack", True),
+        ("Application/MsgPack; q=0.5", True),
+        ("application/msgpack; q=0", False),
+        ("application/msgpack;q=0.0", False),
+    ],
+)
+def test_accept_header(accept, expected):
+    assert _accepts_msgpack(accept) is expected
@@ -0,0 +1,118 @@
+"""Tests for pooled password hashing."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import bcrypt
+import pytest
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app.auth import manager, password
+from app.auth.manager import UserManager
+from app.auth.password import PooledPasswordHelper
+
+
+@pytest.fixture
+def helper():
+    helper = PooledPasswordHelper(max_workers=2)
+    yield helper
+    helper.shutdown()
+
+
+def test_hash_then_verify(helper):
+    async def run():
+        hashed = await helper.hash_async("hunter22")
+        return (
+            hashed,
+            await helper.verify_and_update_async("hunter22", hashed),
+            await helper.verify_and_update_async("hunter23", hashed),
+        )
+
+    hashed, right, wrong = asyncio.run(run())
+
+    assert hashed.startswith("$argon2")
+    assert right == (True, None)
+    assert wrong == (False, None)
+    # The inherited synchronous path reads the same hashes
+    assert helper.verify_and_update("hunter22", hashed) == (True, None)
+
+
+def test_legacy_hashes_verify_and_are_upgraded(helper):
+    legacy = bcrypt.hashpw(b"hunter22", bcrypt.gensalt(rounds=4)).decode()
+
+    verified, upgraded = asyncio.run(helper.verify_and_update_async("hunter22", legacy))
+
+    assert verified
+    assert upgraded.startswith("$argon2")
+
+
+def test_hashing_runs_in_the_pool_with_bounded_concurrency(helper, monkeypatch):
+    running, peak, threads = 0, 0, set()
+    lock = threading.Lock()
+
+    def slow_hash(value):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+            threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return f"hashed:{value}"
+
+    monkeypatch.setattr(password, "_hash", slow_hash)
+
+    async def run():
+        return await asyncio.gather(*(helper.hash_async(str(index)) for index in range(6)))
+
+    assert asyncio.run(run()) == [f"hashed:{index}" for index in range(6)]
+    assert peak == 2
+    assert all(name.startswith("password-hash") for name in threads)
+
+
+class UserDatabase:
+    """User store with a single user."""
+
+    def __init__(self, user):
+        self.user = user
+        self.updates = []
+
+    async def get_by_email(self, email):
+        return self.user if email == self.user.email else None
+
+    async def update(self, user, update_dict):
+        self.updates.append(update_dict)
+        return user
+
+
+def login(user_db, email, secret):
+    credentials = OAuth2PasswordRequestForm(username=email, password=secret)
+    return asyncio.run(UserManager(user_db, password.password_helper).authenticate(credentials))
+
+
+def test_login_upgrades_legacy_hashes():
+    legacy = bcrypt.hashpw(b"hunter22", bcrypt.gensalt(rounds=4)).decode()
+    user = SimpleNamespace(email="ana@example.com", hashed_password=legacy)
+    user_db = UserDatabase(user)
+
+    assert login(user_db, "ana@example.com", "hunter22") is user
+    (update,) = user_db.updates
+    assert update["hashed_password"].startswith("$argon2")
+    assert login(user_db, "ana@example.com", "wrong") is None
+
+
+def test_unknown_emails_still_pay_for_a_hash(monkeypatch):
+    hashed = []
+
+    async def hash_async(value):
+        hashed.append(value)
+        return "hashed"
+
+    monkeypatch.setattr(manager.password_helper, "hash_async", hash_async)
+    user_db = UserDatabase(SimpleNamespace(email="ana@example.com", hashed_password=""))
+
+    assert login(user_db, "bob@example.com", "hunter22") is None
+    assert hashed == ["hunter22"]
@@ -0,0 +1,142 @@
+"""Tests for on-demand request profiling."""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fakeredis import FakeAsyncRedis
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.middleware import profiling
+from app.middleware.profiling import ProfilingMiddleware
+from app.models.profile import ProfileReport
+from app.services.profiling import (
+    get_profile,
+    get_profile_html,
+    install_sql_capture,
+    list_profiles,
+    save_profile,
+    sql_log,
+)
+
+engine = create_engine("sqlite://")
+install_sql_capture([SimpleNamespace(sync_engine=engine)])
+
+
+async def app(scope, receive, send):
+    """Endpoint running two SQL statements."""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeAsyncRedis(decode_responses=True)
+
+    async def save(report, html):
+        await save_profile(report, html, redis)
+
+    monkeypatch.setattr(profiling, "save_profile", save)
+    return redis
+
+
+@pytest.fixture
+def superuser(monkeypatch):
+    async def is_superuser(scope):
+        return dict(scope["headers"]).get(b"authorization") == b"Bearer admin"
+
+    monkeypatch.setattr(profiling, "_is_superuser", is_superuser)
+
+
+def get(headers=None, sample_rate=0.0):
+    async def run():
+        transport = httpx.ASGITransport(app=ProfilingMiddleware(app, sample_rate=sample_rate))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/v1/cases/?limit=5", headers=headers)
+
+    return asyncio.run(run())
+
+
+def test_superuser_header_profiles_the_request(redis, superuser):
+    response = get({"X-Profile": "1", "Authorization": "Bearer admin"})
+
+    profile_id = response.headers["x-profile-id"]
+    report = asyncio.run(get_profile(profile_id, redis))
+    assert (report.method, report.path) == ("GET", "/api/v1/cases/")
+    assert report.query_string == "limit=5"
+    assert (report.status_code, report.trigger) == (200, "header")
+    assert [timing.statement for timing in report.sql] == ["SELECT 1", "SELECT 2"]
+    assert report.sql_count == 2
+    assert "<html" in asyncio.run(get_profile_html(profile_id, redis)).lower()
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {"X-Profile": "1", "Authorization": "Bearer player"},
+        {"X-Profile": "0", "Authorization": "Bearer admin"},
+        {},
+    ],
+)
+def test_other_requests_are_not_profiled(redis, superuser, headers):
+    response = get(headers)
+
+    assert response.text == "ok"
+    assert "x-profile-id" not in response.headers
+    assert asyncio.run(redis.keys()) == []
+
+
+def test_sampled_requests_are_profiled(redis, superuser):
+    response = get(sample_rate=1.0)
+
+    report = asyncio.run(get_profile(response.headers["x-profile-id"], redis))
+    assert report.trigger == "sample"
+
+
+def test_sql_is_only_timed_for_profiled_requests():
+    statements = []
+    token = sql_log.set(statements)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 3"))
+    finally:
+        sql_log.reset(token)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 4"))
+
+    assert [statement["statement"] for statement in statements] == ["SELECT 3"]
+    assert statements[0]["duration_ms"] >= 0
+
+
+def make_report(index, started_at):
+    return ProfileReport(
+        id=f"profile-{index}",
+        method="GET",
+        path="/",
+        trigger="sample",
+        started_at=started_at,
+        duration_ms=1.0,
+        sql_count=0,
+        sql_duration_ms=0.0,
+    )
+
+
+def test_only_the_newest_profiles_are_kept(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_MAX_STORED", 3)
+    redis = FakeAsyncRedis(decode_responses=True)
+    now = datetime.now()
+    for index in range(5):
+        report = make_report(index, now - timedelta(minutes=5 - index))
+        asyncio.run(save_profile(report, "<html></html>", redis))
+
+    summaries = asyncio.run(list_profiles(10, redis))
+
+    assert [summary.id for summary in summaries] == ["profile-4", "profile-3", "profile-2"]
+    assert asyncio.run(get_profile("profile-0", redis)) is None
+    assert asyncio.run(redis.exists("profile:profile-0")) == 0
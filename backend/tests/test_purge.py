@@ -0,0 +1,127 @@
+"""Tests for the deferred deletion tasks."""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from kombu.exceptions import OperationalError
+
+from app.config import settings
+from app.models.character import Character
+from app.models.decision import Decision
+from app.tasks import purge
+from app.tasks.purge import _delete_in_batches, _purge_case, schedule_case_purge
+
+
+class TablesSession:
+    """Session deleting from in-memory tables, honouring each batch's LIMIT.
+
+    ``case`` answers the purge's lookup of the case row.
+    """
+
+    def __init__(self, case=None, **tables):
+        self.case = case
+        self.tables = {name: list(rows) for name, rows in tables.items()}
+        self.deletes = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        if not statement.is_delete:
+            return SimpleNamespace(one_or_none=lambda: self.case)
+        name = statement.table.name
+        limit = statement.compile().params.get("param_1")
+        rows = self.tables.setdefault(name, [])
+        deleted = len(rows) if limit is None else min(limit, len(rows))
+        del rows[:deleted]
+        self.deletes.append((name, limit, deleted))
+        return SimpleNamespace(rowcount=deleted)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, "PURGE_BATCH_SIZE", 2)
+
+
+def test_rows_are_deleted_in_committed_batches():
+    session = TablesSession(decisions=range(5))
+
+    total = asyncio.run(_delete_in_batches(session, Decision, Decision.case_id == uuid4()))
+
+    assert total == 5
+    assert session.deletes == [("decisions", 2, 2), ("decisions", 2, 2), ("decisions", 2, 1)]
+    assert session.commits == 3
+
+
+def test_a_full_last_batch_is_followed_by_an_empty_one():
+    session = TablesSession(characters=range(4))
+
+    total = asyncio.run(_delete_in_batches(session, Character, Character.case_id == uuid4()))
+
+    assert total == 4
+    assert [deleted for _, _, deleted in session.deletes] == [2, 2, 0]
+
+
+def old_deleted_case(user_id):
+    return SimpleNamespace(
+        user_id=user_id,
+        deleted_at=datetime.utcnow(),
+        created_at=datetime.utcnow() - timedelta(days=3),
+    )
+
+
+def test_case_is_purged_children_first():
+    user_id, case_id = uuid4(), uuid4()
+    redis = FakeAsyncRedis(decode_responses=True)
+    session = TablesSession(
+        case=old_deleted_case(user_id), decisions=range(3), characters=range(2), cases=[case_id]
+    )
+
+    purged = asyncio.run(_purge_case(session, redis, case_id))
+
+    assert purged == {"decisions": 3, "characters": 2, "cases": 1}
+    assert [name for name, _, _ in session.deletes] == [
+        "decisions",
+        "decisions",
+        "characters",
+        "characters",
+        "cases",
+    ]
+    # The case row itself is a single unbatched delete
+    assert session.deletes[-1] == ("cases", None, 1)
+    assert asyncio.run(redis.sismember(f"case_removed:{user_id}", str(case_id)))
+
+
+@pytest.mark.parametrize("case", [None, SimpleNamespace(user_id=uuid4(), deleted_at=None)])
+def test_missing_or_live_cases_are_left_alone(case):
+    session = TablesSession(case=case, decisions=range(3))
+
+    purged = asyncio.run(_purge_case(session, FakeAsyncRedis(), uuid4()))
+
+    assert purged == {"decisions": 0, "characters": 0, "cases": 0}
+    assert session.deletes == []
+
+
+def test_purge_is_queued_for_cases_past_the_quota_day(monkeypatch):
+    queued = []
+    monkeypatch.setattr(purge.purge_case, "delay", lambda *args: queued.append(args))
+    case_id = uuid4()
+
+    asyncio.run(schedule_case_purge(case_id, datetime.utcnow() - timedelta(days=2), 1))
+    asyncio.run(schedule_case_purge(uuid4(), datetime.utcnow()))
+
+    assert queued == [(str(case_id), 1)]
+
+
+def test_broker_outage_leaves_the_purge_to_the_sweep(monkeypatch):
+    def broker_down(*args):
+        raise OperationalError("Broker is down")
+
+    monkeypatch.setattr(purge.purge_case, "delay", broker_down)
+
+    asyncio.run(schedule_case_purge(uuid4(), datetime.utcnow() - timedelta(days=2)))
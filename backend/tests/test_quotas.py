@@ -0,0 +1,234 @@
+"""Tests for the daily case quota and write admission control."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError as RedisConnectionError
+from starlette.requests import Request
+
+from app.api import deps
+from app.api.v1.routes import cases
+from app.config import settings
+from app.models.case import CaseCreate, CaseDifficulty
+from app.services import quotas
+from app.services.admission import admit_write
+from app.services.quotas import (
+    QuotaExceeded,
+    counts_toward_quota,
+    day_window,
+    release_case_slot,
+    reserve_case_slot,
+)
+from app.tasks.purge import _purge_case
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_day_window_in_utc():
+    assert day_window("UTC", utc(2025, 6, 1, 18, 0)) == (
+        "2025-06-01",
+        datetime(2025, 6, 1),
+        6 * 3600,
+    )
+
+
+def test_day_window_follows_the_local_date():
+    # 22:00 on May 31st in New York
+    day, start, seconds_left = day_window("America/New_York", utc(2025, 6, 1, 2, 0))
+
+    assert day == "2025-05-31"
+    assert start == datetime(2025, 5, 31, 4, 0)
+    assert seconds_left == 2 * 3600
+
+
+def test_day_window_on_a_23_hour_day():
+    # Europe/Berlin springs forward on 2025-03-30; 00:30 local
+    day, start, seconds_left = day_window("Europe/Berlin", utc(2025, 3, 29, 23, 30))
+
+    assert day == "2025-03-30"
+    assert start == datetime(2025, 3, 29, 23, 0)
+    assert seconds_left == 22 * 3600 + 1800
+
+
+def test_day_window_on_a_25_hour_day():
+    # Europe/Berlin falls back on 2025-10-26; local midnight
+    day, start, seconds_left = day_window("Europe/Berlin", utc(2025, 10, 25, 22, 0))
+
+    assert day == "2025-10-26"
+    assert start == datetime(2025, 10, 25, 22, 0)
+    assert seconds_left == 25 * 3600
+
+
+def test_day_window_falls_back_to_utc_for_unknown_zones():
+    assert day_window("Nowhere/Else", utc(2025, 6, 1, 18, 0)) == day_window(
+        "UTC", utc(2025, 6, 1, 18, 0)
+    )
+
+
+class BrokenRedis:
+    """Redis client whose every call fails."""
+
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise RedisConnectionError("Redis is down")
+
+        return fail
+
+
+class CountingSession:
+    """Session answering the quota's COUNT query."""
+
+    def __init__(self, count):
+        self.count = count
+
+    async def execute(self, statement):
+        return SimpleNamespace(scalar_one=lambda: self.count)
+
+
+def test_quota_falls_back_to_postgres_below_the_limit():
+    session = CountingSession(settings.MAX_CASES_PER_DAY - 1)
+
+    key = asyncio.run(reserve_case_slot(session, uuid4(), "UTC", redis=BrokenRedis()))
+
+    # Nothing was reserved in Redis, so there is nothing to release
+    assert key is None
+    asyncio.run(release_case_slot(key, redis=BrokenRedis()))
+
+
+def test_quota_falls_back_to_postgres_at_the_limit(monkeypatch):
+    monkeypatch.setattr(
+        quotas, "day_window", lambda tz_name: ("2025-06-01", datetime(2025, 6, 1), 600)
+    )
+    session = CountingSession(settings.MAX_CASES_PER_DAY)
+
+    with pytest.raises(QuotaExceeded) as exc_info:
+        asyncio.run(reserve_case_slot(session, uuid4(), "UTC", redis=BrokenRedis()))
+    assert exc_info.value.retry_after == 600
+
+
+class CasesSession:
+    """Session over an in-memory ``cases`` table, for the purge and quota queries."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, statement):
+        params = statement.compile().params
+        if statement.is_delete:
+            if statement.table.name != "cases":
+                return SimpleNamespace(rowcount=0)
+            kept = [row for row in self.rows if row.id != params["id_1"]]
+            deleted, self.rows[:] = len(self.rows) - len(kept), kept
+            return SimpleNamespace(rowcount=deleted)
+        if "count(*)" in str(statement):
+            count = sum(
+                row.user_id == params["user_id_1"] and row.created_at >= params["created_at_1"]
+                for row in self.rows
+            )
+            return SimpleNamespace(scalar_one=lambda: count)
+        match = next((row for row in self.rows if row.id == params["id_1"]), None)
+        return SimpleNamespace(one_or_none=lambda: match)
+
+    async def commit(self):
+        pass
+
+
+def make_cases(user_id, count, created_at):
+    return [
+        SimpleNamespace(id=uuid4(), user_id=user_id, created_at=created_at, deleted_at=None)
+        for _ in range(count)
+    ]
+
+
+def test_counts_toward_quota_for_a_day_and_more():
+    now = datetime(2025, 10, 26, 12, 0)
+
+    assert counts_toward_quota(now - timedelta(hours=25), now)
+    assert not counts_toward_quota(now - timedelta(hours=27), now)
+
+
+def test_deleted_cases_keep_counting_after_a_purge():
+    user_id = uuid4()
+    rows = make_cases(user_id, settings.MAX_CASES_PER_DAY, datetime.utcnow())
+    rows[0].deleted_at = datetime.utcnow()
+    session = CasesSession(rows)
+
+    purged = asyncio.run(_purge_case(session, FakeAsyncRedis(), rows[0].id))
+
+    assert purged["cases"] == 0
+    assert len(session.rows) == settings.MAX_CASES_PER_DAY
+    with pytest.raises(QuotaExceeded):
+        asyncio.run(reserve_case_slot(session, user_id, "UTC", redis=BrokenRedis()))
+
+
+def test_cases_from_earlier_days_are_purged():
+    user_id = uuid4()
+    rows = make_cases(user_id, settings.MAX_CASES_PER_DAY, datetime.utcnow() - timedelta(days=2))
+    deleted = rows[0]
+    deleted.deleted_at = datetime.utcnow()
+    session = CasesSession(rows)
+
+    purged = asyncio.run(_purge_case(session, FakeAsyncRedis(), deleted.id))
+
+    assert purged["cases"] == 1
+    assert deleted.id not in {row.id for row in session.rows}
+    assert asyncio.run(reserve_case_slot(session, user_id, "UTC", redis=BrokenRedis())) is None
+
+
+def test_create_case_returns_429_when_the_quota_is_used_up(monkeypatch):
+    async def quota_exceeded(session, user_id, tz_name):
+        raise QuotaExceeded(retry_after=3600)
+
+    monkeypatch.setattr(cases, "reserve_case_slot", quota_exceeded)
+    user = SimpleNamespace(id=uuid4(), timezone="UTC")
+    case_data = CaseCreate(
+        title="The docks", description="", difficulty=CaseDifficulty.EASY, user_id=user.id
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(cases.create_case(case_data, session=None, user=user))
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "3600"}
+
+
+def make_request(method):
+    return Request({"type": "http", "method": method, "path": "/", "headers": []})
+
+
+def test_writes_over_the_rate_get_429(monkeypatch):
+    async def no_tokens(user_id):
+        return 3
+
+    monkeypatch.setattr(deps, "admit_write", no_tokens)
+    user = SimpleNamespace(id=uuid4())
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(deps.admit_writes(make_request("POST"), user))
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "3"}
+
+
+def test_admitted_writes_and_reads_pass(monkeypatch):
+    calls = []
+
+    async def admit(user_id):
+        calls.append(user_id)
+        return None
+
+    monkeypatch.setattr(deps, "admit_write", admit)
+    user = SimpleNamespace(id=uuid4())
+
+    asyncio.run(deps.admit_writes(make_request("PATCH"), user))
+    asyncio.run(deps.admit_writes(make_request("GET"), user))
+    assert calls == [user.id]
+
+
+def test_admission_fails_open_without_redis():
+    assert asyncio.run(admit_write(uuid4(), redis=BrokenRedis())) is None
@@ -0,0 +1,137 @@
+"""Tests for read replica routing and read-your-writes pinning."""
+
+import asyncio
+import itertools
+import time
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+from starlette.requests import Request
+
+from app import database
+from app.api.deps import pin_writes_to_primary
+from app.config import settings
+
+
+class FakeSession:
+    """Session that fails to connect when its database is ``down``."""
+
+    def __init__(self, name, down=False):
+        self.name = name
+        self.down = down
+        self.closed = False
+
+    async def connection(self):
+        if self.down:
+            raise OSError(f"{self.name} is down")
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class FakeDatabase:
+    """Session factory remembering the sessions it opened."""
+
+    def __init__(self, name, down=False):
+        self.name = name
+        self.down = down
+        self.sessions = []
+
+    def __call__(self):
+        session = FakeSession(self.name, self.down)
+        self.sessions.append(session)
+        return session
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(database, "redis_client", redis)
+    return redis
+
+
+@pytest.fixture
+def replicas(monkeypatch, redis):
+    replicas = [FakeDatabase("replica-0"), FakeDatabase("replica-1"), FakeDatabase("replica-2")]
+    monkeypatch.setattr(database, "replica_session_makers", replicas)
+    monkeypatch.setattr(database, "shard_session_makers", [])
+    monkeypatch.setattr(database, "async_session_maker", FakeDatabase("primary"))
+    monkeypatch.setattr(database, "_replica_cursor", itertools.count())
+    monkeypatch.setattr(database, "_replica_down_until", {})
+    return replicas
+
+
+def read_from(user_id=None):
+    async def run():
+        async with database.read_session(user_id) as session:
+            return session
+
+    return asyncio.run(run())
+
+
+def test_replicas_are_tried_round_robin(replicas):
+    assert database._replica_order() == [0, 1, 2]
+    assert database._replica_order() == [1, 2, 0]
+    assert database._replica_order() == [2, 0, 1]
+
+
+def test_replicas_in_cooldown_are_skipped_until_it_ends(replicas):
+    database._replica_down_until[1] = time.monotonic() + 60
+    database._replica_down_until[2] = time.monotonic() - 1
+
+    assert database._replica_order() == [0, 2]
+
+
+def test_reads_fail_over_to_the_next_replica(replicas):
+    replicas[0].down = True
+
+    session = read_from()
+
+    assert session.name == "replica-1"
+    assert replicas[0].sessions[0].closed
+    assert database._replica_down_until[0] > time.monotonic()
+    # The failed replica stays out of rotation during its cooldown
+    assert [read_from().name for _ in range(3)] == ["replica-1", "replica-2", "replica-1"]
+
+
+def test_reads_fall_back_to_the_primary_when_every_replica_is_down(replicas):
+    for replica in replicas:
+        replica.down = True
+
+    assert read_from().name == "primary"
+    assert len(database._replica_down_until) == 3
+
+
+def make_request(method):
+    return Request({"type": "http", "method": method, "path": "/", "headers": []})
+
+
+def test_writes_pin_the_user_to_the_primary(replicas, redis):
+    class User:
+        id = uuid4()
+
+    asyncio.run(pin_writes_to_primary(make_request("GET"), User))
+    assert read_from(User.id).name.startswith("replica")
+
+    asyncio.run(pin_writes_to_primary(make_request("PATCH"), User))
+    assert read_from(User.id).name == "primary"
+    assert read_from(uuid4()).name.startswith("replica")
+    ttl = asyncio.run(redis.ttl(f"primary_pin:{User.id}"))
+    assert 0 < ttl <= settings.READ_YOUR_WRITES_SECONDS
+
+
+def test_reads_use_the_primary_when_pins_cannot_be_checked(replicas, monkeypatch):
+    server = FakeServer()
+    server.connected = False
+    monkeypatch.setattr(database, "redis_client", FakeAsyncRedis(server=server))
+
+    asyncio.run(database.pin_to_primary(uuid4()))
+
+    assert read_from(uuid4()).name == "primary"
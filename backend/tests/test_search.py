@@ -0,0 +1,135 @@
+"""Tests for full-text search over cases and characters."""
+
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.routes.search import search_cases_and_characters
+from app.models.search import SearchKind
+from app.services.search import build_search_query, decode_cursor, encode_cursor, search
+
+
+def compile_sql(statement):
+    compiled = statement.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+class RowsSession:
+    """Session returning fixed search rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def make_rows(count):
+    return [
+        SimpleNamespace(
+            kind=SearchKind.CASE.value,
+            id=uuid4(),
+            case_id=uuid4(),
+            title=f"Case {index}",
+            rank=1.0 - index / 10,
+            snippet=None if index % 2 else "the <mark>docks</mark>",
+        )
+        for index in range(count)
+    ]
+
+
+def test_cursor_round_trip():
+    hit_id = uuid4()
+
+    assert decode_cursor(encode_cursor(0.25, "character", hit_id)) == (0.25, "character", hit_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor(0.5, "case", uuid4())[:-4],
+        encode_cursor(0.5, "suspect", uuid4()),
+        "WzAuNSwgImNhc2UiLCAibm90LWEtdXVpZCJd",  # [0.5, "case", "not-a-uuid"]
+    ],
+)
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_query_is_scoped_to_the_user():
+    user_id = uuid4()
+
+    sql, params = compile_sql(build_search_query("docks", user_id, limit=20))
+
+    assert "websearch_to_tsquery" in sql
+    assert "ts_headline" in sql
+    assert sql.count("cases.user_id =") == 2
+    assert sql.count("cases.deleted_at IS NULL") == 2
+    assert user_id in params.values()
+    # One extra row tells whether there is a next page
+    assert 21 in params.values()
+
+
+def test_query_across_all_users_has_no_owner_filter():
+    sql, _ = compile_sql(build_search_query("docks", None, limit=20))
+
+    assert "cases.user_id" not in sql
+
+
+def test_cursor_continues_after_the_last_hit():
+    hit_id = uuid4()
+
+    sql, params = compile_sql(
+        build_search_query("docks", None, limit=20, cursor=encode_cursor(0.5, "case", hit_id))
+    )
+
+    assert "hits.rank <" in sql
+    assert "(hits.kind, hits.id) >" in sql
+    assert hit_id in params.values()
+
+
+def test_full_page_returns_a_cursor_to_the_next():
+    rows = make_rows(4)
+
+    page = asyncio.run(search(RowsSession(rows), "docks", None, limit=3))
+
+    assert [hit.title for hit in page.results] == ["Case 0", "Case 1", "Case 2"]
+    assert page.results[1].snippet == ""
+    assert decode_cursor(page.next_cursor) == (rows[2].rank, "case", rows[2].id)
+
+
+def test_last_page_has_no_cursor():
+    page = asyncio.run(search(RowsSession(make_rows(3)), "docks", None, limit=3))
+
+    assert len(page.results) == 3
+    assert page.next_cursor is None
+
+
+def run_route(user, **params):
+    params = {"all_users": False, "limit": 20, "cursor": None, **params}
+    return asyncio.run(
+        search_cases_and_characters(q="docks", session=RowsSession([]), user=user, **params)
+    )
+
+
+def test_only_superusers_search_across_users():
+    with pytest.raises(HTTPException) as exc_info:
+        run_route(SimpleNamespace(id=uuid4(), is_superuser=False), all_users=True)
+    assert exc_info.value.status_code == 403
+
+    page = run_route(SimpleNamespace(id=uuid4(), is_superuser=True), all_users=True)
+    assert page.results == []
+
+
+def test_bad_cursor_is_a_400():
+    with pytest.raises(HTTPException) as exc_info:
+        run_route(SimpleNamespace(id=uuid4(), is_superuser=False), cursor="garbage")
+    assert exc_info.value.status_code == 400
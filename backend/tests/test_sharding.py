@@ -0,0 +1,66 @@
+"""Tests for user shard placement."""
+
+from collections import Counter
+from uuid import UUID, uuid4
+
+import pytest
+
+from app import database
+from app.database import jump_hash, shard_for_user
+
+
+@pytest.mark.parametrize(
+    ("key", "buckets", "expected"),
+    [
+        # Reference vectors of the published jump consistent hash
+        (1, 1, 0),
+        (42, 57, 43),
+        (0xDEAD10CC, 1, 0),
+        (0xDEAD10CC, 666, 361),
+        (256, 1024, 520),
+    ],
+)
+def test_jump_hash_matches_reference(key, buckets, expected):
+    assert jump_hash(key, buckets) == expected
+
+
+def test_jump_hash_is_stable_and_in_range():
+    for key in range(1000):
+        bucket = jump_hash(key, 7)
+        assert 0 <= bucket < 7
+        assert jump_hash(key, 7) == bucket
+
+
+def test_adding_a_bucket_only_moves_keys_to_it():
+    keys = [uuid4().int & 0xFFFFFFFFFFFFFFFF for _ in range(5000)]
+    moved = 0
+    for key in keys:
+        before, after = jump_hash(key, 4), jump_hash(key, 5)
+        if before != after:
+            assert after == 4
+            moved += 1
+    # About 1/5 of the keys move to the new bucket
+    assert 0.15 < moved / len(keys) < 0.25
+
+
+def test_jump_hash_spreads_keys_evenly():
+    counts = Counter(jump_hash(uuid4().int & 0xFFFFFFFFFFFFFFFF, 4) for _ in range(8000))
+    assert set(counts) == {0, 1, 2, 3}
+    assert all(1700 < count < 2300 for count in counts.values())
+
+
+def test_shard_for_user_is_none_without_shards(monkeypatch):
+    monkeypatch.setattr(database, "shard_session_makers", [])
+    assert shard_for_user(uuid4()) is None
+    assert shard_for_user(uuid4(), 2) is None
+
+
+def test_shard_for_user_prefers_a_valid_pin(monkeypatch):
+    monkeypatch.setattr(database, "shard_session_makers", [object()] * 4)
+    user_id = UUID("6f1c1f8e-2d4b-4c1a-9a37-0d5b8f0e7a21")
+    hashed = jump_hash(user_id.int & 0xFFFFFFFFFFFFFFFF, 4)
+
+    assert shard_for_user(user_id) == hashed
+    assert shard_for_user(user_id, 3) == 3
+    # A pin to a shard that is no longer configured falls back to the hash
+    assert shard_for_user(user_id, 9) == hashed
@@ -0,0 +1,110 @@
+"""Tests for the suspect ranking engine."""
+
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.models.character import Character, CharacterRole
+from app.models.decision import Decision, DecisionOutcome, DecisionType
+from app.services.suspect_ranking import FEATURE_NAMES, build_features, score_characters
+
+
+def make_character(case_id, name, suspicion=0, trust=50):
+    return Character(
+        case_id=case_id,
+        name=name,
+        role=CharacterRole.SUSPECT,
+        description="",
+        personality_traits="{}",
+        suspicion_level=suspicion,
+        trust_level=trust,
+    )
+
+
+def make_decision(character, decision_type=DecisionType.INTERROGATE, outcome=None, **flags):
+    return Decision(
+        case_id=character.case_id,
+        character_id=character.id,
+        decision_type=decision_type,
+        description="",
+        outcome=outcome,
+        **flags,
+    )
+
+
+def test_build_features_counts_linked_decisions():
+    case_id = uuid4()
+    suspect = make_character(case_id, "Vera", suspicion=80, trust=20)
+    witness = make_character(case_id, "Sam")
+    decisions = [
+        make_decision(suspect, clue_discovered=True),
+        make_decision(suspect, clue_discovered=True, evidence_obtained=True),
+        make_decision(make_character(uuid4(), "Elsewhere"), clue_discovered=True),
+    ]
+
+    features, clues, evidence = build_features([suspect, witness], decisions)
+
+    assert features.shape == (2, len(FEATURE_NAMES))
+    assert clues.tolist() == [2.0, 0.0]
+    assert evidence.tolist() == [1.0, 0.0]
+    assert features[0, 0] == pytest.approx(0.8)  # suspicion
+    assert features[0, 1] == pytest.approx(0.8)  # distrust
+    assert features[0, 2] == pytest.approx(np.log1p(2))
+    assert features[1].tolist() == pytest.approx([0.0, 0.5, 0.0, 0.0, 0.0, 0.0])
+
+
+def test_scores_rank_each_case_separately():
+    first_case, second_case = uuid4(), uuid4()
+    guilty = make_character(first_case, "Vera", suspicion=90, trust=10)
+    innocent = make_character(first_case, "Sam", suspicion=10, trust=90)
+    other = make_character(second_case, "Ada", suspicion=50)
+
+    rankings = score_characters([innocent, other, guilty], [])
+
+    assert set(rankings) == {first_case, second_case}
+    assert [score.name for score in rankings[first_case]] == ["Vera", "Sam"]
+    assert [score.rank for score in rankings[first_case]] == [1, 2]
+    assert rankings[second_case][0].rank == 1
+    assert rankings[second_case][0].probability == pytest.approx(1.0)
+    assert sum(score.probability for score in rankings[first_case]) == pytest.approx(1.0)
+
+
+def test_decisions_move_a_suspect_up():
+    case_id = uuid4()
+    first = make_character(case_id, "Vera", suspicion=40)
+    second = make_character(case_id, "Sam", suspicion=50)
+    decisions = [
+        make_decision(first, DecisionType.ARREST, DecisionOutcome.SUCCESS, evidence_obtained=True),
+        make_decision(first, DecisionType.SEARCH, DecisionOutcome.SUCCESS, clue_discovered=True),
+        make_decision(second, DecisionType.RELEASE, DecisionOutcome.FAILURE),
+    ]
+
+    ranking = score_characters([first, second], decisions)[case_id]
+
+    assert [score.name for score in ranking] == ["Vera", "Sam"]
+    assert ranking[0].clues_linked == 1
+    assert ranking[0].evidence_linked == 1
+
+
+def test_custom_weights_change_the_ranking():
+    case_id = uuid4()
+    suspicious = make_character(case_id, "Vera", suspicion=90, trust=90)
+    distrusted = make_character(case_id, "Sam", suspicion=10, trust=0)
+
+    by_suspicion = score_characters([suspicious, distrusted], [])[case_id]
+    by_distrust = score_characters(
+        [suspicious, distrusted], [], weights=[0, 1, 0, 0, 0, 0]
+    )[case_id]
+
+    assert by_suspicion[0].name == "Vera"
+    assert by_distrust[0].name == "Sam"
+
+
+def test_rejects_wrong_number_of_weights():
+    with pytest.raises(ValueError):
+        score_characters([make_character(uuid4(), "Vera")], [], weights=[1.0, 2.0])
+
+
+def test_no_characters_gives_no_rankings():
+    assert score_characters([], []) == {}